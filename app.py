@@ -13,11 +13,18 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 from benchmark.data_loader import *
+from benchmark.dataset_cache import load_dataset_cache
 from benchmark.azure_client import AzureOpenAIClient
+from benchmark.conversation_history import token_counts_are_exact
 from benchmark.multi_turn_evaluator import MultiTurnEvaluator
 from benchmark.evaluation import *
 from benchmark.config import *
+from benchmark.resources import get_startup_report, warm_up
+from benchmark.metric_cache import get_metric_cache, get_metric_cache_stats
+from benchmark.reference_index import load_reference_index
+from benchmark.retrieval import FewShotRetriever, ReferenceSearchIndex
 import json
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 # Page configuration
@@ -28,6 +35,18 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Load the emotion model, NLTK data and Azure SDK in the background while the page renders
+@st.cache_resource
+def start_resource_warm_up():
+    return warm_up(background=True)
+
+start_resource_warm_up()
+
+# Precomputed reference-side artifacts (None until `python -m benchmark.reference_index` is run)
+@st.cache_resource
+def get_reference_index():
+    return load_reference_index()
+
 # Custom CSS
 st.markdown("""
 <style>
@@ -62,105 +81,95 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # Helper functions
-def get_few_shot_examples(num_examples=3):
-    """Get example conversations from dataset for few-shot learning"""
-    try:
-        scenarios = get_all_scenarios(limit=10)
-        # Select diverse examples
-        examples = []
-        seen_conditions = set()
-        
-        for scenario in scenarios:
-            condition = scenario.get('condition')
-            if condition not in seen_conditions and len(examples) < num_examples:
-                examples.append(scenario)
-                seen_conditions.add(condition)
-        
-        return examples
-    except:
-        return []
+@st.cache_resource
+def get_few_shot_retriever():
+    """BM25 index over the first patient turn of every session (built once per process)"""
+    return FewShotRetriever.from_dataset_cache(load_dataset_cache())
 
-def build_few_shot_prompt(examples):
-    """Build system prompt with few-shot examples"""
-    base_prompt = """You are a professional psychological counselor with expertise in mental health.
-You provide empathetic, supportive, and evidence-based counseling using techniques like CBT, 
-motivational interviewing, and solution-focused brief therapy.
+def get_few_shot_prompt(patient_message, num_examples=FEW_SHOT_EXAMPLES):
+    """System prompt with the dataset examples most similar to the patient message"""
+    try:
+        return get_few_shot_retriever().prompt_for(patient_message, k=num_examples)
+    except Exception:
+        return None
 
-Here are some examples of good therapeutic responses:
+@st.cache_resource
+def get_reference_search():
+    """TF-IDF index over every patient turn in the dataset (built once per process)"""
+    return ReferenceSearchIndex.from_dataset_cache(load_dataset_cache())
 
-"""
+def find_nearest_reference(patient_message):
+    """Doctor response to the most similar patient message in the dataset, or None"""
+    try:
+        return get_reference_search().nearest(patient_message)
+    except Exception:
+        return None
+
+# Fallback reference when neither a scenario turn nor a similar dataset turn is available
+DEFAULT_REFERENCE_RESPONSE = "I understand you're going through a difficult time. Let's work together to find some strategies that might help you feel better."
+
+# Scores shown when evaluation fails
+DEFAULT_SCORES = {
+    'rouge_score': 0.0,
+    'meteor_score': 0.0,
+    'ethical_alignment': 0.5,
+    'sentiment_distribution': 0.5,
+    'inclusivity_score': 0.5,
+    'complexity_score': 0.5
+}
+
+def resolve_reference(reference_response=None, reference_key=None):
+    """Reference text plus its precomputed analysis and emotion scores when indexed"""
+    # Use a default reference if none provided
+    if not reference_response:
+        reference_response = DEFAULT_REFERENCE_RESPONSE
     
-    for i, example in enumerate(examples, 1):
-        if example['turns']:
-            first_turn = example['turns'][0]
-            base_prompt += f"""
-Example {i} ({example['condition']}):
-Patient: {first_turn['patient']}
-Counselor: {first_turn['doctor']}
+    reference_analysis, reference_distribution = None, None
+    reference_index = get_reference_index()
+    if reference_index is not None:
+        reference_analysis, reference_distribution = reference_index.lookup(reference_key, reference_response)
+    return reference_response, reference_analysis, reference_distribution
+
+def score_single_response(ai_response, reference_response, reference_analysis=None, reference_distribution=None):
+    """Score one AI response on all six metrics (no Streamlit calls, safe in a worker thread)"""
+    return score_response_pair(
+        reference_response, ai_response,
+        reference_analysis=reference_analysis,
+        reference_distribution=reference_distribution
+    )
 
-"""
-    
-    base_prompt += """
-Now, respond to the patient with the same level of empathy, professionalism, and therapeutic skill.
-"""
-    
-    return base_prompt
+# Background evaluation: turn N is scored while the user writes turn N+1 and it is generated.
+# The pool is shared by all sessions; each session still collects its results in turn order.
+@st.cache_resource
+def get_evaluation_executor():
+    return ThreadPoolExecutor(max_workers=APP_EVALUATION_WORKERS, thread_name_prefix='turn-evaluation')
 
-def evaluate_single_response(ai_response, reference_response=None):
-    """Evaluate a single AI response against reference using the evaluation algorithms"""
-    try:
-        from benchmark.evaluation import (
-            calculate_average_rouge, 
-            calculate_meteor, 
-            evaluate_ethical_alignment,
-            evaluate_sentiment_distribution,
-            evaluate_inclusivity_score,
-            evaluate_complexity_score
-        )
-        from benchmark.config import EMOTION_WEIGHTS, READABILITY_CONSTANTS
-        
-        # Use a default reference if none provided
-        if not reference_response:
-            reference_response = "I understand you're going through a difficult time. Let's work together to find some strategies that might help you feel better."
-        
-        # Calculate ROUGE score
-        rouge_score = calculate_average_rouge(reference_response, ai_response)
-        
-        # Calculate METEOR score
-        meteor_score = calculate_meteor(reference_response, ai_response)
-        
-        # Calculate ethical alignment
-        ethical_alignment = evaluate_ethical_alignment(ai_response)
-        
-        # Calculate sentiment distribution
-        sentiment_distribution = evaluate_sentiment_distribution(reference_response, ai_response, EMOTION_WEIGHTS)
-        
-        # Calculate inclusivity score
-        inclusivity_score = evaluate_inclusivity_score(ai_response)
-        
-        # Calculate complexity score
-        complexity_score = evaluate_complexity_score(ai_response, READABILITY_CONSTANTS)
-        
-        return {
-            'rouge_score': rouge_score,
-            'meteor_score': meteor_score,
-            'ethical_alignment': ethical_alignment,
-            'sentiment_distribution': sentiment_distribution,
-            'inclusivity_score': inclusivity_score,
-            'complexity_score': complexity_score
-        }
-        
-    except Exception as e:
-        st.error(f"Evaluation error: {e}")
-        # Return default scores if evaluation fails
-        return {
-            'rouge_score': 0.0,
-            'meteor_score': 0.0,
-            'ethical_alignment': 0.5,
-            'sentiment_distribution': 0.5,
-            'inclusivity_score': 0.5,
-            'complexity_score': 0.5
-        }
+def submit_evaluation(ai_response, reference_response=None, reference_key=None):
+    """Queue a response for background evaluation and return its future"""
+    return get_evaluation_executor().submit(
+        score_single_response, ai_response, *resolve_reference(reference_response, reference_key)
+    )
+
+def collect_evaluations(block=False):
+    """
+    Move finished background evaluations into chat_history and session_metrics (in turn order)
+    
+    Args:
+        block: Block until every pending evaluation has finished
+    """
+    pending = st.session_state.pending_evaluations
+    for message_index in sorted(pending):
+        future = pending[message_index]
+        if not block and not future.done():
+            break
+        try:
+            metrics = future.result()
+        except Exception as e:
+            st.error(f"Evaluation error: {e}")
+            metrics = dict(DEFAULT_SCORES)
+        st.session_state.chat_history[message_index]['metrics'] = metrics
+        st.session_state.session_metrics.append(metrics)
+        del pending[message_index]
 
 # Initialize session state
 if 'chat_history' not in st.session_state:
@@ -173,6 +182,8 @@ if 'session_metrics' not in st.session_state:
     st.session_state.session_metrics = []
 if 'reference_scenario' not in st.session_state:
     st.session_state.reference_scenario = None
+if 'pending_evaluations' not in st.session_state:
+    st.session_state.pending_evaluations = {}  # chat_history index -> evaluation future
 
 # Sidebar
 st.sidebar.title("🧠 PsyChat")
@@ -212,7 +223,8 @@ st.sidebar.subheader("📊 Benchmark Reference")
 @st.cache_data
 def load_reference_scenarios():
     try:
-        scenarios = get_all_scenarios(limit=50)
+        # Columnar cache: turns are pre-parsed, rebuilt when the dataset changes
+        scenarios = load_dataset_cache().scenarios(limit=50)
         return scenarios
     except Exception as e:
         st.error(f"Error loading scenarios: {e}")
@@ -237,6 +249,7 @@ if reference_scenarios:
         st.session_state.reference_scenario = reference_scenarios[selected_idx]
         st.session_state.chat_history = []
         st.session_state.session_metrics = []
+        st.session_state.pending_evaluations = {}
         st.rerun()
 
 # Display current reference
@@ -267,7 +280,12 @@ with st.expander("⚙️ System Prompt Configuration"):
         use_few_shot = st.checkbox("Use few-shot examples from dataset", value=True)
         
         if use_few_shot:
-            st.info("💡 AI will be prompted with example therapeutic conversations from the dataset")
+            st.info("💡 AI will be prompted with the dataset conversations most similar to each message")
+            # Build the example index now so it stays off the per-message path
+            try:
+                get_few_shot_retriever()
+            except Exception as e:
+                st.warning(f"Few-shot examples unavailable: {e}")
 
 # Chat controls
 col1, col2, col3 = st.columns([3, 1, 1])
@@ -277,6 +295,7 @@ with col2:
     if st.button("🔄 New Session"):
         st.session_state.chat_history = []
         st.session_state.session_metrics = []
+        st.session_state.pending_evaluations = {}
         if st.session_state.azure_client:
             st.session_state.azure_client.reset_conversation()
         st.rerun()
@@ -286,49 +305,72 @@ with col3:
             st.session_state.show_summary = True
             st.rerun()
 
-# Display chat history with metrics
-chat_container = st.container()
-with chat_container:
-    for i, msg in enumerate(st.session_state.chat_history):
-        if msg['role'] == 'user':
-            st.markdown(f"""
-            <div class="user-message">
-                <strong>👤 You:</strong><br>
-                {msg['content']}
-            </div>
-            """, unsafe_allow_html=True)
-        else:
-            st.markdown(f"""
-            <div class="ai-message">
-                <strong>🤖 AI Counselor ({st.session_state.current_model}):</strong><br>
-                {msg['content']}
-            </div>
-            """, unsafe_allow_html=True)
-            
-            # Show metrics for AI response
-            if 'metrics' in msg:
-                metrics = msg['metrics']
+# Pick up evaluations that finished in the background since the last run
+collect_evaluations()
+
+# Display chat history with metrics (polled only while evaluations are pending)
+@st.fragment(run_every=APP_EVALUATION_POLL_SECONDS if st.session_state.pending_evaluations else None)
+def render_chat_history():
+    """
+    Chat messages with their metrics
+    
+    While evaluations are pending this runs as a fragment that re-renders
+    itself every APP_EVALUATION_POLL_SECONDS, so metrics appear without the
+    rest of the page rerunning; once the last one arrives the whole page
+    reruns once (updating the summary and stopping the polling).
+    """
+    polling = bool(st.session_state.pending_evaluations)
+    collect_evaluations()
+    
+    chat_container = st.container()
+    with chat_container:
+        for i, msg in enumerate(st.session_state.chat_history):
+            if msg['role'] == 'user':
                 st.markdown(f"""
-                <div class="metrics-box">
-                    <strong>📊 Real-time Metrics:</strong><br>
-                    <span class="metric-item">ROUGE: {metrics['rouge_score']:.3f}</span>
-                    <span class="metric-item">METEOR: {metrics['meteor_score']:.3f}</span>
-                    <span class="metric-item">Ethical: {metrics['ethical_alignment']:.3f}</span>
-                    <span class="metric-item">Sentiment: {metrics['sentiment_distribution']:.3f}</span>
-                    <span class="metric-item">Inclusive: {metrics['inclusivity_score']:.3f}</span>
-                    <span class="metric-item">Complexity: {metrics['complexity_score']:.3f}</span>
+                <div class="user-message">
+                    <strong>👤 You:</strong><br>
+                    {msg['content']}
+                </div>
+                """, unsafe_allow_html=True)
+            else:
+                st.markdown(f"""
+                <div class="ai-message">
+                    <strong>🤖 AI Counselor ({st.session_state.current_model}):</strong><br>
+                    {msg['content']}
                 </div>
                 """, unsafe_allow_html=True)
                 
-                # Show comparison with reference if available
-                if 'reference_comparison' in msg and msg['reference_comparison']:
-                    ref = msg['reference_comparison']
+                # Show metrics for AI response
+                if 'metrics' in msg:
+                    metrics = msg['metrics']
                     st.markdown(f"""
-                    <div style="background-color: #fff3cd; padding: 10px; border-radius: 8px; margin: 5px 0;">
-                        <strong>👨‍⚕️ Reference Response:</strong><br>
-                        {ref}
+                    <div class="metrics-box">
+                        <strong>📊 Real-time Metrics:</strong><br>
+                        <span class="metric-item">ROUGE: {metrics['rouge_score']:.3f}</span>
+                        <span class="metric-item">METEOR: {metrics['meteor_score']:.3f}</span>
+                        <span class="metric-item">Ethical: {metrics['ethical_alignment']:.3f}</span>
+                        <span class="metric-item">Sentiment: {metrics['sentiment_distribution']:.3f}</span>
+                        <span class="metric-item">Inclusive: {metrics['inclusivity_score']:.3f}</span>
+                        <span class="metric-item">Complexity: {metrics['complexity_score']:.3f}</span>
                     </div>
                     """, unsafe_allow_html=True)
+                    
+                    # Show comparison with reference if available
+                    if 'reference_comparison' in msg and msg['reference_comparison']:
+                        ref = msg['reference_comparison']
+                        st.markdown(f"""
+                        <div style="background-color: #fff3cd; padding: 10px; border-radius: 8px; margin: 5px 0;">
+                            <strong>👨‍⚕️ Reference Response:</strong><br>
+                            {ref}
+                        </div>
+                        """, unsafe_allow_html=True)
+                elif i in st.session_state.pending_evaluations:
+                    st.caption("⏳ Evaluating in the background...")
+    
+    if polling and not st.session_state.pending_evaluations:
+        st.rerun()
+
+render_chat_history()
 
 # Chat input
 st.markdown("---")
@@ -347,6 +389,7 @@ with col1:
 with col2:
     if len(st.session_state.chat_history) > 0:
         if st.button("💾 Save Session", use_container_width=True):
+            collect_evaluations(block=True)
             session_export = {
                 'timestamp': datetime.now().isoformat(),
                 'model': st.session_state.current_model,
@@ -364,54 +407,60 @@ with col2:
 # Process message
 if send_button and user_input.strip():
     if st.session_state.azure_client:
-        with st.spinner("🤔 AI is thinking..."):
-            try:
-                # Build system prompt with few-shot examples if enabled
-                system_prompt = None
-                if not use_default_prompt:
-                    system_prompt = custom_prompt
-                elif use_few_shot:
-                    # Load example conversations from dataset
-                    examples = get_few_shot_examples(num_examples=3)
-                    system_prompt = build_few_shot_prompt(examples)
-                
-                # Generate response
-                response = st.session_state.azure_client.generate_counselor_response(
+        try:
+            # Build system prompt with few-shot examples if enabled
+            system_prompt = None
+            if not use_default_prompt:
+                system_prompt = custom_prompt
+            elif use_few_shot:
+                # Examples most similar to this message (prompt cached per example set)
+                system_prompt = get_few_shot_prompt(user_input)
+            
+            # Stream the response, rendering tokens as they arrive
+            st.markdown(f"**🤖 AI Counselor ({st.session_state.current_model}):**")
+            response = st.write_stream(
+                st.session_state.azure_client.generate_counselor_response_stream(
                     user_input,
                     system_prompt=system_prompt
                 )
-                
-                # Evaluate the response
-                with st.spinner("📊 Evaluating response..."):
-                    # Get reference response if available
-                    reference_response = None
-                    if st.session_state.reference_scenario:
-                        turn_num = len(st.session_state.chat_history) // 2 + 1
-                        if turn_num <= len(st.session_state.reference_scenario['turns']):
-                            reference_response = st.session_state.reference_scenario['turns'][turn_num-1]['doctor']
-                    
-                    # Evaluate AI response
-                    metrics = evaluate_single_response(response, reference_response)
-                    
-                    # Store metrics
-                    st.session_state.session_metrics.append(metrics)
-                
-                # Add to chat history with metrics
-                st.session_state.chat_history.append({
-                    'role': 'user',
-                    'content': user_input
-                })
-                st.session_state.chat_history.append({
-                    'role': 'assistant',
-                    'content': response,
-                    'metrics': metrics,
-                    'reference_comparison': reference_response
-                })
-                
-                st.rerun()
-                
-            except Exception as e:
-                st.error(f"Error generating response: {e}")
+            )
+            
+            # Get reference response if available
+            reference_response = None
+            reference_key = None
+            if st.session_state.reference_scenario:
+                scenario = st.session_state.reference_scenario
+                turn_num = len(st.session_state.chat_history) // 2 + 1
+                if turn_num <= len(scenario['turns']):
+                    reference_response = scenario['turns'][turn_num-1]['doctor']
+                    reference_key = (scenario.get('patient_id'), scenario.get('session_id'), turn_num)
+            
+            # No scenario turn: compare against the closest human reference in the dataset
+            if reference_response is None:
+                nearest = find_nearest_reference(user_input)
+                if nearest is not None:
+                    reference_response, reference_key = nearest['doctor'], nearest['key']
+            
+            # Add to chat history; metrics are attached when the background evaluation finishes
+            st.session_state.chat_history.append({
+                'role': 'user',
+                'content': user_input
+            })
+            st.session_state.chat_history.append({
+                'role': 'assistant',
+                'content': response,
+                'reference_comparison': reference_response
+            })
+            
+            # Evaluate the response in the background so the next turn can start right away
+            st.session_state.pending_evaluations[len(st.session_state.chat_history) - 1] = submit_evaluation(
+                response, reference_response, reference_key
+            )
+            
+            st.rerun()
+            
+        except Exception as e:
+            st.error(f"Error generating response: {e}")
     else:
         st.error("Please configure API keys in .streamlit/secrets.toml")
 
@@ -419,6 +468,7 @@ if send_button and user_input.strip():
 if hasattr(st.session_state, 'show_summary') and st.session_state.show_summary:
     st.markdown("---")
     st.markdown("### 📊 Session Summary")
+    collect_evaluations(block=True)
     
     if st.session_state.session_metrics:
         # Calculate aggregate metrics
@@ -500,6 +550,30 @@ if hasattr(st.session_state, 'show_summary') and st.session_state.show_summary:
         st.session_state.show_summary = False
         st.rerun()
 
+# Startup timing report
+with st.sidebar.expander("⏱️ Startup Timings"):
+    st.dataframe(pd.DataFrame(get_startup_report()), hide_index=True, use_container_width=True)
+
+# Metric memoization counters (shared by all sessions)
+with st.sidebar.expander("🧮 Metric Cache"):
+    metric_cache = get_metric_cache()
+    st.caption(f"{len(metric_cache)} results, ~{metric_cache.size_bytes / 1024:.0f} KB")
+    metric_cache_stats = get_metric_cache_stats()
+    if metric_cache_stats:
+        st.dataframe(pd.DataFrame(metric_cache_stats), hide_index=True, use_container_width=True)
+    else:
+        st.write("No metrics computed yet")
+
+# Prompt size per turn (trimmed prompt vs. full history)
+with st.sidebar.expander("📏 Prompt Size"):
+    prompt_reports = st.session_state.azure_client.history.prompt_reports if st.session_state.azure_client else []
+    if prompt_reports:
+        if not token_counts_are_exact():
+            st.caption("⚠️ Estimated token counts (~4 characters per token): tiktoken is not available")
+        st.dataframe(pd.DataFrame(prompt_reports), hide_index=True, use_container_width=True)
+    else:
+        st.write("No prompts sent yet")
+
 # Footer
 st.sidebar.markdown("---")
 st.sidebar.info("""
@@ -522,4 +596,4 @@ st.sidebar.info("""
 - Complexity (readability)
 
 **Dataset:** 542 therapy sessions
-""")
\ No newline at end of file
+""")
@@ -5,9 +5,51 @@ Handles API calls to Azure OpenAI (GPT-4o and O1 models)
 Generates counselor responses for multi-turn conversations
 """
 
-from openai import AzureOpenAI
-from typing import List, Dict
-import time
+from typing import Callable, List, Dict, Iterator, Sequence
+import asyncio
+import uuid
+
+from benchmark.config import AZURE_MAX_CONCURRENCY
+from benchmark.conversation_history import ConversationHistory
+from benchmark.rate_limiter import RequestScheduler, estimate_request_tokens
+from benchmark.replay_cache import ReplayCache, get_replay_cache, request_key
+from benchmark.resources import get_resource
+
+# Sampling parameters shared by the sync and async clients
+COMPLETION_PARAMS = {'temperature': 0.7, 'max_tokens': 500}
+
+# Default system prompt for psychological counseling
+COUNSELOR_SYSTEM_PROMPT = """You are a professional psychological counselor with expertise in mental health. 
+You provide empathetic, supportive, and evidence-based counseling using techniques like:
+- Cognitive Behavioral Therapy (CBT)
+- Motivational Interviewing
+- Solution-Focused Brief Therapy
+
+Guidelines:
+1. Show empathy and understanding
+2. Ask appropriate questions for assessment
+3. Provide practical, actionable advice
+4. Assess for crisis/safety when appropriate
+5. Use inclusive, non-judgmental language
+6. Maintain professional boundaries
+7. Encourage hope and resilience
+
+Respond as a counselor would in a therapy session."""
+
+
+def build_counselor_messages(history: ConversationHistory, patient_message: str, system_prompt: str = None) -> List[Dict]:
+    """
+    Build the chat messages for one counselor turn
+    
+    Args:
+        history: The session's conversation history (trimmed to its token budget)
+        patient_message: The patient's message
+        system_prompt: Optional system prompt (uses default if None)
+        
+    Returns:
+        Messages list for the chat completions API
+    """
+    return history.build_messages(system_prompt or COUNSELOR_SYSTEM_PROMPT, f"Patient: {patient_message}")
 
 
 class AzureOpenAIClient:
@@ -16,7 +58,8 @@ class AzureOpenAIClient:
     Supports GPT-4o and O1 deployments
     """
     
-    def __init__(self, model_name: str, api_key: str, endpoint: str, api_version: str, deployment: str):
+    def __init__(self, model_name: str, api_key: str, endpoint: str, api_version: str, deployment: str,
+                 scheduler: RequestScheduler = None, replay: ReplayCache = None):
         """
         Initialize Azure OpenAI client
         
@@ -26,21 +69,33 @@ class AzureOpenAIClient:
             endpoint: Azure OpenAI endpoint URL
             api_version: API version
             deployment: Deployment name
+            scheduler: Rate limiter / retry policy (defaults to the configured quotas)
+            replay: Response record/replay cache (defaults to REPLAY_MODE; None when off)
         """
         self.model_name = model_name
         self.deployment = deployment
-        self.conversation_history = []
+        self.history = ConversationHistory()
+        self.scheduler = scheduler or RequestScheduler()
+        self.replay = replay if replay is not None else get_replay_cache()
         
-        # Initialize Azure OpenAI client
-        self.client = AzureOpenAI(
+        # Initialize Azure OpenAI client (SDK imported on first use);
+        # retries are handled by the scheduler, not the SDK
+        openai = get_resource('azure_openai')
+        self.client = openai.AzureOpenAI(
             api_key=api_key,
             azure_endpoint=endpoint,
-            api_version=api_version
+            api_version=api_version,
+            max_retries=0
         )
     
+    @property
+    def conversation_history(self) -> List[Dict]:
+        """Full (untrimmed) conversation history as chat messages"""
+        return self.history.messages
+    
     def reset_conversation(self):
         """Reset conversation history for new session"""
-        self.conversation_history = []
+        self.history.reset()
     
     def generate_counselor_response(self, patient_message: str, system_prompt: str = None) -> str:
         """
@@ -53,45 +108,113 @@ class AzureOpenAIClient:
         Returns:
             AI-generated counselor response
         """
-        if system_prompt is None:
-            system_prompt = self._get_default_system_prompt()
-        
-        # Build messages for API call
-        messages = [{"role": "system", "content": system_prompt}]
-        
-        # Add conversation history
-        messages.extend(self.conversation_history)
+        # Build messages for API call (system prompt, conversation history, current patient message)
+        messages = build_counselor_messages(self.history, patient_message, system_prompt)
         
-        # Add current patient message
-        messages.append({"role": "user", "content": f"Patient: {patient_message}"})
-        
-        # Call Azure OpenAI
         try:
-            response = self.client.chat.completions.create(
-                model=self.deployment,
-                messages=messages,
-                temperature=0.7,
-                max_tokens=500
-            )
-            
-            counselor_response = response.choices[0].message.content
+            if self.replay is not None:
+                counselor_response = self.replay.complete(
+                    self.deployment, messages, COMPLETION_PARAMS, lambda: self._complete(messages)
+                )
+            else:
+                counselor_response = self._complete(messages)
             
             # Update conversation history
-            self.conversation_history.append({"role": "user", "content": f"Patient: {patient_message}"})
-            self.conversation_history.append({"role": "assistant", "content": counselor_response})
+            self._record_turn(patient_message, counselor_response)
             
             return counselor_response
             
         except Exception as e:
             raise RuntimeError(f"Azure OpenAI API error: {e}")
     
-    def generate_multi_turn_conversation(self, patient_turns: List[str], system_prompt: str = None) -> List[Dict]:
+    def generate_counselor_response_stream(self, patient_message: str, system_prompt: str = None) -> Iterator[str]:
+        """
+        Generate a counselor response, yielding text deltas as they arrive
+        
+        The complete response is added to the conversation history once the
+        stream finishes (an abandoned stream leaves the history unchanged).
+        
+        Args:
+            patient_message: The patient's message
+            system_prompt: Optional system prompt (uses default if None)
+            
+        Yields:
+            Response text deltas in order
+        """
+        messages = build_counselor_messages(self.history, patient_message, system_prompt)
+        
+        # Recorded responses are replayed as a single delta
+        replay_key = request_key(self.deployment, messages, COMPLETION_PARAMS) if self.replay is not None else None
+        if replay_key is not None:
+            try:
+                recorded = self.replay.lookup(replay_key)
+            except Exception as e:
+                raise RuntimeError(f"Azure OpenAI API error: {e}")
+            if recorded is not None:
+                yield recorded
+                self._record_turn(patient_message, recorded)
+                return
+        
+        parts = []
+        try:
+            # Rate limits and retries apply to opening the stream
+            stream = self.scheduler.call(
+                lambda timeout: self.client.chat.completions.create(
+                    model=self.deployment,
+                    messages=messages,
+                    stream=True,
+                    timeout=timeout,
+                    **COMPLETION_PARAMS
+                ),
+                tokens=estimate_request_tokens(messages, COMPLETION_PARAMS['max_tokens'])
+            )
+            try:
+                for chunk in stream:
+                    # Azure sends content-filter chunks without choices
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        parts.append(delta)
+                        yield delta
+            finally:
+                # Release the connection right away when the caller abandons the stream
+                stream.close()
+        except Exception as e:
+            raise RuntimeError(f"Azure OpenAI API error: {e}")
+        
+        counselor_response = ''.join(parts)
+        if replay_key is not None:
+            self.replay.put(replay_key, counselor_response, self.deployment)
+        self._record_turn(patient_message, counselor_response)
+    
+    def _complete(self, messages: List[Dict]) -> str:
+        """Call Azure OpenAI within the rate limits (throttled/transient failures are retried)"""
+        response = self.scheduler.call(
+            lambda timeout: self.client.chat.completions.create(
+                model=self.deployment,
+                messages=messages,
+                timeout=timeout,
+                **COMPLETION_PARAMS
+            ),
+            tokens=estimate_request_tokens(messages, COMPLETION_PARAMS['max_tokens'])
+        )
+        return response.choices[0].message.content
+    
+    def _record_turn(self, patient_message: str, counselor_response: str):
+        """Append a completed turn to the conversation history"""
+        self.history.add_turn(f"Patient: {patient_message}", counselor_response)
+    
+    def generate_multi_turn_conversation(self, patient_turns: List[str], system_prompt: str = None,
+                                         on_response: Callable[[Dict], None] = None) -> List[Dict]:
         """
         Generate responses for a complete multi-turn conversation
         
         Args:
             patient_turns: List of patient messages in order
             system_prompt: Optional system prompt
+            on_response: Optional callback given each turn's dict as soon as it is
+                generated (e.g. to start evaluating it while the next turn generates)
             
         Returns:
             List of dicts with turn, patient, and ai_response
@@ -107,14 +230,14 @@ class AzureOpenAIClient:
                     'patient': patient_msg,
                     'ai_response': ai_response
                 })
-                # Small delay to avoid rate limiting
-                time.sleep(0.5)
             except Exception as e:
                 results.append({
                     'turn': turn_num,
                     'patient': patient_msg,
                     'ai_response': f"ERROR: {str(e)}"
                 })
+            if on_response is not None:
+                on_response(results[-1])
         
         return results
     
@@ -122,22 +245,197 @@ class AzureOpenAIClient:
         """
         Default system prompt for psychological counseling
         """
-        return """You are a professional psychological counselor with expertise in mental health. 
-You provide empathetic, supportive, and evidence-based counseling using techniques like:
-- Cognitive Behavioral Therapy (CBT)
-- Motivational Interviewing
-- Solution-Focused Brief Therapy
+        return COUNSELOR_SYSTEM_PROMPT
 
-Guidelines:
-1. Show empathy and understanding
-2. Ask appropriate questions for assessment
-3. Provide practical, actionable advice
-4. Assess for crisis/safety when appropriate
-5. Use inclusive, non-judgmental language
-6. Maintain professional boundaries
-7. Encourage hope and resilience
 
-Respond as a counselor would in a therapy session."""
+class AsyncAzureOpenAIClient:
+    """
+    Asyncio client for Azure OpenAI that generates many sessions concurrently
+    
+    Each session keeps its own conversation history; turns within a session
+    run in order, while up to max_concurrency requests are in flight across
+    sessions.
+    """
+    
+    def __init__(self, model_name: str, api_key: str, endpoint: str, api_version: str, deployment: str,
+                 max_concurrency: int = AZURE_MAX_CONCURRENCY, scheduler: RequestScheduler = None,
+                 replay: ReplayCache = None):
+        """
+        Initialize async Azure OpenAI client
+        
+        Args:
+            model_name: "GPT-4o" or "O1"
+            api_key: Azure OpenAI API key
+            endpoint: Azure OpenAI endpoint URL (a local fake endpoint works for testing)
+            api_version: API version
+            deployment: Deployment name
+            max_concurrency: Maximum requests in flight at once
+            scheduler: Rate limiter / retry policy shared by all sessions (defaults to the configured quotas)
+            replay: Response record/replay cache (defaults to REPLAY_MODE; None when off)
+        """
+        self.model_name = model_name
+        self.deployment = deployment
+        self.max_concurrency = max_concurrency
+        self.conversation_histories: Dict[str, ConversationHistory] = {}
+        self.scheduler = scheduler or RequestScheduler()
+        self.replay = replay if replay is not None else get_replay_cache()
+        
+        openai = get_resource('azure_openai')
+        self.client = openai.AsyncAzureOpenAI(
+            api_key=api_key,
+            azure_endpoint=endpoint,
+            api_version=api_version,
+            max_retries=0
+        )
+        self._semaphore = None
+    
+    def _request_slot(self) -> asyncio.Semaphore:
+        """Concurrency limiter (created inside the running event loop)"""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+    
+    def reset_conversation(self, session_id: str = None):
+        """
+        Reset conversation history
+        
+        Args:
+            session_id: Session to reset (all sessions when None)
+        """
+        if session_id is None:
+            self.conversation_histories = {}
+        else:
+            self.conversation_histories.pop(session_id, None)
+    
+    async def generate_counselor_response(self, session_id: str, patient_message: str,
+                                          system_prompt: str = None) -> str:
+        """
+        Generate a counselor response within one session
+        
+        Args:
+            session_id: Session whose history the turn belongs to
+            patient_message: The patient's message
+            system_prompt: Optional system prompt (uses default if None)
+            
+        Returns:
+            AI-generated counselor response
+        """
+        history = self.conversation_histories.setdefault(session_id, ConversationHistory())
+        messages = build_counselor_messages(history, patient_message, system_prompt)
+        
+        try:
+            if self.replay is not None:
+                counselor_response = await self.replay.acomplete(
+                    self.deployment, messages, COMPLETION_PARAMS, lambda: self._complete(messages)
+                )
+            else:
+                counselor_response = await self._complete(messages)
+            
+            # Update this session's history
+            history.add_turn(f"Patient: {patient_message}", counselor_response)
+            
+            return counselor_response
+            
+        except Exception as e:
+            raise RuntimeError(f"Azure OpenAI API error: {e}")
+    
+    async def _complete(self, messages: List[Dict]) -> str:
+        """Call Azure OpenAI within the concurrency and rate limits"""
+        async with self._request_slot():
+            response = await self.scheduler.acall(
+                lambda timeout: self.client.chat.completions.create(
+                    model=self.deployment,
+                    messages=messages,
+                    timeout=timeout,
+                    **COMPLETION_PARAMS
+                ),
+                tokens=estimate_request_tokens(messages, COMPLETION_PARAMS['max_tokens'])
+            )
+        return response.choices[0].message.content
+    
+    async def generate_multi_turn_conversation(self, patient_turns: List[str], system_prompt: str = None,
+                                               session_id: str = None) -> List[Dict]:
+        """
+        Generate responses for a complete multi-turn conversation, turn by turn
+        
+        Args:
+            patient_turns: List of patient messages in order
+            system_prompt: Optional system prompt
+            session_id: Session identifier (a fresh one is used when None)
+            
+        Returns:
+            List of dicts with turn, patient, and ai_response
+        """
+        session_id = session_id if session_id is not None else uuid.uuid4().hex
+        self.reset_conversation(session_id)
+        results = []
+        
+        for turn_num, patient_msg in enumerate(patient_turns, 1):
+            try:
+                ai_response = await self.generate_counselor_response(session_id, patient_msg, system_prompt)
+                results.append({
+                    'turn': turn_num,
+                    'patient': patient_msg,
+                    'ai_response': ai_response
+                })
+            except Exception as e:
+                results.append({
+                    'turn': turn_num,
+                    'patient': patient_msg,
+                    'ai_response': f"ERROR: {str(e)}"
+                })
+        
+        self.reset_conversation(session_id)
+        return results
+    
+    async def generate_conversations(self, conversations: Sequence[List[str]], system_prompt: str = None,
+                                     session_ids: Sequence[str] = None) -> List[List[Dict]]:
+        """
+        Generate many multi-turn conversations concurrently
+        
+        Args:
+            conversations: Patient turn lists, one per session
+            system_prompt: Optional system prompt
+            session_ids: Optional session identifiers aligned with conversations
+            
+        Returns:
+            Results per session, in the same order as conversations
+        """
+        session_ids = session_ids or [f"session-{index}" for index in range(len(conversations))]
+        return await asyncio.gather(*[
+            self.generate_multi_turn_conversation(patient_turns, system_prompt, session_id)
+            for patient_turns, session_id in zip(conversations, session_ids)
+        ])
+    
+    def run_conversations(self, conversations: Sequence[List[str]], system_prompt: str = None,
+                          session_ids: Sequence[str] = None) -> List[List[Dict]]:
+        """
+        Blocking wrapper around generate_conversations for scripts
+        
+        Args:
+            conversations: Patient turn lists, one per session
+            system_prompt: Optional system prompt
+            session_ids: Optional session identifiers aligned with conversations
+            
+        Returns:
+            Results per session, in the same order as conversations
+        """
+        self._semaphore = None
+        return asyncio.run(self._run_and_close(conversations, system_prompt, session_ids))
+    
+    async def _run_and_close(self, conversations, system_prompt, session_ids):
+        """Generate conversations, then close the HTTP client inside the same event loop"""
+        try:
+            return await self.generate_conversations(conversations, system_prompt, session_ids)
+        finally:
+            await self.client.close()
+
+
+def _secrets_for_model(model_name: str, secrets):
+    """Azure OpenAI settings for a model from Streamlit secrets"""
+    if model_name == "GPT-4o":
+        return secrets["azure_openai_4o"]
+    return secrets["azure_openai_o1"]  # O1
 
 
 def create_client_from_secrets(model_name: str, secrets) -> AzureOpenAIClient:
@@ -151,10 +449,7 @@ def create_client_from_secrets(model_name: str, secrets) -> AzureOpenAIClient:
     Returns:
         Configured AzureOpenAIClient
     """
-    if model_name == "GPT-4o":
-        config = secrets["azure_openai_4o"]
-    else:  # O1
-        config = secrets["azure_openai_o1"]
+    config = _secrets_for_model(model_name, secrets)
     
     return AzureOpenAIClient(
         model_name=model_name,
@@ -164,3 +459,28 @@ def create_client_from_secrets(model_name: str, secrets) -> AzureOpenAIClient:
         deployment=config["deployment"]
     )
 
+
+
+def create_async_client_from_secrets(model_name: str, secrets,
+                                     max_concurrency: int = AZURE_MAX_CONCURRENCY) -> AsyncAzureOpenAIClient:
+    """
+    Create async client from Streamlit secrets
+    
+    Args:
+        model_name: "GPT-4o" or "O1"
+        secrets: Streamlit secrets object
+        max_concurrency: Maximum requests in flight at once
+        
+    Returns:
+        Configured AsyncAzureOpenAIClient
+    """
+    config = _secrets_for_model(model_name, secrets)
+    
+    return AsyncAzureOpenAIClient(
+        model_name=model_name,
+        api_key=config["api_key"],
+        endpoint=config["endpoint"],
+        api_version=config["api_version"],
+        deployment=config["deployment"],
+        max_concurrency=max_concurrency
+    )
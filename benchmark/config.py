@@ -10,7 +10,6 @@ and evaluation parameters used throughout the evaluation system.
 # =================================
 import os
 import csv
-from docx import Document
 import nltk
 import numpy as np
 import pandas as pd
@@ -35,6 +34,14 @@ DETAILED_RESULTS_PATH = 'outputs/detailed_results.json'
 TURN_BY_TURN_PATH = 'outputs/turn_by_turn_scores.csv'
 PLOTS_DIR = 'outputs/plots'
 
+# Cache paths
+EMOTION_CACHE_DIR = 'outputs/cache/emotion_vectors'
+DATASET_CACHE_DIR = 'outputs/cache/dataset'  # Parquet copy of the dataset, rebuilt when the JSONL changes
+REFERENCE_INDEX_DIR = 'outputs/cache/reference_index'  # Built by: python -m benchmark.reference_index
+SCORE_STORE_PATH = 'outputs/cache/scores.sqlite'  # Persistent metric scores; None disables
+REPLAY_CACHE_PATH = 'outputs/cache/llm_responses.jsonl'  # Recorded Azure OpenAI responses
+METEOR_SYNONYM_CACHE_PATH = 'outputs/cache/meteor_synonyms.json'  # WordNet synonyms per word; None keeps them in memory
+
 # =================================
 # DATA STRUCTURE DEFINITIONS
 # =================================
@@ -61,18 +68,62 @@ SECTION_SUFFIX = ':'
 # =================================
 
 # ENABLED FOR LOCAL DEVELOPMENT WITH FULL ML EVALUATION
-from transformers import pipeline
-EMOTIONAL_MODEL = pipeline(
-    "text-classification", 
-    model="j-hartmann/emotion-english-distilroberta-base", 
-    top_k=None
-)
+# The pipeline is built lazily by benchmark.resources.get_emotion_model();
+# set to None to use the keyword-based sentiment fallback
+EMOTION_MODEL_NAME = "j-hartmann/emotion-english-distilroberta-base"
+
+# =================================
+# AZURE OPENAI GENERATION PARAMETERS
+# =================================
+AZURE_MAX_CONCURRENCY = 8  # Requests in flight at once across sessions (async client)
+
+# Request scheduling (set the quotas to match the deployment)
+AZURE_REQUESTS_PER_MINUTE = 60
+AZURE_TOKENS_PER_MINUTE = 60000
+AZURE_MAX_RETRIES = 6               # Retries for 429/5xx/timeouts before a turn is marked as an error
+AZURE_BACKOFF_BASE_SECONDS = 1.0    # Backoff ceiling for the first retry (doubles per retry, full jitter)
+AZURE_BACKOFF_MAX_SECONDS = 60.0
+AZURE_REQUEST_TIMEOUT_SECONDS = 60.0
+
+# Response record/replay (see benchmark.replay_cache): None (off), 'record', 'replay' or 'record-missing'
+REPLAY_MODE = None
+
+# Conversation history sent with each request
+HISTORY_TOKEN_BUDGET = 6000       # Max prompt tokens: system prompt + history + current message
+HISTORY_KEEP_RECENT_TURNS = 3     # Most recent turns always sent verbatim
+HISTORY_SUMMARY_CHARS = 160       # Characters kept per message when older turns are condensed
+HISTORY_TOKENIZER = 'o200k_base'  # tiktoken encoding for exact counts (estimated, and labeled so, without tiktoken)
+
+# =================================
+# FEW-SHOT RETRIEVAL PARAMETERS
+# =================================
+FEW_SHOT_EXAMPLES = 3               # Examples added to the few-shot system prompt
+FEW_SHOT_PROMPT_CACHE_SIZE = 1024   # Prompts cached per distinct example set
+BM25_K1 = 1.5                       # Term frequency saturation
+BM25_B = 0.75                       # Document length normalization
+
+# =================================
+# PARALLEL EVALUATION PARAMETERS
+# =================================
+EVALUATION_WORKERS = 1            # Worker processes for MultiTurnEvaluator.evaluate_dataset (1 = serial)
+EVALUATION_CHUNK_SIZE = None      # Sessions per worker task (None = about four chunks per worker)
+EVALUATION_START_METHOD = 'spawn' # Fresh interpreters; forking after torch/threads start is unsafe
+APP_EVALUATION_WORKERS = 4        # Background evaluation threads shared by all app sessions
+APP_EVALUATION_POLL_SECONDS = 0.5 # Chat panel refresh interval while evaluations are pending
+
+# =================================
+# METRIC MEMOIZATION PARAMETERS
+# =================================
+METRIC_CACHE_MAX_ENTRIES = 100000        # Memoized metric results kept in memory (LRU)
+METRIC_CACHE_MAX_BYTES = 64 * 1024 * 1024  # Approximate memory cap, texts in keys included
 
 # =================================
 # ROUGE EVALUATION PARAMETERS
 # =================================
 ROUGE_METRICS = ['rouge1', 'rouge2', 'rougeL']
 ROUGE_USE_STEMMER = True
+ROUGE_REFERENCE_CACHE_SIZE = 4096  # Distinct reference texts kept tokenized/stemmed in memory
+REFERENCE_INDEX_CACHE_SIZE = 4096  # Reference index rows kept loaded as TextAnalysis objects
 
 # =================================
 # METEOR EVALUATION PARAMETERS
@@ -85,6 +136,11 @@ METEOR_GAMMA = 0.6  # Penalty for fragmentation (how scattered the alignment is)
 # SENTIMENT DISTRIBUTION PARAMETERS
 # =================================
 
+# Emotion model inference
+EMOTION_BATCH_SIZE = 32   # Texts per forward pass in batched scoring
+EMOTION_MAX_TOKENS = 512  # distilroberta context limit; longer texts are chunked
+EMOTION_CACHE_MEMORY_ITEMS = 50000  # Emotion vectors kept in memory (disk layer is unbounded)
+
 # Emotion categories for analysis
 RELEVANT_EMOTIONS = [
     'empathy', 'compassion', 'validation', 'understanding', 'trust', 'support',
@@ -142,6 +198,12 @@ SUPPORTIVE_TERMS = {
     'emotions', 'valid', 'normal', 'difficult', 'challenging', 'important'
 }
 
+# Open, assessment-oriented question phrasings (10% weight)
+QUESTION_PATTERNS = {
+    'how often', 'tell me about', 'describe', 'what has been', 'have you experienced',
+    'how do you feel', 'what would help', 'who in your life', 'what support'
+}
+
 # Negative/harmful terms (penalty)
 ETHICAL_NEGATIVE_TERMS = {
     # Judgmental or dismissive language
@@ -0,0 +1,224 @@
+"""
+Token-Budgeted Conversation History
+
+Keeps the full transcript of a counseling session but sends the model only
+what fits a token budget: the system prompt, the current patient message and
+the most recent turns verbatim, with older turns condensed into a short
+recap (or dropped once even the recap no longer fits). Every prompt built is
+recorded with its size next to the size the full history would have had.
+Sizes are exact with tiktoken and estimated (about 4 characters per token)
+without it; each report says which.
+"""
+
+import re
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+from benchmark.config import (
+    HISTORY_KEEP_RECENT_TURNS, HISTORY_SUMMARY_CHARS, HISTORY_TOKEN_BUDGET, HISTORY_TOKENIZER
+)
+
+# Per-message overhead of the chat format (role and separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+_FIRST_SENTENCE_RE = re.compile(r'^(.+?[.!?])(\s|$)', re.DOTALL)
+
+
+@lru_cache(maxsize=1)
+def _get_encoder():
+    """tiktoken encoder when tiktoken is installed and its encoding loads, otherwise None"""
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        return tiktoken.get_encoding(HISTORY_TOKENIZER)
+    except Exception as e:
+        # The encoding file is downloaded on first use and may be unavailable offline
+        print(f"⚠️ tiktoken encoding {HISTORY_TOKENIZER} unavailable, estimating token counts: {e}")
+        return None
+
+
+def token_counts_are_exact() -> bool:
+    """
+    Whether count_tokens uses the tokenizer (tiktoken) rather than the character estimate
+
+    Returns:
+        True when token counts are exact
+    """
+    return _get_encoder() is not None
+
+
+def count_tokens(text: str) -> int:
+    """
+    Count tokens in a text (exact with tiktoken, otherwise about 4 characters per token)
+
+    Args:
+        text: Input text
+
+    Returns:
+        Token count
+    """
+    encoder = _get_encoder()
+    if encoder is not None:
+        return len(encoder.encode(text))
+    return (len(text) + 3) // 4
+
+
+def count_message_tokens(messages: List[Dict]) -> int:
+    """
+    Count tokens of chat messages including per-message overhead
+
+    Args:
+        messages: Chat messages
+
+    Returns:
+        Token count
+    """
+    return sum(count_tokens(message['content']) + MESSAGE_OVERHEAD_TOKENS for message in messages)
+
+
+def _condense(text: str, max_chars: int) -> str:
+    """First sentence of a message, cut to max_chars"""
+    text = ' '.join(text.split())
+    match = _FIRST_SENTENCE_RE.match(text)
+    text = match.group(1) if match else text
+    return text if len(text) <= max_chars else text[:max_chars - 3].rstrip() + '...'
+
+
+class ConversationHistory:
+    """
+    Conversation transcript that builds token-budgeted prompts
+    """
+
+    def __init__(self,
+                 token_budget: int = HISTORY_TOKEN_BUDGET,
+                 keep_recent_turns: int = HISTORY_KEEP_RECENT_TURNS,
+                 summary_chars: int = HISTORY_SUMMARY_CHARS):
+        """
+        Args:
+            token_budget: Maximum prompt tokens (system prompt, history and current message)
+            keep_recent_turns: Most recent turns always sent verbatim
+            summary_chars: Maximum characters kept per message in the recap of older turns
+        """
+        self.token_budget = token_budget
+        self.keep_recent_turns = keep_recent_turns
+        self.summary_chars = summary_chars
+        self.turns: List[Tuple[str, str]] = []
+        self.prompt_reports: List[Dict] = []
+        # Token count of each turn and their running total
+        self._turn_tokens: List[int] = []
+        self._history_tokens = 0
+        # Report of the last built prompt, recorded once its turn completes
+        self._pending_report: Dict = None
+
+    @property
+    def messages(self) -> List[Dict]:
+        """Full transcript as user/assistant chat messages"""
+        messages = []
+        for user_content, assistant_content in self.turns:
+            messages.append({"role": "user", "content": user_content})
+            messages.append({"role": "assistant", "content": assistant_content})
+        return messages
+
+    def add_turn(self, user_content: str, assistant_content: str):
+        """
+        Record a completed turn (and the size report of the prompt that produced it)
+
+        Args:
+            user_content: User message as sent to the model
+            assistant_content: Model response
+        """
+        turn = (user_content, assistant_content)
+        turn_tokens = count_message_tokens(self._turn_messages(turn))
+        self.turns.append(turn)
+        self._turn_tokens.append(turn_tokens)
+        self._history_tokens += turn_tokens
+        if self._pending_report is not None:
+            self.prompt_reports.append(self._pending_report)
+            self._pending_report = None
+
+    def reset(self):
+        """Forget the transcript and prompt reports"""
+        self.turns = []
+        self.prompt_reports = []
+        self._turn_tokens = []
+        self._history_tokens = 0
+        self._pending_report = None
+
+    def __len__(self):
+        return len(self.turns)
+
+    def _turn_messages(self, turn: Tuple[str, str]) -> List[Dict]:
+        return [{"role": "user", "content": turn[0]}, {"role": "assistant", "content": turn[1]}]
+
+    def _recap(self, turns: List[Tuple[str, str]]) -> Dict:
+        lines = [
+            f"- {_condense(user, self.summary_chars)} / Counselor: {_condense(assistant, self.summary_chars)}"
+            for user, assistant in turns
+        ]
+        return {"role": "system", "content": "Summary of earlier turns in this session:\n" + '\n'.join(lines)}
+
+    def build_messages(self, system_prompt: str, user_content: str) -> List[Dict]:
+        """
+        Build the prompt for the next turn within the token budget
+
+        The system prompt, the current message and the last keep_recent_turns
+        turns are always included verbatim; older turns are added verbatim,
+        newest first, while they fit, and the rest are condensed into a recap
+        whose oldest lines are dropped if it does not fit either. The prompt's
+        size report is added to prompt_reports when the turn is recorded, so
+        failed or retried requests are not reported.
+
+        Args:
+            system_prompt: System prompt
+            user_content: Current user message
+
+        Returns:
+            Messages for the chat completions API
+        """
+        system_message = {"role": "system", "content": system_prompt}
+        user_message = {"role": "user", "content": user_content}
+        fixed_tokens = count_message_tokens([system_message, user_message])
+        remaining = self.token_budget - fixed_tokens
+
+        # Walk back from the newest turn
+        verbatim = []
+        cutoff = len(self.turns)
+        for index in range(len(self.turns) - 1, -1, -1):
+            turn_tokens = self._turn_tokens[index]
+            is_recent = len(self.turns) - index <= self.keep_recent_turns
+            if not is_recent and turn_tokens > remaining:
+                break
+            verbatim = self._turn_messages(self.turns[index]) + verbatim
+            remaining -= turn_tokens
+            cutoff = index
+
+        # Condense what did not fit, dropping the oldest recap lines if needed
+        older = self.turns[:cutoff]
+        recap = []
+        while older:
+            candidate = self._recap(older)
+            if count_message_tokens([candidate]) <= remaining:
+                recap = [candidate]
+                break
+            older = older[1:]
+
+        messages = [system_message] + recap + verbatim + [user_message]
+        self._pending_report = {
+            'turn': len(self.turns) + 1,
+            'prompt_tokens': self.token_budget - remaining + count_message_tokens(recap),
+            'full_history_tokens': fixed_tokens + self._history_tokens,
+            'verbatim_turns': len(verbatim) // 2,
+            'condensed_turns': len(older),
+            'dropped_turns': cutoff - len(older),
+            'token_counts': 'exact' if token_counts_are_exact() else 'estimated'
+        }
+        return messages
+
+    @property
+    def last_prompt_report(self) -> Dict:
+        """Size report of the most recently built prompt (None before the first)"""
+        if self._pending_report is not None:
+            return self._pending_report
+        return self.prompt_reports[-1] if self.prompt_reports else None
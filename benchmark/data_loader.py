@@ -6,8 +6,12 @@ Extracts multi-turn conversations for evaluation
 """
 
 import json
+import os
+import re
+import threading
+import numpy as np
 import pandas as pd
-from typing import List, Dict
+from typing import List, Dict, Iterator, Optional, Tuple
 
 
 def load_dataset(file_path: str = 'data/synthetic_mental_health_dataset.jsonl') -> List[Dict]:
@@ -62,6 +66,320 @@ def parse_conversation_turns(input_text: str) -> List[Dict]:
     return turns
 
 
+class Scenario(dict):
+    """
+    Session dictionary whose 'turns' are parsed from 'input' on first access
+    """
+    
+    def __missing__(self, key):
+        if key != 'turns':
+            raise KeyError(key)
+        turns = self['turns'] = parse_conversation_turns(self['input'])
+        return turns
+    
+    def get(self, key, default=None):
+        if key == 'turns' and 'input' in self:
+            return self[key]
+        return super().get(key, default)
+
+
+_JSON_DECODER = json.JSONDecoder()
+_INDEX_FIELDS = ('patient_id', 'condition')
+_INDEX_KEYS = tuple(json.dumps(field).encode('utf-8') for field in _INDEX_FIELDS)
+_VALUE_WINDOW_BYTES = 256
+_NOT_FOUND = object()
+_JSON_STRING_RE = re.compile(rb'"(?:[^"\\]|\\.)*"')
+
+
+def _index_fields(line: bytes) -> Tuple:
+    """
+    patient_id and condition of a raw JSON line
+    
+    When the quoted field name occurs exactly once in the line, directly
+    inside the outer object and followed by a colon, it is the top-level key
+    and only its value is decoded (quotes inside JSON strings are escaped, so
+    the raw name cannot match string contents); otherwise the whole line is
+    parsed.
+    
+    Args:
+        line: One JSONL line
+        
+    Returns:
+        (patient_id, condition), None for a missing field
+    """
+    values = []
+    for key in _INDEX_KEYS:
+        start = line.find(key)
+        value = _field_value(line, start + len(key)) if start >= 0 else _NOT_FOUND
+        if value is _NOT_FOUND or line.find(key, start + 1) >= 0 or _nesting_depth(line[:start]) != 1:
+            session = json.loads(line)
+            return tuple(session.get(field) for field in _INDEX_FIELDS)
+        values.append(value)
+    return tuple(values)
+
+
+def _field_value(line: bytes, end: int):
+    """Value after a raw key ending at end (_NOT_FOUND unless it is a short value after a colon)"""
+    window = line[end:end + _VALUE_WINDOW_BYTES].decode('utf-8', errors='ignore').lstrip()
+    if not window.startswith(':'):
+        return _NOT_FOUND
+    try:
+        value, value_end = _JSON_DECODER.raw_decode(window, len(window) - len(window[1:].lstrip()))
+    except ValueError:
+        return _NOT_FOUND
+    # A value reaching the end of the window may have been cut off
+    return value if value_end < len(window) else _NOT_FOUND
+
+
+def _nesting_depth(prefix: bytes) -> int:
+    """Object/array nesting depth at the end of a JSON prefix that ends between tokens"""
+    if prefix.count(b'{') == 1 and b'[' not in prefix:
+        return 1
+    prefix = _JSON_STRING_RE.sub(b'', prefix)
+    return prefix.count(b'{') + prefix.count(b'[') - prefix.count(b'}') - prefix.count(b']')
+
+
+def _is_key(value) -> bool:
+    """Whether a field value can be looked up in the index"""
+    try:
+        hash(value)
+    except TypeError:
+        return False
+    return True
+
+
+def _raw_filter(value) -> Tuple[bytes, ...]:
+    """JSON encodings of a filter value (raw and escaped), searched for in raw lines before parsing"""
+    return tuple({json.dumps(value, ensure_ascii=ascii_only).encode('utf-8') for ascii_only in (False, True)})
+
+
+def iter_scenarios(dataset_path: str = 'data/synthetic_mental_health_dataset.jsonl',
+                   condition: str = None,
+                   risk_flag: bool = None,
+                   severity: str = None,
+                   limit: int = None) -> Iterator[Scenario]:
+    """
+    Stream scenarios from the dataset, filtering before the full parse
+    
+    Lines that cannot match (the filter value does not appear in the raw line)
+    are skipped without JSON parsing, turns are parsed only when accessed, and
+    reading stops once limit scenarios have been yielded, so memory use does
+    not grow with the size of the file.
+    
+    Args:
+        dataset_path: Path to dataset
+        condition: Filter by condition (e.g., 'depression', 'anxiety')
+        risk_flag: Filter by risk flag
+        severity: Filter by session_state severity
+        limit: Maximum number of scenarios to yield
+        
+    Yields:
+        Scenario dictionaries (dicts with lazily parsed 'turns')
+    """
+    if limit is not None and limit <= 0:
+        return
+    
+    filters = [(field, value) for field, value in
+               (('condition', condition), ('risk_flag', risk_flag), ('severity', severity)) if value is not None]
+    needles = [_raw_filter(value) for _, value in filters]
+    
+    yielded = 0
+    with open(dataset_path, 'rb') as f:
+        for line in f:
+            if not line.strip() or not all(any(form in line for form in forms) for forms in needles):
+                continue
+            
+            scenario = Scenario(json.loads(line))
+            fields = {
+                'condition': scenario.get('condition'),
+                'risk_flag': scenario.get('risk_flag'),
+                'severity': (scenario.get('session_state') or {}).get('severity')
+            }
+            if any(fields[field] != value for field, value in filters):
+                continue
+            
+            yield scenario
+            yielded += 1
+            if limit is not None and yielded >= limit:
+                return
+
+
+class ScenarioDataset:
+    """
+    Byte-offset index over the JSONL dataset
+    
+    One pass over the file records where each session starts, which session
+    is the first of each patient_id and which sessions belong to each
+    condition (both fields are extracted from the raw line, not a full JSON
+    parse). Lookups then seek to a single line and parse only that session.
+    The index is rebuilt automatically when the file's size or modification
+    time changes.
+    """
+    
+    def __init__(self, file_path: str = 'data/synthetic_mental_health_dataset.jsonl'):
+        """
+        Args:
+            file_path: Path to the JSONL file
+        """
+        self.file_path = file_path
+        self._fingerprint = None
+        self._offsets = np.zeros(0, dtype=np.int64)
+        self._by_patient_id: Dict = {}
+        self._by_condition: Dict = {}
+        self._lock = threading.Lock()
+    
+    def _current_fingerprint(self) -> Tuple[int, int]:
+        stat = os.stat(self.file_path)
+        return stat.st_size, stat.st_mtime_ns
+    
+    def _ensure_index(self):
+        """(Re)build the index if the file changed since it was built"""
+        fingerprint = self._current_fingerprint()
+        if fingerprint == self._fingerprint:
+            return
+        with self._lock:
+            if fingerprint != self._fingerprint:
+                self._build_index()
+                self._fingerprint = fingerprint
+    
+    def _build_index(self):
+        offsets = []
+        by_patient_id = {}
+        by_condition = {}
+        with open(self.file_path, 'rb') as f:
+            offset = 0
+            for line in f:
+                if line.strip():
+                    position = len(offsets)
+                    offsets.append(offset)
+                    patient_id, condition = _index_fields(line)
+                    # First occurrence wins, like a linear scan
+                    if _is_key(patient_id) and patient_id not in by_patient_id:
+                        by_patient_id[patient_id] = position
+                    if condition and _is_key(condition):
+                        by_condition.setdefault(condition, []).append(position)
+                offset += len(line)
+        
+        # Swapped in whole so lookups never see a half-built index
+        self._offsets = np.asarray(offsets, dtype=np.int64)
+        self._by_patient_id = by_patient_id
+        self._by_condition = by_condition
+    
+    def __len__(self):
+        self._ensure_index()
+        return len(self._offsets)
+    
+    def _read(self, f, position: int) -> Dict:
+        f.seek(int(self._offsets[position]))
+        session = json.loads(f.readline())
+        session['turns'] = parse_conversation_turns(session['input'])
+        return session
+    
+    def get(self, position: int) -> Dict:
+        """
+        Session at a position in the file
+        
+        Args:
+            position: Zero-based line index
+            
+        Returns:
+            Session dictionary with parsed turns
+        """
+        return self.get_many([position])[0]
+    
+    def get_many(self, positions: List[int]) -> List[Dict]:
+        """
+        Sessions at several positions (one file handle for all seeks)
+        
+        Args:
+            positions: Zero-based line indexes
+            
+        Returns:
+            Session dictionaries with parsed turns, in the order of positions
+        """
+        self._ensure_index()
+        with open(self.file_path, 'rb') as f:
+            return [self._read(f, position) for position in positions]
+    
+    def position_of(self, patient_id) -> Optional[int]:
+        """
+        Position of the first session of a patient
+        
+        Args:
+            patient_id: Patient ID
+            
+        Returns:
+            Zero-based line index, or None if unknown
+        """
+        self._ensure_index()
+        if not _is_key(patient_id):
+            return None
+        return self._by_patient_id.get(patient_id)
+    
+    def positions(self, condition: str = None) -> List[int]:
+        """
+        Positions of all sessions, or of one condition's sessions
+        
+        Args:
+            condition: Filter by condition (all sessions when None)
+            
+        Returns:
+            Zero-based line indexes in file order
+        """
+        self._ensure_index()
+        if condition:
+            if not _is_key(condition):
+                return []
+            return list(self._by_condition.get(condition, []))
+        return list(range(len(self._offsets)))
+
+
+def session_summary_row(session: Dict, turns: List[Dict] = None) -> Dict:
+    """
+    Summary fields of one session
+    
+    Args:
+        session: Session dictionary
+        turns: Already parsed turns (parsed from 'input' when None)
+        
+    Returns:
+        Dict with patient_id, condition, session_id, num_turns, risk_flag and severity
+    """
+    if turns is None:
+        turns = parse_conversation_turns(session['input'])
+    return {
+        'patient_id': session.get('patient_id'),
+        'condition': session.get('condition'),
+        'session_id': session.get('session_id'),
+        'num_turns': len(turns),
+        'risk_flag': session.get('risk_flag'),
+        'severity': session.get('session_state', {}).get('severity', 'N/A')
+    }
+
+
+# One index per dataset file, shared by every caller in the process
+_datasets: Dict[str, ScenarioDataset] = {}
+_datasets_lock = threading.Lock()
+
+
+def get_dataset(dataset_path: str = 'data/synthetic_mental_health_dataset.jsonl') -> ScenarioDataset:
+    """
+    Shared indexed dataset for a file
+    
+    Args:
+        dataset_path: Path to dataset
+        
+    Returns:
+        ScenarioDataset instance (index built on first lookup)
+    """
+    key = os.path.abspath(dataset_path)
+    with _datasets_lock:
+        dataset = _datasets.get(key)
+        if dataset is None:
+            dataset = _datasets[key] = ScenarioDataset(dataset_path)
+    return dataset
+
+
 def get_scenario_by_id(scenario_id: str, dataset_path: str = 'data/synthetic_mental_health_dataset.jsonl') -> Dict:
     """
     Get a specific scenario by patient_id or index
@@ -73,21 +391,18 @@ def get_scenario_by_id(scenario_id: str, dataset_path: str = 'data/synthetic_men
     Returns:
         Session dictionary with parsed turns
     """
-    sessions = load_dataset(dataset_path)
+    dataset = get_dataset(dataset_path)
     
     # Try to find by patient_id
-    for session in sessions:
-        if session.get('patient_id') == scenario_id:
-            session['turns'] = parse_conversation_turns(session['input'])
-            return session
+    position = dataset.position_of(scenario_id)
+    if position is not None:
+        return dataset.get(position)
     
     # Try as index
     try:
         idx = int(scenario_id)
-        if 0 <= idx < len(sessions):
-            session = sessions[idx]
-            session['turns'] = parse_conversation_turns(session['input'])
-            return session
+        if 0 <= idx < len(dataset):
+            return dataset.get(idx)
     except:
         pass
     
@@ -108,21 +423,17 @@ def get_all_scenarios(dataset_path: str = 'data/synthetic_mental_health_dataset.
     Returns:
         List of session dictionaries with parsed turns
     """
-    sessions = load_dataset(dataset_path)
+    dataset = get_dataset(dataset_path)
     
     # Filter by condition if specified
-    if condition:
-        sessions = [s for s in sessions if s.get('condition') == condition]
+    positions = dataset.positions(condition)
     
     # Limit if specified
     if limit:
-        sessions = sessions[:limit]
+        positions = positions[:limit]
     
-    # Parse turns for each session
-    for session in sessions:
-        session['turns'] = parse_conversation_turns(session['input'])
-    
-    return sessions
+    # Read (and parse turns for) only the selected sessions
+    return dataset.get_many(positions)
 
 
 def get_scenario_summary(dataset_path: str = 'data/synthetic_mental_health_dataset.jsonl') -> pd.DataFrame:
@@ -132,21 +443,9 @@ def get_scenario_summary(dataset_path: str = 'data/synthetic_mental_health_datas
     Returns:
         DataFrame with scenario counts by condition, session, etc.
     """
-    sessions = load_dataset(dataset_path)
-    
-    summary_data = []
-    for session in sessions:
-        turns = parse_conversation_turns(session['input'])
-        summary_data.append({
-            'patient_id': session.get('patient_id'),
-            'condition': session.get('condition'),
-            'session_id': session.get('session_id'),
-            'num_turns': len(turns),
-            'risk_flag': session.get('risk_flag'),
-            'severity': session.get('session_state', {}).get('severity', 'N/A')
-        })
-    
-    return pd.DataFrame(summary_data)
+    # Imported here: the columnar cache is built on top of this module
+    from benchmark.dataset_cache import load_dataset_cache
+    return load_dataset_cache(dataset_path).summary()
 
 
 if __name__ == '__main__':
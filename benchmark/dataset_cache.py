@@ -0,0 +1,327 @@
+"""
+Columnar Dataset Cache
+
+One-time conversion of the JSONL therapy dataset into Parquet with the
+conversation turns already parsed, so loading the dataset no longer repeats
+JSON parsing and parse_conversation_turns string splitting. Summary
+statistics and condition filters run as vectorized column operations. The
+cache is rebuilt automatically whenever the source file changes.
+
+On-disk layout (one directory per dataset file under DATASET_CACHE_DIR):
+    manifest.json     - format version, absolute path and fingerprint of the source dataset
+    sessions.parquet  - one row per session: position, summary fields and one
+                        "record.<field>" column per top-level field of the
+                        session record (nested or irregular fields as JSON text)
+    turns.parquet     - one row per turn: position, turn, patient, doctor
+
+Build explicitly with:
+    python -m benchmark.dataset_cache
+"""
+
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from benchmark.config import DATASET_CACHE_DIR, DATASET_PATH
+from benchmark.data_loader import parse_conversation_turns, session_summary_row
+
+CACHE_FORMAT_VERSION = 3
+
+# Columns returned by DatasetCache.summary (same as data_loader.get_scenario_summary)
+SUMMARY_COLUMNS = ['patient_id', 'condition', 'session_id', 'num_turns', 'risk_flag', 'severity']
+
+# Prefix of the columns holding the session record fields
+RECORD_PREFIX = 'record.'
+
+# Value types stored as native Parquet columns (everything else is stored as JSON text)
+_NATIVE_TYPES = (str, int, float, bool)
+
+
+def _dataset_fingerprint(dataset_path: str) -> Dict:
+    """Size and modification time identifying one version of the dataset file"""
+    stat = os.stat(dataset_path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def dataset_cache_dir(dataset_path: str = DATASET_PATH, cache_root: str = DATASET_CACHE_DIR) -> str:
+    """
+    Cache directory of one dataset file (each file gets its own, so caches of
+    different datasets never overwrite each other)
+
+    Args:
+        dataset_path: Path to the JSONL dataset
+        cache_root: Directory holding the per-dataset caches
+
+    Returns:
+        "<file name>-<hash of the absolute path>" under cache_root
+    """
+    absolute_path = os.path.abspath(dataset_path)
+    name = os.path.splitext(os.path.basename(absolute_path))[0]
+    digest = hashlib.blake2b(absolute_path.encode('utf-8'), digest_size=6).hexdigest()
+    return os.path.join(cache_root, f"{name}-{digest}")
+
+
+def _write_parquet(frame: pd.DataFrame, path: str):
+    """Write a Parquet file atomically (readers never see a partial file)"""
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    frame.to_parquet(temp_path, index=False)
+    os.replace(temp_path, path)
+
+
+def _record_fields(sessions: List[Dict]) -> List[Dict]:
+    """
+    Storage plan for the top-level record fields
+
+    A field gets a native column when every session has it with the same
+    scalar type (so it round-trips exactly); any other field, including nested
+    ones, is stored as JSON text, with null marking a session without the field.
+
+    Returns:
+        List of {'name': field, 'json': bool} in first-seen order
+    """
+    names = {}
+    for session in sessions:
+        for name in session:
+            names.setdefault(name, None)
+
+    fields = []
+    for name in names:
+        types = {type(session[name]) if name in session else None for session in sessions}
+        native = (len(types) == 1 and next(iter(types)) in _NATIVE_TYPES
+                  and not (int in types and any(abs(session[name]) >= 2 ** 63 for session in sessions)))
+        fields.append({'name': name, 'json': not native})
+    return fields
+
+
+def build_dataset_cache(dataset_path: str = DATASET_PATH, cache_dir: str = None) -> int:
+    """
+    Convert the JSONL dataset into the columnar cache
+
+    Args:
+        dataset_path: Path to the JSONL dataset
+        cache_dir: Directory to write the cache into (dataset_cache_dir(dataset_path) when None)
+
+    Returns:
+        Number of sessions cached
+    """
+    cache_dir = cache_dir or dataset_cache_dir(dataset_path)
+    os.makedirs(cache_dir, exist_ok=True)
+    fingerprint = _dataset_fingerprint(dataset_path)
+
+    records, rows, turns = [], [], []
+    with open(dataset_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            session = json.loads(line)
+            # Turns are rebuilt from turns.parquet, as the loaders rebuild them from 'input'
+            session.pop('turns', None)
+            position = len(records)
+            session_turns = parse_conversation_turns(session['input'])
+            records.append(session)
+            rows.append({'position': position, **session_summary_row(session, session_turns)})
+            turns.extend({'position': position, **turn} for turn in session_turns)
+
+    sessions = pd.DataFrame(rows, columns=['position'] + SUMMARY_COLUMNS)
+    fields = _record_fields(records)
+    for field in fields:
+        name = field['name']
+        if field['json']:
+            values = [json.dumps(record[name], ensure_ascii=False) if name in record else None for record in records]
+        else:
+            values = [record[name] for record in records]
+        sessions[RECORD_PREFIX + name] = pd.Series(values, dtype=object if field['json'] else None)
+
+    _write_parquet(sessions, os.path.join(cache_dir, 'sessions.parquet'))
+    _write_parquet(pd.DataFrame(turns, columns=['position', 'turn', 'patient', 'doctor']),
+                   os.path.join(cache_dir, 'turns.parquet'))
+
+    # Manifest last: a cache without a matching one is rebuilt
+    manifest = {
+        'version': CACHE_FORMAT_VERSION,
+        'dataset_path': os.path.abspath(dataset_path),
+        'dataset': fingerprint,
+        'count': len(records),
+        'fields': fields
+    }
+    with open(os.path.join(cache_dir, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+
+    return len(records)
+
+
+# Marks a record field a session does not have
+_MISSING = object()
+
+
+class DatasetCache:
+    """
+    Sessions and pre-parsed turns loaded from the columnar cache
+    """
+
+    def __init__(self, cache_dir: str = None):
+        """
+        Load the cache tables
+
+        Args:
+            cache_dir: Cache directory (the default dataset's when None)
+        """
+        cache_dir = cache_dir or dataset_cache_dir()
+        self.cache_dir = cache_dir
+        with open(os.path.join(cache_dir, 'manifest.json'), 'r', encoding='utf-8') as f:
+            self.manifest = json.load(f)
+        self.sessions = pd.read_parquet(os.path.join(cache_dir, 'sessions.parquet'))
+        self.turns = pd.read_parquet(os.path.join(cache_dir, 'turns.parquet'))
+
+        # Turns are stored grouped by session, so each session's turns are one slice
+        self._turn_positions = self.turns['position'].to_numpy()
+
+    def __len__(self):
+        return len(self.sessions)
+
+    def summary(self) -> pd.DataFrame:
+        """
+        Per-session summary (same columns as data_loader.get_scenario_summary)
+
+        Returns:
+            DataFrame with patient_id, condition, session_id, num_turns, risk_flag and severity
+        """
+        return self.sessions[SUMMARY_COLUMNS].copy()
+
+    def condition_counts(self) -> pd.Series:
+        """
+        Number of sessions per condition
+
+        Returns:
+            Series indexed by condition
+        """
+        return self.sessions.groupby('condition', dropna=False).size()
+
+    def select(self, condition: str = None, limit: int = None) -> np.ndarray:
+        """
+        Positions of the sessions matching a condition filter
+
+        Args:
+            condition: Filter by condition (all sessions when None)
+            limit: Maximum number of positions to return
+
+        Returns:
+            Array of session positions in file order
+        """
+        positions = self.sessions['position'].to_numpy()
+        if condition:
+            positions = positions[(self.sessions['condition'] == condition).to_numpy()]
+        if limit:
+            positions = positions[:limit]
+        return positions
+
+    def session_turns(self, position: int) -> List[Dict]:
+        """
+        Parsed turns of one session
+
+        Args:
+            position: Session position in the dataset file
+
+        Returns:
+            List of dicts with turn, patient and doctor
+        """
+        start, end = np.searchsorted(self._turn_positions, [position, position + 1])
+        return self.turns.iloc[start:end][['turn', 'patient', 'doctor']].to_dict('records')
+
+    def scenarios(self, condition: str = None, limit: int = None) -> List[Dict]:
+        """
+        Sessions with their turns, optionally filtered by condition
+
+        Args:
+            condition: Filter by condition (e.g., 'depression', 'anxiety')
+            limit: Maximum number of scenarios to return
+
+        Returns:
+            List of session dictionaries with parsed turns (as get_all_scenarios)
+        """
+        positions = self.select(condition, limit)
+
+        # Record fields of the selected sessions, column by column
+        columns = []
+        for field in self.manifest['fields']:
+            values = self.sessions[RECORD_PREFIX + field['name']].to_numpy()[positions].tolist()
+            if field['json']:
+                # Sessions without the field read back as a missing value (None or NaN), never as text
+                values = [json.loads(value) if isinstance(value, str) else _MISSING for value in values]
+            columns.append((field['name'], values))
+
+        # Turns are stored grouped by session: one slice of each turn column per session
+        starts = np.searchsorted(self._turn_positions, positions, side='left')
+        ends = np.searchsorted(self._turn_positions, positions, side='right')
+        turn_numbers = self.turns['turn'].to_numpy()
+        patients = self.turns['patient'].to_numpy()
+        doctors = self.turns['doctor'].to_numpy()
+
+        scenarios = []
+        for row, (start, end) in enumerate(zip(starts, ends)):
+            session = {name: values[row] for name, values in columns if values[row] is not _MISSING}
+            session['turns'] = [
+                {'turn': turn, 'patient': patient, 'doctor': doctor}
+                for turn, patient, doctor in zip(
+                    turn_numbers[start:end].tolist(), patients[start:end].tolist(), doctors[start:end].tolist()
+                )
+            ]
+            scenarios.append(session)
+        return scenarios
+
+
+# Loaded caches per (dataset path, cache root), reused while the source file is unchanged
+_loaded: Dict[Tuple[str, str], DatasetCache] = {}
+_loaded_lock = threading.Lock()
+
+
+def _read_manifest(cache_dir: str) -> Optional[Dict]:
+    try:
+        with open(os.path.join(cache_dir, 'manifest.json'), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def load_dataset_cache(dataset_path: str = DATASET_PATH, cache_dir: str = DATASET_CACHE_DIR) -> DatasetCache:
+    """
+    Load the columnar cache of a dataset, (re)building it first when missing or stale
+
+    Args:
+        dataset_path: Path to the JSONL dataset the cache mirrors
+        cache_dir: Directory holding the per-dataset caches (see dataset_cache_dir)
+
+    Returns:
+        DatasetCache for the current version of the dataset
+    """
+    absolute_path = os.path.abspath(dataset_path)
+    fingerprint = _dataset_fingerprint(dataset_path)
+    key = (absolute_path, os.path.abspath(cache_dir))
+    with _loaded_lock:
+        cache = _loaded.get(key)
+        if cache is not None and cache.manifest.get('dataset') == fingerprint:
+            return cache
+
+        directory = dataset_cache_dir(dataset_path, cache_dir)
+        manifest = _read_manifest(directory)
+        if (manifest is None
+                or manifest.get('version') != CACHE_FORMAT_VERSION
+                or manifest.get('dataset_path') != absolute_path
+                or manifest.get('dataset') != fingerprint):
+            build_dataset_cache(dataset_path, directory)
+
+        cache = _loaded[key] = DatasetCache(directory)
+        return cache
+
+
+if __name__ == '__main__':
+    import time
+
+    start = time.perf_counter()
+    count = build_dataset_cache()
+    print(f"✅ Cached {count} sessions into {dataset_cache_dir()} in {time.perf_counter() - start:.2f}s")
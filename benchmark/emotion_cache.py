@@ -0,0 +1,228 @@
+"""
+Emotion Vector Cache
+
+Content-addressed cache for emotion model outputs, keyed by model identifier
+and a hash of the text. Vectors hold the model's label scores aligned to
+RELEVANT_EMOTIONS (unweighted, so EMOTION_WEIGHTS can change without
+invalidating them) and live in two layers:
+
+- memory: bounded LRU of recently used vectors
+- disk:   append-only float32 matrix (memory-mapped on read) plus a
+          "key row" index, one directory per model, shared by every run
+          and by the app
+"""
+
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, List
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: appends are only serialized within a process
+    fcntl = None
+
+from benchmark.config import (
+    EMOTION_CACHE_DIR, EMOTION_CACHE_MEMORY_ITEMS, EMOTION_MODEL_NAME, RELEVANT_EMOTIONS
+)
+
+
+def text_hash(text: str) -> str:
+    """
+    Content hash used as the cache key for a text
+
+    Args:
+        text: Input text
+
+    Returns:
+        Hex digest of the UTF-8 encoded text
+    """
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+
+class EmotionVectorCache:
+    """
+    Two-layer (memory + memory-mapped disk) cache of emotion vectors for one model
+    """
+
+    def __init__(self,
+                 model_id: str = EMOTION_MODEL_NAME,
+                 cache_dir: str = EMOTION_CACHE_DIR,
+                 memory_items: int = EMOTION_CACHE_MEMORY_ITEMS,
+                 persist: bool = True):
+        """
+        Initialize the cache and load the on-disk key index
+
+        Args:
+            model_id: Emotion model identifier (vectors are never shared across models)
+            cache_dir: Root directory of the on-disk layer
+            memory_items: Maximum vectors held in the in-memory LRU
+            persist: Whether to read and append the on-disk layer
+        """
+        self.model_id = model_id
+        self.dims = len(RELEVANT_EMOTIONS)
+        self.memory_items = memory_items
+        self.persist = persist
+
+        # Separate directory per model and emotion layout
+        layout = hashlib.blake2b(
+            '|'.join(RELEVANT_EMOTIONS).encode('utf-8'), digest_size=4
+        ).hexdigest()
+        slug = re.sub(r'[^A-Za-z0-9_.-]+', '_', model_id)
+        self.directory = os.path.join(cache_dir, f"{slug}-{layout}")
+        self.vectors_path = os.path.join(self.directory, 'vectors.f32')
+        self.keys_path = os.path.join(self.directory, 'keys.txt')
+
+        self._memory = OrderedDict()
+        self._disk_rows: Dict[str, int] = {}
+        self._disk_vectors = None
+        self._lock = threading.Lock()
+
+        if self.persist:
+            self._load_index()
+
+    def _load_index(self):
+        """Read the key index, keeping only rows fully present in the vector file"""
+        if not os.path.exists(self.keys_path) or not os.path.exists(self.vectors_path):
+            return
+
+        complete_rows = os.path.getsize(self.vectors_path) // (self.dims * 4)
+        with open(self.keys_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) == 2 and parts[1].isdigit() and int(parts[1]) < complete_rows:
+                    self._disk_rows[parts[0]] = int(parts[1])
+
+    def _disk_matrix(self):
+        """Memory-map the on-disk vectors (re-mapped after appends)"""
+        if self._disk_vectors is None and self._disk_rows:
+            rows = max(self._disk_rows.values()) + 1
+            self._disk_vectors = np.memmap(
+                self.vectors_path, dtype=np.float32, mode='r', shape=(rows, self.dims)
+            )
+        return self._disk_vectors
+
+    def get(self, text: str):
+        """
+        Look up the emotion vector for a text
+
+        Args:
+            text: Input text
+
+        Returns:
+            Unweighted vector aligned to RELEVANT_EMOTIONS, or None on a miss
+        """
+        return self.get_many([text])[0]
+
+    def get_many(self, texts: List[str]) -> List:
+        """
+        Look up emotion vectors for many texts
+
+        Args:
+            texts: Input texts
+
+        Returns:
+            List aligned with texts holding a vector or None for each miss
+        """
+        results = []
+        with self._lock:
+            for text in texts:
+                key = text_hash(text)
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                elif key in self._disk_rows:
+                    vector = np.array(self._disk_matrix()[self._disk_rows[key]], dtype=np.float64)
+                    self._remember(key, vector)
+                results.append(vector)
+        return results
+
+    def put_many(self, texts: List[str], vectors: np.ndarray):
+        """
+        Store emotion vectors for texts in memory and append new ones to disk
+
+        Args:
+            texts: Input texts
+            vectors: Matrix of unweighted vectors, one row per text
+        """
+        new_keys, new_rows = [], []
+        with self._lock:
+            for text, vector in zip(texts, vectors):
+                key = text_hash(text)
+                vector = np.asarray(vector, dtype=np.float64)
+                self._remember(key, vector)
+                if self.persist and key not in self._disk_rows and key not in new_keys:
+                    new_keys.append(key)
+                    new_rows.append(vector)
+
+            if new_keys:
+                self._append_to_disk(new_keys, np.array(new_rows, dtype=np.float32))
+
+    def _remember(self, key: str, vector: np.ndarray):
+        """Insert into the in-memory LRU, evicting the oldest entries"""
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def _append_to_disk(self, keys: List[str], rows: np.ndarray):
+        """Append vectors, then their index entries, so the index never points past the data"""
+        os.makedirs(self.directory, exist_ok=True)
+        row_bytes = self.dims * 4
+
+        with open(self.vectors_path, 'ab') as f:
+            # Hold an exclusive lock so parallel evaluation workers never claim the same rows
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                # Drop a partially written row left by an interrupted append
+                size = f.seek(0, os.SEEK_END)
+                if size % row_bytes:
+                    f.truncate(size - size % row_bytes)
+                    size -= size % row_bytes
+                    f.seek(size)
+                first_row = size // row_bytes
+                f.write(rows.tobytes())
+                f.flush()
+
+                with open(self.keys_path, 'a', encoding='utf-8') as keys_file:
+                    keys_file.write(''.join(f"{key} {first_row + offset}\n" for offset, key in enumerate(keys)))
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+        for offset, key in enumerate(keys):
+            self._disk_rows[key] = first_row + offset
+        self._disk_vectors = None
+
+    def clear_memory(self):
+        """Drop the in-memory layer (the on-disk layer is kept)"""
+        with self._lock:
+            self._memory.clear()
+
+    def __len__(self):
+        return len(set(self._memory) | set(self._disk_rows))
+
+
+# Process-wide default cache
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_emotion_cache() -> EmotionVectorCache:
+    """
+    Shared emotion vector cache for the configured emotion model
+
+    Returns:
+        EmotionVectorCache instance (created on first use)
+    """
+    global _default_cache
+    if _default_cache is None:
+        with _default_cache_lock:
+            if _default_cache is None:
+                _default_cache = EmotionVectorCache()
+    return _default_cache
@@ -0,0 +1,326 @@
+"""
+Local Azure OpenAI Stand-In Server
+
+Small HTTP server implementing the chat completions endpoint the openai SDK
+calls for Azure deployments (plain JSON and SSE streaming), so the clients,
+concurrency and evaluation pipeline can be load-tested without quota or
+network access. Supports:
+
+- latency: fixed or lognormal time to first token
+- throughput: tokens per second for the generated text
+- fault injection: 429 (with Retry-After) and 500 responses at given rates
+- responses: echo of the last user message or canned counselor replies
+
+Usage:
+    python -m benchmark.fake_azure_server --port 8765 --latency-ms 400 --rate-429 0.05
+
+then point a client at endpoint http://127.0.0.1:8765 with any api key.
+"""
+
+import argparse
+import itertools
+import json
+import math
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Sequence
+
+# Path shape used by the SDK: /openai/deployments/{deployment}/chat/completions
+COMPLETIONS_PATH_RE = re.compile(r'^(?:/openai/deployments/(?P<deployment>[^/]+))?/chat/completions$')
+
+# Generated text is split into these pieces; each counts as one token
+_TOKEN_RE = re.compile(r'\s*\S+')
+
+DEFAULT_CANNED_RESPONSES = [
+    "Thank you for sharing that with me. It sounds like you've been carrying a lot. "
+    "Can you tell me more about what has been most difficult for you this week?",
+    "I hear how hard this has been, and your feelings make sense. "
+    "What has helped you cope when things felt this heavy before?",
+    "It takes courage to talk about this. I want to make sure you're safe: "
+    "have you had any thoughts of hurting yourself?",
+    "You deserve support and respect for who you are. "
+    "Who in your life feels safe to talk to about this?",
+]
+
+
+class FakeAzureServer:
+    """
+    Threaded HTTP server answering chat completion requests with simulated latency and faults
+    """
+
+    def __init__(self,
+                 host: str = '127.0.0.1',
+                 port: int = 0,
+                 latency_ms: float = 300.0,
+                 latency_jitter: float = 0.0,
+                 tokens_per_second: float = 50.0,
+                 rate_429: float = 0.0,
+                 rate_500: float = 0.0,
+                 retry_after: float = 1.0,
+                 mode: str = 'canned',
+                 canned_responses: Sequence[str] = None,
+                 seed: int = None):
+        """
+        Args:
+            host: Interface to bind
+            port: Port to bind (0 picks a free port)
+            latency_ms: Median time to first token in milliseconds
+            latency_jitter: Lognormal sigma of the latency (0 = fixed latency)
+            tokens_per_second: Generation speed (0 = send the whole text at once)
+            rate_429: Fraction of requests answered with 429 Too Many Requests
+            rate_500: Fraction of requests answered with 500 Internal Server Error
+            retry_after: Retry-After seconds sent with 429 responses
+            mode: 'echo' (repeat the last user message) or 'canned' (cycle canned_responses)
+            canned_responses: Replies used in canned mode (defaults to counselor-style replies)
+            seed: Random seed for latency and fault injection
+        """
+        if mode not in ('echo', 'canned'):
+            raise ValueError(f"Unknown response mode {mode!r}; expected 'echo' or 'canned'")
+        self.latency_ms = latency_ms
+        self.latency_jitter = latency_jitter
+        self.tokens_per_second = tokens_per_second
+        self.rate_429 = rate_429
+        self.rate_500 = rate_500
+        self.retry_after = retry_after
+        self.mode = mode
+        self._canned = itertools.cycle(list(canned_responses or DEFAULT_CANNED_RESPONSES))
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.stats = {'requests': 0, 'streamed': 0, 'throttled': 0, 'errors': 0, 'in_flight': 0, 'peak_in_flight': 0}
+
+        self._httpd = ThreadingHTTPServer((host, port), _make_handler(self))
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        """Endpoint URL to pass to the client"""
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'FakeAzureServer':
+        """Serve in a background thread"""
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        """Serve in the calling thread until interrupted"""
+        self._httpd.serve_forever()
+
+    def stop(self):
+        """Stop serving and close the socket"""
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _count(self, name: str, delta: int = 1):
+        with self._lock:
+            self.stats[name] += delta
+            if name == 'in_flight':
+                self.stats['peak_in_flight'] = max(self.stats['peak_in_flight'], self.stats['in_flight'])
+
+    def draw_latency(self) -> float:
+        """Time to first token in seconds"""
+        with self._lock:
+            factor = math.exp(self._random.gauss(0, self.latency_jitter)) if self.latency_jitter > 0 else 1.0
+        return self.latency_ms * factor / 1000
+
+    def draw_fault(self):
+        """HTTP status to inject for the next request, or None"""
+        with self._lock:
+            draw = self._random.random()
+        if draw < self.rate_429:
+            return 429
+        if draw < self.rate_429 + self.rate_500:
+            return 500
+        return None
+
+    def response_text(self, messages: List[Dict]) -> str:
+        """Reply for a request according to the mode"""
+        if self.mode == 'echo':
+            user_messages = [message.get('content') or '' for message in messages if message.get('role') == 'user']
+            return f"You said: {user_messages[-1] if user_messages else ''}"
+        with self._lock:
+            return next(self._canned)
+
+
+def _count_tokens(text: str) -> int:
+    """Approximate token count (about 4 characters per token)"""
+    return max(1, (len(text) + 3) // 4)
+
+
+def _make_handler(server: FakeAzureServer):
+    """Request handler class bound to a server's settings"""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send_json(self, status: int, payload: Dict, headers: Dict = None):
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _send_error(self, status: int, code: str, message: str, headers: Dict = None):
+            self._send_json(status, {'error': {'code': code, 'message': message}}, headers)
+
+        def do_POST(self):
+            match = COMPLETIONS_PATH_RE.match(self.path.split('?', 1)[0])
+            length = int(self.headers.get('Content-Length') or 0)
+            raw_body = self.rfile.read(length)
+            if match is None:
+                self._send_error(404, 'NotFound', f"Unknown path {self.path}")
+                return
+            try:
+                request = json.loads(raw_body or b'{}')
+            except json.JSONDecodeError:
+                self._send_error(400, 'BadRequest', 'Request body is not valid JSON')
+                return
+
+            server._count('requests')
+            server._count('in_flight')
+            try:
+                self._complete(request, match.group('deployment') or request.get('model') or 'fake')
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # Client gave up (timeout or cancelled stream)
+            finally:
+                server._count('in_flight', -1)
+
+        def _complete(self, request: Dict, deployment: str):
+            fault = server.draw_fault()
+            if fault == 429:
+                server._count('throttled')
+                self._send_error(
+                    429, '429', 'Requests to the deployment have exceeded the rate limit.',
+                    {'Retry-After': f"{server.retry_after:g}", 'retry-after-ms': str(int(server.retry_after * 1000))}
+                )
+                return
+            if fault == 500:
+                server._count('errors')
+                self._send_error(500, 'InternalServerError', 'The server had an error processing the request.')
+                return
+
+            messages = request.get('messages') or []
+            pieces = _TOKEN_RE.findall(server.response_text(messages))
+            finish_reason = 'stop'
+            max_tokens = request.get('max_tokens')
+            if max_tokens is not None and len(pieces) > max_tokens:
+                pieces, finish_reason = pieces[:max_tokens], 'length'
+
+            usage = {
+                'prompt_tokens': sum(_count_tokens(message.get('content') or '') for message in messages),
+                'completion_tokens': len(pieces)
+            }
+            usage['total_tokens'] = usage['prompt_tokens'] + usage['completion_tokens']
+            completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+            created = int(time.time())
+            token_delay = 1.0 / server.tokens_per_second if server.tokens_per_second > 0 else 0.0
+
+            time.sleep(server.draw_latency())
+
+            if request.get('stream'):
+                server._count('streamed')
+                self._stream(completion_id, created, deployment, pieces, finish_reason, token_delay)
+                return
+
+            time.sleep(token_delay * len(pieces))
+            self._send_json(200, {
+                'id': completion_id,
+                'object': 'chat.completion',
+                'created': created,
+                'model': deployment,
+                'choices': [{
+                    'index': 0,
+                    'message': {'role': 'assistant', 'content': ''.join(pieces)},
+                    'finish_reason': finish_reason
+                }],
+                'usage': usage
+            })
+
+        def _stream(self, completion_id: str, created: int, deployment: str, pieces: List[str],
+                    finish_reason: str, token_delay: float):
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.send_header('Cache-Control', 'no-cache')
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+
+            def chunk(choices: List[Dict], **extra) -> Dict:
+                return {'id': completion_id, 'object': 'chat.completion.chunk', 'created': created,
+                        'model': deployment, 'choices': choices, **extra}
+
+            def send(payload):
+                data = b'data: ' + (payload if isinstance(payload, bytes) else json.dumps(payload).encode('utf-8')) + b'\n\n'
+                self.wfile.write(f"{len(data):x}\r\n".encode('ascii') + data + b'\r\n')
+                self.wfile.flush()
+
+            # Azure opens with a prompt-filter chunk that has no choices
+            send(chunk([], prompt_filter_results=[]))
+            send(chunk([{'index': 0, 'delta': {'role': 'assistant', 'content': ''}, 'finish_reason': None}]))
+            for piece in pieces:
+                if token_delay:
+                    time.sleep(token_delay)
+                send(chunk([{'index': 0, 'delta': {'content': piece}, 'finish_reason': None}]))
+            send(chunk([{'index': 0, 'delta': {}, 'finish_reason': finish_reason}]))
+            send(b'[DONE]')
+            self.wfile.write(b'0\r\n\r\n')
+            self.wfile.flush()
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local Azure OpenAI chat completions stand-in')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency-ms', type=float, default=300.0, help='Median time to first token')
+    parser.add_argument('--latency-jitter', type=float, default=0.0, help='Lognormal sigma of the latency (0 = fixed)')
+    parser.add_argument('--tokens-per-second', type=float, default=50.0, help='Generation speed (0 = instant)')
+    parser.add_argument('--rate-429', type=float, default=0.0, help='Fraction of requests throttled')
+    parser.add_argument('--rate-500', type=float, default=0.0, help='Fraction of requests failed')
+    parser.add_argument('--retry-after', type=float, default=1.0, help='Retry-After seconds on 429')
+    parser.add_argument('--mode', choices=['echo', 'canned'], default='canned')
+    parser.add_argument('--canned-file', help='Text file with one canned response per line')
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    canned = None
+    if args.canned_file:
+        with open(args.canned_file, 'r', encoding='utf-8') as f:
+            canned = [line.strip() for line in f if line.strip()]
+
+    server = FakeAzureServer(
+        host=args.host, port=args.port,
+        latency_ms=args.latency_ms, latency_jitter=args.latency_jitter,
+        tokens_per_second=args.tokens_per_second,
+        rate_429=args.rate_429, rate_500=args.rate_500, retry_after=args.retry_after,
+        mode=args.mode, canned_responses=canned, seed=args.seed
+    )
+    print(f"🧪 Fake Azure OpenAI serving at {server.url} (mode={args.mode}, latency={args.latency_ms:g}ms)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\n📊 {server.stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,322 @@
+"""
+Lexicon Phrase Matcher
+
+Finds every hit from all ethical-alignment and inclusivity lexicons in a single
+pass over a text. Lexicon terms and the text are tokenized the same way and
+terms are indexed by their token sequence, so matching is word-boundary aware
+("coming out" does not match "becoming outgoing"), multi-word phrases match
+like single words, and the cost per text depends on its length and the longest
+phrase, not on how many terms the lexicons hold.
+"""
+
+import re
+import threading
+from collections import Counter
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from benchmark.config import (
+    CORE_TERMS, CRISIS_ASSESSMENT_TERMS, ETHICAL_NEGATIVE_TERMS, INCLUSIVITY_LEXICON,
+    LGBTQ_AFFIRMING_TERMS, PENALTY_TERMS, QUESTION_PATTERNS, SECONDARY_TERMS,
+    SEVERE_PENALTY_TERMS, SOCIAL_WORK_PROFESSIONAL_TERMS, SUPPORTIVE_TERMS
+)
+
+# Words keep inner hyphens/apostrophes ("self-harm", "don't"); "+" is its own token ("lgbtq", "+")
+_TOKEN_RE = re.compile(r"\w+(?:[-']\w+)*|\+")
+
+# Lexicon categories matched by the shared matcher
+LEXICON_CATEGORIES = {
+    'lgbtq_affirming': LGBTQ_AFFIRMING_TERMS,
+    'social_work': SOCIAL_WORK_PROFESSIONAL_TERMS,
+    'crisis_assessment': CRISIS_ASSESSMENT_TERMS,
+    'supportive': SUPPORTIVE_TERMS,
+    'ethical_negative': ETHICAL_NEGATIVE_TERMS,
+    'question_patterns': QUESTION_PATTERNS,
+    'inclusivity': INCLUSIVITY_LEXICON,
+    'core': CORE_TERMS,
+    'secondary': SECONDARY_TERMS,
+    'penalty': PENALTY_TERMS,
+    'severe_penalty': SEVERE_PENALTY_TERMS
+}
+
+
+def tokenize_for_matching(text: str) -> List[str]:
+    """
+    Tokenize text (or a lexicon term) for phrase matching
+
+    Args:
+        text: Input text
+
+    Returns:
+        Lowercased tokens with curly apostrophes normalized
+    """
+    return _TOKEN_RE.findall(text.lower().replace('’', "'"))
+
+
+class LexiconMatcher:
+    """
+    Multi-pattern matcher over token sequences for a set of named lexicons
+    """
+
+    def __init__(self, categories: Dict[str, Iterable[str]]):
+        """
+        Index every term of every category by its token sequence
+
+        Args:
+            categories: Mapping of category name to lexicon terms
+        """
+        self.categories = list(categories)
+        self._patterns: Dict[Tuple[str, ...], List[Tuple[str, str]]] = {}
+        for category, terms in categories.items():
+            for term in terms:
+                key = tuple(tokenize_for_matching(term))
+                if key:
+                    self._patterns.setdefault(key, []).append((category, term))
+
+        # Only phrase lengths that actually occur are probed at each position
+        self._lengths = sorted({len(key) for key in self._patterns})
+
+    def match_tokens(self, tokens: List[str]) -> Dict[str, Counter]:
+        """
+        Find all lexicon hits in a token sequence (overlapping hits included)
+
+        Args:
+            tokens: Tokens from tokenize_for_matching
+
+        Returns:
+            Mapping of category to Counter of matched terms -> occurrences
+        """
+        hits = {category: Counter() for category in self.categories}
+        patterns = self._patterns
+        token_count = len(tokens)
+        for start in range(token_count):
+            for length in self._lengths:
+                if start + length > token_count:
+                    break
+                matches = patterns.get(tuple(tokens[start:start + length]))
+                if matches:
+                    for category, term in matches:
+                        hits[category][term] += 1
+        return hits
+
+    def match(self, text: str) -> Dict[str, Counter]:
+        """
+        Find all lexicon hits in a text
+
+        Args:
+            text: Input text
+
+        Returns:
+            Mapping of category to Counter of matched terms -> occurrences
+        """
+        return self.match_tokens(tokenize_for_matching(text))
+
+
+# Process-wide matcher over the config lexicons
+_default_matcher = None
+_default_matcher_lock = threading.Lock()
+
+
+def get_lexicon_matcher() -> LexiconMatcher:
+    """
+    Shared matcher for the ethical-alignment and inclusivity lexicons
+
+    Returns:
+        LexiconMatcher built from LEXICON_CATEGORIES (created on first use)
+    """
+    global _default_matcher
+    if _default_matcher is None:
+        with _default_matcher_lock:
+            if _default_matcher is None:
+                _default_matcher = LexiconMatcher(LEXICON_CATEGORIES)
+    return _default_matcher
+
+
+# Batch tokenization: texts are joined with NUL, which becomes its own token and marks document boundaries
+_BATCH_SEPARATOR = '\x00'
+_BATCH_TOKEN_RE = re.compile(_TOKEN_RE.pattern + '|' + _BATCH_SEPARATOR)
+
+
+class LexiconBatchMatcher:
+    """
+    Vectorized counterpart of LexiconMatcher for many texts at once
+
+    Texts become a sparse document x pattern count matrix (one column per
+    distinct term token sequence, multi-word phrases included). Lexicon tokens
+    are numbered from 1, every other token is 0, and each phrase of length n is
+    matched at all positions at once by combining n consecutive ids into a
+    single integer key. Per-category term counts and weighted occurrence sums
+    are then sparse matrix products, giving the same counts as match().
+    """
+
+    def __init__(self, categories: Dict[str, Iterable[str]], chunk_size: int = 10000):
+        """
+        Args:
+            categories: Mapping of category name to lexicon terms
+            chunk_size: Texts tokenized per pass (bounds peak memory)
+        """
+        self.categories = list(categories)
+        self.chunk_size = chunk_size
+        self._token_ids: Dict[str, int] = {}
+        pattern_columns: Dict[Tuple[int, ...], int] = {}
+        self._pattern_terms: List[List[Tuple[str, str]]] = []
+        for category, terms in categories.items():
+            for term in terms:
+                tokens = tokenize_for_matching(term)
+                if not tokens:
+                    continue
+                key = tuple(self._token_ids.setdefault(token, len(self._token_ids) + 1) for token in tokens)
+                column = pattern_columns.setdefault(key, len(pattern_columns))
+                if column == len(self._pattern_terms):
+                    self._pattern_terms.append([])
+                self._pattern_terms[column].append((category, term))
+
+        # Integer key of each pattern, per phrase length (sorted for searchsorted)
+        self._base = len(self._token_ids) + 1
+        longest = max((len(key) for key in pattern_columns), default=1)
+        if self._base ** longest >= 2 ** 63:
+            raise ValueError("Lexicon too large for 64-bit phrase keys")
+        self._keys_by_length = {}
+        for key, column in pattern_columns.items():
+            self._keys_by_length.setdefault(len(key), []).append((self._encode(key), column))
+        for length, entries in self._keys_by_length.items():
+            entries.sort()
+            self._keys_by_length[length] = (
+                np.array([code for code, _ in entries], dtype=np.int64),
+                np.array([column for _, column in entries], dtype=np.int64)
+            )
+
+        # Pattern -> term membership per category (distinct terms are the columns)
+        self._category_terms = {}
+        for category in self.categories:
+            terms = sorted({term for column_terms in self._pattern_terms
+                            for term_category, term in column_terms if term_category == category})
+            term_index = {term: index for index, term in enumerate(terms)}
+            rows, cols = [], []
+            for column, column_terms in enumerate(self._pattern_terms):
+                for term_category, term in column_terms:
+                    if term_category == category:
+                        rows.append(column)
+                        cols.append(term_index[term])
+            self._category_terms[category] = sparse.csr_matrix(
+                (np.ones(len(rows)), (rows, cols)), shape=(len(self._pattern_terms), len(terms))
+            )
+
+    def _encode(self, ids) -> int:
+        return sum(token_id * self._base ** offset for offset, token_id in enumerate(ids))
+
+    def count_matrix(self, texts: Sequence[str]) -> sparse.csr_matrix:
+        """
+        Occurrences of every lexicon pattern in every text (overlapping hits included)
+
+        Args:
+            texts: Input texts
+
+        Returns:
+            Sparse matrix, one row per text and one column per distinct term token sequence
+        """
+        blocks = [
+            self._count_chunk(texts[start:start + self.chunk_size])
+            for start in range(0, len(texts), self.chunk_size)
+        ]
+        if not blocks:
+            return sparse.csr_matrix((0, len(self._pattern_terms)))
+        return sparse.vstack(blocks, format='csr')
+
+    def _count_chunk(self, texts: Sequence[str]) -> sparse.csr_matrix:
+        # NUL behaves like whitespace for the per-text tokenizer, so replacing it keeps tokens identical
+        joined = _BATCH_SEPARATOR.join(text.replace(_BATCH_SEPARATOR, ' ') for text in texts)
+        tokens = _BATCH_TOKEN_RE.findall(joined.lower().replace('’', "'"))
+
+        lookup = self._token_ids.get
+        ids = np.fromiter(
+            (-1 if token == _BATCH_SEPARATOR else lookup(token, 0) for token in tokens),
+            dtype=np.int64, count=len(tokens)
+        )
+        separators = ids < 0
+        documents = np.cumsum(separators)
+        ids[separators] = 0
+
+        rows, cols = [], []
+        for length, (pattern_keys, pattern_columns) in self._keys_by_length.items():
+            windows = len(ids) - length + 1
+            if windows <= 0:
+                continue
+            valid = np.ones(windows, dtype=bool)
+            keys = np.zeros(windows, dtype=np.int64)
+            for offset in range(length):
+                window = ids[offset:offset + windows]
+                valid &= window > 0
+                keys += window * self._base ** offset
+            positions = np.flatnonzero(valid)
+            keys = keys[positions]
+            found = np.searchsorted(pattern_keys, keys)
+            found[found == len(pattern_keys)] = 0
+            hit = pattern_keys[found] == keys
+            rows.append(documents[positions[hit]])
+            cols.append(pattern_columns[found[hit]])
+
+        rows = np.concatenate(rows) if rows else np.zeros(0, dtype=np.int64)
+        cols = np.concatenate(cols) if cols else np.zeros(0, dtype=np.int64)
+        return sparse.csr_matrix(
+            (np.ones(len(rows)), (rows, cols)), shape=(len(texts), len(self._pattern_terms))
+        )
+
+    def distinct_terms(self, counts: sparse.csr_matrix, category: str) -> np.ndarray:
+        """
+        Number of distinct terms of a category found in each text (len(match(text)[category]))
+
+        Args:
+            counts: Matrix from count_matrix
+            category: Category name
+
+        Returns:
+            Integer array, one entry per text
+        """
+        term_counts = (counts @ self._category_terms[category]).tocsr()
+        term_counts.eliminate_zeros()
+        return term_counts.getnnz(axis=1)
+
+    def weighted_occurrences(self, counts: sparse.csr_matrix, categories: Iterable[str],
+                             weight: Callable[[str], float]) -> np.ndarray:
+        """
+        Sum of weight(term) * occurrences over the terms of some categories found in each text
+
+        A term listed under several of the categories is counted once, like a
+        union of the categories' Counters.
+
+        Args:
+            counts: Matrix from count_matrix
+            categories: Category names
+            weight: Weight of a term
+
+        Returns:
+            Float array, one entry per text
+        """
+        categories = set(categories)
+        pattern_weights = np.array([
+            sum(weight(term) for term in {term for category, term in column_terms if category in categories})
+            for column_terms in self._pattern_terms
+        ], dtype=np.float64)
+        return counts @ pattern_weights
+
+
+# Process-wide batch matcher over the config lexicons
+_default_batch_matcher = None
+
+
+def get_lexicon_batch_matcher() -> LexiconBatchMatcher:
+    """
+    Shared batch matcher for the ethical-alignment and inclusivity lexicons
+
+    Returns:
+        LexiconBatchMatcher built from LEXICON_CATEGORIES (created on first use)
+    """
+    global _default_batch_matcher
+    if _default_batch_matcher is None:
+        with _default_matcher_lock:
+            if _default_batch_matcher is None:
+                _default_batch_matcher = LexiconBatchMatcher(LEXICON_CATEGORIES)
+    return _default_batch_matcher
@@ -0,0 +1,265 @@
+"""
+Cached METEOR
+
+Reimplementation of nltk 3.8.1's meteor_score (exact, Porter-stem and WordNet
+synonym matching, fragmentation penalty) that returns identical scores while
+doing the expensive per-word work once per word instead of once per pair:
+
+- stems are memoized per word
+- synonym sets are memoized per (stemmed) word and persisted to a compact
+  JSON table, so a warm run never has to load the WordNet corpus
+- exact and stem matching use position maps instead of nested scans
+
+Alignment follows nltk exactly: hypothesis words are visited from last to
+first and each takes the last remaining reference word it matches, stage by
+stage, and the WordNet stage compares the stemmed words left over by the
+stem stage.
+"""
+
+import atexit
+import json
+import os
+import threading
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, Sequence, Tuple
+
+from benchmark.config import METEOR_ALPHA, METEOR_BETA, METEOR_GAMMA, METEOR_SYNONYM_CACHE_PATH
+from benchmark.resources import get_resource
+
+_porter_stemmer = None
+
+
+@lru_cache(maxsize=200000)
+def stem(word: str) -> str:
+    """
+    Porter stem of a lowercased word (as nltk's METEOR stems it)
+
+    Args:
+        word: Lowercased word
+
+    Returns:
+        Stemmed word
+    """
+    global _porter_stemmer
+    if _porter_stemmer is None:
+        from nltk.stem.porter import PorterStemmer
+        _porter_stemmer = PorterStemmer()
+    return _porter_stemmer.stem(word)
+
+
+def _wordnet_synonyms(word: str) -> FrozenSet[str]:
+    """Single-word lemma names of every WordNet synset of a word"""
+    wordnet = get_resource('wordnet')
+    return frozenset(
+        lemma.name()
+        for synset in wordnet.synsets(word)
+        for lemma in synset.lemmas()
+        if lemma.name().find('_') < 0
+    )
+
+
+class SynonymTable:
+    """
+    Memoized WordNet synonym sets, persisted as a compact JSON table
+    """
+
+    def __init__(self, path: str = METEOR_SYNONYM_CACHE_PATH):
+        """
+        Args:
+            path: JSON file holding {word: [synonyms]} (None keeps the table in memory only)
+        """
+        self.path = path
+        self._synonyms: Dict[str, FrozenSet[str]] = {}
+        self._new_words = 0
+        self._lock = threading.Lock()
+        self._loaded = False
+
+    def _load(self):
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            if self.path and os.path.exists(self.path):
+                try:
+                    with open(self.path, 'r', encoding='utf-8') as f:
+                        table = json.load(f)
+                    self._synonyms.update((word, frozenset(synonyms)) for word, synonyms in table.items())
+                except (OSError, ValueError):
+                    pass
+            self._loaded = True
+
+    def get(self, word: str) -> FrozenSet[str]:
+        """
+        Synonyms of a word, looked up in WordNet on first use
+
+        Args:
+            word: Stemmed, lowercased word
+
+        Returns:
+            Set of single-word lemma names (the word itself not included)
+        """
+        self._load()
+        synonyms = self._synonyms.get(word)
+        if synonyms is None:
+            synonyms = _wordnet_synonyms(word)
+            with self._lock:
+                self._synonyms[word] = synonyms
+                self._new_words += 1
+        return synonyms
+
+    def preload(self, words: Iterable[str]):
+        """
+        Fill the table for many words ahead of scoring
+
+        Args:
+            words: Lowercased (unstemmed) words; their stems are looked up
+        """
+        for word in set(words):
+            self.get(stem(word))
+
+    def save(self):
+        """Write the table if words were added since it was loaded (atomic replace)"""
+        if not self.path or not self._new_words:
+            return
+        with self._lock:
+            table = {word: sorted(synonyms) for word, synonyms in self._synonyms.items()}
+            self._new_words = 0
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(table, f, separators=(',', ':'))
+        os.replace(temp_path, self.path)
+
+    def __len__(self):
+        return len(self._synonyms)
+
+
+_synonym_table = SynonymTable()
+
+# Entries looked up by single-pair calls are written once, at interpreter exit
+atexit.register(_synonym_table.save)
+
+
+def get_synonym_table() -> SynonymTable:
+    """Shared synonym table"""
+    return _synonym_table
+
+
+def _match_exact(hypothesis: List[Tuple[int, str]], reference: List[Tuple[int, str]]):
+    """
+    nltk's _match_enums: each hypothesis word, last to first, takes the last
+    remaining reference word equal to it
+
+    Returns:
+        (matches, unmatched hypothesis, unmatched reference)
+    """
+    positions: Dict[str, List[int]] = {}
+    for j, (_, word) in enumerate(reference):
+        positions.setdefault(word, []).append(j)
+
+    matches, matched_hypothesis, matched_reference = [], set(), set()
+    for i in range(len(hypothesis) - 1, -1, -1):
+        candidates = positions.get(hypothesis[i][1])
+        if candidates:
+            j = candidates.pop()
+            matches.append((hypothesis[i][0], reference[j][0]))
+            matched_hypothesis.add(i)
+            matched_reference.add(j)
+
+    return (
+        matches,
+        [item for i, item in enumerate(hypothesis) if i not in matched_hypothesis],
+        [item for j, item in enumerate(reference) if j not in matched_reference]
+    )
+
+
+def _match_synonyms(hypothesis: List[Tuple[int, str]], reference: List[Tuple[int, str]],
+                    synonyms: SynonymTable):
+    """
+    nltk's _enum_wordnetsyn_match: each hypothesis word, last to first, takes
+    the last remaining reference word that is the word itself or one of its synonyms
+
+    Returns:
+        (matches, unmatched hypothesis, unmatched reference)
+    """
+    reference = list(reference)
+    remaining_words = Counter(word for _, word in reference)
+    matches, unmatched_hypothesis = [], []
+    for i in range(len(hypothesis) - 1, -1, -1):
+        position, word = hypothesis[i]
+        matched = False
+        # Skip the synonym lookup once no reference word is left
+        if remaining_words:
+            candidates = synonyms.get(word) | {word}
+            if not candidates.isdisjoint(remaining_words):
+                for j in range(len(reference) - 1, -1, -1):
+                    if reference[j][1] in candidates:
+                        matches.append((position, reference[j][0]))
+                        ref_word = reference.pop(j)[1]
+                        remaining_words[ref_word] -= 1
+                        if not remaining_words[ref_word]:
+                            del remaining_words[ref_word]
+                        matched = True
+                        break
+        if not matched:
+            unmatched_hypothesis.append((position, word))
+
+    unmatched_hypothesis.reverse()
+    return matches, unmatched_hypothesis, reference
+
+
+def _count_chunks(matches: List[Tuple[int, int]]) -> int:
+    """Fewest chunks of adjacent matched unigrams (matches sorted by hypothesis position)"""
+    chunks = 1
+    for previous, current in zip(matches, matches[1:]):
+        if not (current[0] == previous[0] + 1 and current[1] == previous[1] + 1):
+            chunks += 1
+    return chunks
+
+
+def meteor(reference: Sequence[str], hypothesis: Sequence[str],
+           alpha: float = METEOR_ALPHA, beta: float = METEOR_BETA, gamma: float = METEOR_GAMMA,
+           synonyms: SynonymTable = None) -> float:
+    """
+    METEOR score of a tokenized hypothesis against one tokenized reference
+
+    Args:
+        reference: Reference tokens
+        hypothesis: Hypothesis tokens
+        alpha: Precision/recall balance
+        beta: Fragmentation penalty shape
+        gamma: Fragmentation penalty weight
+        synonyms: Synonym table (the shared table when None)
+
+    Returns:
+        Unrounded score, equal to nltk.translate.meteor_score.meteor_score([reference], hypothesis, ...)
+    """
+    if synonyms is None:
+        synonyms = _synonym_table
+    enum_hypothesis = list(enumerate(word.lower() for word in hypothesis))
+    enum_reference = list(enumerate(word.lower() for word in reference))
+    translation_length = len(enum_hypothesis)
+    reference_length = len(enum_reference)
+
+    exact_matches, enum_hypothesis, enum_reference = _match_exact(enum_hypothesis, enum_reference)
+    stem_matches, enum_hypothesis, enum_reference = _match_exact(
+        [(i, stem(word)) for i, word in enum_hypothesis],
+        [(j, stem(word)) for j, word in enum_reference]
+    )
+    synonym_matches, _, _ = _match_synonyms(enum_hypothesis, enum_reference, synonyms)
+    matches = sorted(exact_matches + stem_matches + synonym_matches, key=lambda pair: pair[0])
+
+    matches_count = len(matches)
+    try:
+        precision = float(matches_count) / translation_length
+        recall = float(matches_count) / reference_length
+        fmean = (precision * recall) / (alpha * precision + (1 - alpha) * recall)
+        chunk_count = float(_count_chunks(matches))
+        frag_frac = chunk_count / matches_count
+    except ZeroDivisionError:
+        return 0.0
+    penalty = gamma * frag_frac ** beta
+    return (1 - penalty) * fmean
+
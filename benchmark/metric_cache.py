@@ -0,0 +1,222 @@
+"""
+Metric Memoization Module
+
+Shared, bounded and thread-safe memoization for the deterministic evaluation
+metrics. Results live in one LRU keyed by metric name plus the metric's
+arguments; entries are evicted once the configured entry count or memory cap
+is exceeded. Keys are plain tuples (Python's built-in string hashing, no
+cryptographic digest), and hit/miss/eviction counters are kept per metric so
+the app can show them.
+"""
+
+import functools
+import inspect
+import sys
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List
+
+from benchmark.config import METRIC_CACHE_MAX_BYTES, METRIC_CACHE_MAX_ENTRIES
+
+# Fixed per-entry overhead (tuple, OrderedDict node, float result) added to the size estimate
+_ENTRY_OVERHEAD_BYTES = 200
+
+
+def _freeze(value):
+    """Turn an argument into a hashable key part (dicts and lists become tuples)"""
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple, set, frozenset)):
+        items = sorted(value) if isinstance(value, (set, frozenset)) else value
+        return tuple(_freeze(item) for item in items)
+    return value
+
+
+def _entry_size(key, value) -> int:
+    """Approximate memory held by one cache entry (dominated by the texts in the key)"""
+    return _ENTRY_OVERHEAD_BYTES + sum(
+        sys.getsizeof(part) for part in key if isinstance(part, (str, bytes))
+    ) + sys.getsizeof(value)
+
+
+class MetricCache:
+    """
+    LRU cache of metric results bounded by entry count and approximate memory
+    """
+
+    def __init__(self, max_entries: int = METRIC_CACHE_MAX_ENTRIES, max_bytes: int = METRIC_CACHE_MAX_BYTES):
+        """
+        Args:
+            max_entries: Maximum number of cached results
+            max_bytes: Approximate memory cap for keys and results
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def _metric_stats(self, metric: str) -> Dict[str, int]:
+        stats = self._stats.get(metric)
+        if stats is None:
+            stats = self._stats[metric] = {'hits': 0, 'misses': 0, 'evictions': 0, 'entries': 0}
+        return stats
+
+    def get(self, key):
+        """
+        Look up a result
+
+        Args:
+            key: Tuple whose first element is the metric name
+
+        Returns:
+            (True, result) on a hit, (False, None) on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            stats = self._metric_stats(key[0])
+            if entry is None:
+                stats['misses'] += 1
+                return False, None
+            self._entries.move_to_end(key)
+            stats['hits'] += 1
+            return True, entry[0]
+
+    def put(self, key, value):
+        """
+        Store a result, evicting least recently used entries over the caps
+
+        Args:
+            key: Tuple whose first element is the metric name
+            value: Metric result
+        """
+        size = _entry_size(key, value)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+                self._metric_stats(key[0])['entries'] -= 1
+
+            self._entries[key] = (value, size)
+            self._bytes += size
+            self._metric_stats(key[0])['entries'] += 1
+
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                old_key, (_, old_size) = self._entries.popitem(last=False)
+                self._bytes -= old_size
+                old_stats = self._metric_stats(old_key[0])
+                old_stats['entries'] -= 1
+                old_stats['evictions'] += 1
+
+    def clear(self, metric: str = None):
+        """
+        Drop cached results (counters are kept)
+
+        Args:
+            metric: Only drop this metric's results (all metrics when None)
+        """
+        with self._lock:
+            if metric is None:
+                self._entries.clear()
+                self._bytes = 0
+                for stats in self._stats.values():
+                    stats['entries'] = 0
+                return
+
+            for key in [key for key in self._entries if key[0] == metric]:
+                self._bytes -= self._entries.pop(key)[1]
+            self._metric_stats(metric)['entries'] = 0
+
+    def stats(self) -> List[Dict]:
+        """
+        Per-metric counters
+
+        Returns:
+            List of dicts with metric, hits, misses, evictions, entries and hit_rate
+        """
+        with self._lock:
+            return [
+                {
+                    'metric': metric,
+                    **stats,
+                    'hit_rate': round(stats['hits'] / (stats['hits'] + stats['misses']), 3)
+                    if stats['hits'] + stats['misses'] else 0.0
+                }
+                for metric, stats in self._stats.items()
+            ]
+
+    @property
+    def size_bytes(self) -> int:
+        """Approximate memory currently held"""
+        return self._bytes
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# Process-wide cache shared by every metric (and every Streamlit session thread)
+_metric_cache = MetricCache()
+
+
+def get_metric_cache() -> MetricCache:
+    """Shared metric result cache"""
+    return _metric_cache
+
+
+def memoize_metric(metric: str, ignore: Iterable[str] = ()):
+    """
+    Memoize a deterministic metric function in the shared metric cache
+
+    Args:
+        metric: Metric name used in keys and statistics
+        ignore: Parameters left out of the key because they are derived from
+            other arguments (e.g. precomputed TextAnalysis objects)
+
+    Returns:
+        Decorator
+    """
+    ignore = set(ignore)
+
+    def decorator(func):
+        parameters = list(inspect.signature(func).parameters)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (metric,) + tuple(
+                _freeze(value) for name, value in zip(parameters, args) if name not in ignore
+            ) + tuple(
+                (name, _freeze(kwargs[name])) for name in sorted(kwargs) if name not in ignore
+            )
+
+            hit, value = _metric_cache.get(key)
+            if hit:
+                return value
+            value = func(*args, **kwargs)
+            _metric_cache.put(key, value)
+            return value
+
+        wrapper.metric_name = metric
+        return wrapper
+
+    return decorator
+
+
+def clear_metric_cache(metric: str = None):
+    """
+    Clear memoized metric results
+
+    Args:
+        metric: Only clear this metric (all metrics when None)
+    """
+    _metric_cache.clear(metric)
+
+
+def get_metric_cache_stats() -> List[Dict]:
+    """
+    Hit/miss/eviction counters per memoized metric
+
+    Returns:
+        List of dicts with metric, hits, misses, evictions, entries and hit_rate
+    """
+    return _metric_cache.stats()
@@ -7,7 +7,14 @@ Compares against reference (human counselor) responses
 
 from benchmark.evaluation import *
 from benchmark.config import *
+from benchmark.reference_index import ReferenceIndex, load_reference_index
+from benchmark.score_store import ScoreStore, get_score_store
+from benchmark.resources import warm_up
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from typing import List, Dict
+import math
+import multiprocessing
+import time
 import pandas as pd
 
 
@@ -16,8 +23,27 @@ class MultiTurnEvaluator:
     Evaluates multi-turn therapy conversations
     """
     
-    def __init__(self):
-        """Initialize evaluator with metrics from evaluation module"""
+    def __init__(self, reference_index=None, score_store=None,
+                 use_reference_index: bool = True, use_score_store: bool = True):
+        """
+        Initialize evaluator with metrics from evaluation module
+        
+        Args:
+            reference_index: Precomputed reference artifacts (defaults to the on-disk
+                index when it is built and up to date; references are analyzed live otherwise)
+            score_store: Persistent score store (defaults to the shared store at SCORE_STORE_PATH)
+            use_reference_index: False to analyze every reference live (no index, not even the default)
+            use_score_store: False to compute every score (no store, not even the default)
+        """
+        if not use_reference_index:
+            self.reference_index = None
+        else:
+            self.reference_index = reference_index if reference_index is not None else load_reference_index()
+        if not use_score_store:
+            self.score_store = None
+        else:
+            self.score_store = score_store if score_store is not None else get_score_store()
+        self.last_run_stats = None
         self.metrics = {
             'rouge': calculate_average_rouge,
             'meteor': calculate_meteor,
@@ -27,39 +53,62 @@ class MultiTurnEvaluator:
             'complexity': evaluate_complexity_score
         }
     
-    def evaluate_turn(self, reference_response: str, ai_response: str) -> Dict:
+    def _reference_artifacts(self, reference_key, reference_response: str):
+        """
+        Look up the precomputed analysis and emotion scores of a reference turn
+        
+        Args:
+            reference_key: (patient_id, session_id, turn), or None
+            reference_response: Reference text (artifacts are only used if it matches)
+            
+        Returns:
+            (TextAnalysis or None, emotion distribution or None)
+        """
+        if self.reference_index is None:
+            return None, None
+        return self.reference_index.lookup(reference_key, reference_response)
+    
+    def evaluate_turn(self, reference_response: str, ai_response: str,
+                      sentiment_score: float = None, reference_key=None) -> Dict:
         """
         Evaluate a single turn against reference
         
         Args:
             reference_response: Human counselor's response
             ai_response: AI-generated response
+            sentiment_score: Precomputed sentiment distribution score (e.g. from a batched run)
+            reference_key: (patient_id, session_id, turn) of the reference in the reference index
             
         Returns:
             Dictionary of metric scores for this turn
         """
-        scores = {
-            'rouge_score': calculate_average_rouge(reference_response, ai_response),
-            'meteor_score': calculate_meteor(reference_response, ai_response),
-            'ethical_alignment': evaluate_ethical_alignment(ai_response),
-            'sentiment_distribution': evaluate_sentiment_distribution(
-                reference_response, ai_response, EMOTION_WEIGHTS
-            ),
-            'inclusivity_score': evaluate_inclusivity_score(ai_response),
-            'complexity_score': evaluate_complexity_score(ai_response, READABILITY_CONSTANTS)
-        }
+        # Indexed references are not re-analyzed at all; stored scores are not recomputed
+        reference_analysis, reference_distribution = self._reference_artifacts(reference_key, reference_response)
         
-        return scores
+        return score_response_pair(
+            reference_response, ai_response,
+            reference_analysis=reference_analysis,
+            reference_distribution=reference_distribution,
+            sentiment_score=sentiment_score,
+            score_store=self.score_store,
+            use_score_store=self.score_store is not None
+        )
     
     def evaluate_conversation(self, 
                             reference_turns: List[Dict], 
-                            ai_turns: List[Dict]) -> Dict:
+                            ai_turns: List[Dict],
+                            sentiment_scores: List[float] = None,
+                            session_key=None,
+                            precomputed_scores: List[Dict] = None) -> Dict:
         """
         Evaluate entire multi-turn conversation
         
         Args:
             reference_turns: List of reference turns [{"turn": 1, "patient": "...", "doctor": "..."}]
             ai_turns: List of AI turns [{"turn": 1, "patient": "...", "ai_response": "..."}]
+            sentiment_scores: Optional precomputed sentiment scores, one per turn pair
+            session_key: Optional (patient_id, session_id) used to look up indexed references
+            precomputed_scores: Optional metric scores per turn pair (e.g. from a batched run)
             
         Returns:
             {
@@ -71,18 +120,95 @@ class MultiTurnEvaluator:
         turn_scores = []
         
         # Evaluate each turn
-        for ref_turn, ai_turn in zip(reference_turns, ai_turns):
+        for turn_index, (ref_turn, ai_turn) in enumerate(zip(reference_turns, ai_turns)):
             if ref_turn['turn'] != ai_turn['turn']:
                 print(f"Warning: Turn mismatch - Ref: {ref_turn['turn']}, AI: {ai_turn['turn']}")
             
-            scores = self.evaluate_turn(ref_turn['doctor'], ai_turn['ai_response'])
-            scores['turn'] = ref_turn['turn']
-            scores['patient_message'] = ref_turn['patient']
-            scores['reference_response'] = ref_turn['doctor']
-            scores['ai_response'] = ai_turn['ai_response']
+            if precomputed_scores is not None:
+                scores = dict(precomputed_scores[turn_index])
+            else:
+                sentiment_score = sentiment_scores[turn_index] if sentiment_scores is not None else None
+                reference_key = (*session_key, ref_turn['turn']) if session_key is not None else None
+                scores = self.evaluate_turn(ref_turn['doctor'], ai_turn['ai_response'], sentiment_score, reference_key)
+            turn_scores.append(self._turn_record(ref_turn, ai_turn, scores))
+        
+        return self._conversation_result(
+            turn_scores, ai_turns[0].get('model', 'Unknown') if ai_turns else 'Unknown'
+        )
+    
+    def generate_and_evaluate_conversation(self,
+                                           client,
+                                           reference_turns: List[Dict],
+                                           system_prompt: str = None,
+                                           session_key=None) -> Dict:
+        """
+        Generate AI responses for a session and evaluate them in a pipeline
+        
+        Runs client.generate_multi_turn_conversation and hands each response to
+        a background evaluation thread as soon as it arrives, while the API call
+        for the next turn is already in flight, then passes the scores to
+        evaluate_conversation. Session wall-clock time approaches
+        max(generation, evaluation) instead of their sum, and the result is the
+        same as generating first and then calling evaluate_conversation.
+        
+        Args:
+            client: AzureOpenAIClient used to generate the counselor responses
+            reference_turns: List of reference turns [{"turn": 1, "patient": "...", "doctor": "..."}]
+            system_prompt: Optional system prompt for generation
+            session_key: Optional (patient_id, session_id) used to look up indexed references
             
-            turn_scores.append(scores)
+        Returns:
+            Same structure as evaluate_conversation, plus 'ai_turns' and
+            metadata['timing'] (generation, evaluation and wall-clock seconds)
+        """
+        futures = []
+        start = time.perf_counter()
+        
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix='turn-evaluation') as executor:
+            def evaluate_in_background(ai_turn: Dict):
+                # Score this turn while the next one is generated
+                ref_turn = reference_turns[len(futures)]
+                reference_key = (*session_key, ref_turn['turn']) if session_key is not None else None
+                futures.append(executor.submit(
+                    self._timed_evaluate_turn, ref_turn['doctor'], ai_turn['ai_response'], reference_key
+                ))
+            
+            ai_turns = client.generate_multi_turn_conversation(
+                [ref_turn['patient'] for ref_turn in reference_turns], system_prompt,
+                on_response=evaluate_in_background
+            )
+            generation_seconds = time.perf_counter() - start
+            evaluated = [future.result() for future in futures]
         
+        result = self.evaluate_conversation(
+            reference_turns, ai_turns, session_key=session_key,
+            precomputed_scores=[scores for scores, _ in evaluated]
+        )
+        result['metadata']['model'] = client.model_name
+        result['ai_turns'] = ai_turns
+        result['metadata']['timing'] = {
+            'generation_seconds': round(generation_seconds, 3),
+            'evaluation_seconds': round(sum(seconds for _, seconds in evaluated), 3),
+            'wall_seconds': round(time.perf_counter() - start, 3)
+        }
+        return result
+    
+    def _timed_evaluate_turn(self, reference_response: str, ai_response: str, reference_key=None):
+        """Evaluate a turn and return (scores, seconds spent)"""
+        start = time.perf_counter()
+        scores = self.evaluate_turn(reference_response, ai_response, reference_key=reference_key)
+        return scores, time.perf_counter() - start
+    
+    def _turn_record(self, ref_turn: Dict, ai_turn: Dict, scores: Dict) -> Dict:
+        """Attach turn number and texts to a turn's metric scores"""
+        scores['turn'] = ref_turn['turn']
+        scores['patient_message'] = ref_turn['patient']
+        scores['reference_response'] = ref_turn['doctor']
+        scores['ai_response'] = ai_turn['ai_response']
+        return scores
+    
+    def _conversation_result(self, turn_scores: List[Dict], model: str) -> Dict:
+        """Build the per-conversation result with aggregate scores"""
         # Calculate aggregate scores (average across turns)
         aggregate_scores = self._calculate_aggregate_scores(turn_scores)
         
@@ -91,7 +217,7 @@ class MultiTurnEvaluator:
             'aggregate_scores': aggregate_scores,
             'metadata': {
                 'total_turns': len(turn_scores),
-                'model': ai_turns[0].get('model', 'Unknown') if ai_turns else 'Unknown'
+                'model': model
             }
         }
     
@@ -114,21 +240,105 @@ class MultiTurnEvaluator:
     
     def evaluate_dataset(self, 
                         sessions: List[Dict], 
-                        ai_responses_per_session: List[List[Dict]]) -> pd.DataFrame:
+                        ai_responses_per_session: List[List[Dict]],
+                        workers: int = EVALUATION_WORKERS,
+                        chunk_size: int = EVALUATION_CHUNK_SIZE) -> pd.DataFrame:
         """
         Evaluate multiple sessions
         
         Args:
             sessions: List of session dicts with parsed turns
             ai_responses_per_session: List of AI response lists (one per session)
+            workers: Worker processes to score sessions in parallel (1 = serial)
+            chunk_size: Sessions per worker task (None = about four chunks per worker)
             
         Returns:
             DataFrame with all evaluation results
         """
+        start = time.perf_counter()
+        if workers > 1 and len(sessions) > 1:
+            all_results = self._evaluate_dataset_parallel(sessions, ai_responses_per_session, workers, chunk_size)
+        else:
+            workers = 1
+            all_results = self._evaluate_sessions(sessions, ai_responses_per_session)
+        elapsed = time.perf_counter() - start
+        
+        # Throughput report
+        total_turns = sum(result['metadata']['total_turns'] for result in all_results)
+        self.last_run_stats = {
+            'sessions': len(all_results),
+            'turns': total_turns,
+            'workers': workers,
+            'seconds': round(elapsed, 3),
+            'turns_per_second': round(total_turns / elapsed, 2) if elapsed > 0 else 0.0
+        }
+        print(f"⚡ Evaluated {total_turns} turns from {len(all_results)} sessions in {elapsed:.2f}s "
+              f"({self.last_run_stats['turns_per_second']} turns/sec, {workers} worker(s))")
+        
+        return all_results
+    
+    def _evaluate_dataset_parallel(self,
+                                   sessions: List[Dict],
+                                   ai_responses_per_session: List[List[Dict]],
+                                   workers: int,
+                                   chunk_size: int = None) -> List[Dict]:
+        """
+        Score sessions in chunks across a process pool
+        
+        Each worker builds its own evaluator (same reference index and score store,
+        or none where this evaluator has none) and loads the emotion model and lexical resources once. Chunks are mapped
+        in order, so results line up with the input exactly as in the serial path.
+        
+        Args:
+            sessions: List of session dicts with parsed turns
+            ai_responses_per_session: List of AI response lists (one per session)
+            workers: Number of worker processes
+            chunk_size: Sessions per task (None = about four chunks per worker)
+            
+        Returns:
+            Evaluation results in input order
+        """
+        pairs = list(zip(sessions, ai_responses_per_session))
+        chunk_size = chunk_size or max(1, math.ceil(len(pairs) / (workers * 4)))
+        chunks = [pairs[i:i + chunk_size] for i in range(0, len(pairs), chunk_size)]
+        
+        init_args = (
+            self.reference_index.index_dir if self.reference_index is not None else None,
+            self.score_store.path if self.score_store is not None else None
+        )
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(chunks)),
+            mp_context=multiprocessing.get_context(EVALUATION_START_METHOD),
+            initializer=_init_evaluation_worker,
+            initargs=init_args
+        ) as executor:
+            chunk_results = executor.map(_evaluate_session_chunk, chunks)
+            return [result for results in chunk_results for result in results]
+    
+    def _evaluate_sessions(self,
+                           sessions: List[Dict],
+                           ai_responses_per_session: List[List[Dict]]) -> List[Dict]:
+        """
+        Score sessions serially in this process
+        
+        Args:
+            sessions: List of session dicts with parsed turns
+            ai_responses_per_session: List of AI response lists (one per session)
+            
+        Returns:
+            Evaluation results in input order
+        """
         all_results = []
         
-        for session, ai_responses in zip(sessions, ai_responses_per_session):
-            result = self.evaluate_conversation(session['turns'], ai_responses)
+        # Score every turn of every session together, one batch per metric
+        turn_scores = self._batch_turn_scores(sessions, ai_responses_per_session)
+        
+        for session, ai_responses, session_scores in zip(sessions, ai_responses_per_session, turn_scores):
+            result = self.evaluate_conversation(
+                session['turns'], ai_responses,
+                session_key=(session.get('patient_id'), session.get('session_id')),
+                precomputed_scores=session_scores
+            )
             
             # Add session metadata
             result['patient_id'] = session.get('patient_id')
@@ -140,6 +350,50 @@ class MultiTurnEvaluator:
         
         return all_results
     
+    def _batch_turn_scores(self,
+                           sessions: List[Dict],
+                           ai_responses_per_session: List[List[Dict]]) -> List[List[Dict]]:
+        """
+        Score all turn pairs of all sessions with batched metrics
+        
+        The emotion model runs once, in batches, over every AI response, and the
+        lexical metrics run once over the whole set of responses.
+        
+        Args:
+            sessions: List of session dicts with parsed turns
+            ai_responses_per_session: List of AI response lists (one per session)
+            
+        Returns:
+            Metric scores per session, aligned with the turns evaluate_conversation pairs up
+        """
+        references, candidates, reference_analyses, distributions, pair_counts = [], [], [], [], []
+        for session, ai_responses in zip(sessions, ai_responses_per_session):
+            pairs = list(zip(session['turns'], ai_responses))
+            for ref_turn, ai_turn in pairs:
+                # Indexed references reuse their stored analysis and emotion scores
+                analysis, distribution = self._reference_artifacts(
+                    (session.get('patient_id'), session.get('session_id'), ref_turn['turn']), ref_turn['doctor']
+                )
+                references.append(ref_turn['doctor'])
+                candidates.append(ai_turn['ai_response'])
+                reference_analyses.append(analysis)
+                distributions.append(distribution)
+            pair_counts.append(len(pairs))
+        
+        scores = score_response_pairs(
+            references, candidates,
+            reference_analyses=reference_analyses,
+            reference_distributions=distributions,
+            score_store=self.score_store,
+            use_score_store=self.score_store is not None
+        )
+        
+        per_session, offset = [], 0
+        for count in pair_counts:
+            per_session.append(scores[offset:offset + count])
+            offset += count
+        return per_session
+    
     def export_results_to_csv(self, results: List[Dict], output_path: str):
         """
         Export evaluation results to CSV
@@ -207,3 +461,45 @@ class MultiTurnEvaluator:
         
         return df
 
+
+
+# =================================
+# PARALLEL EVALUATION WORKERS
+# =================================
+
+# Evaluator owned by each worker process (built once by the pool initializer)
+_worker_evaluator = None
+
+
+def _init_evaluation_worker(reference_index_dir: str = None, score_store_path: str = None):
+    """
+    Process pool initializer: load resources and build this worker's evaluator once
+    
+    Args:
+        reference_index_dir: Reference index directory used by the parent (None = not used)
+        score_store_path: Score store path used by the parent (None = not used)
+    """
+    global _worker_evaluator
+    warm_up(['punkt', 'cmudict', 'wordnet', 'emotion_model'], background=False)
+    # None disables the component here; it must not fall back to the defaults the parent turned off
+    _worker_evaluator = MultiTurnEvaluator(
+        reference_index=ReferenceIndex(reference_index_dir) if reference_index_dir else None,
+        score_store=ScoreStore(score_store_path) if score_store_path else None,
+        use_reference_index=reference_index_dir is not None,
+        use_score_store=score_store_path is not None
+    )
+
+
+def _evaluate_session_chunk(chunk: List) -> List[Dict]:
+    """
+    Score one chunk of (session, ai_responses) pairs in a worker process
+    
+    Args:
+        chunk: List of (session, ai_responses) tuples
+        
+    Returns:
+        Evaluation results for the chunk, in order
+    """
+    sessions = [session for session, _ in chunk]
+    ai_responses_per_session = [ai_responses for _, ai_responses in chunk]
+    return _worker_evaluator._evaluate_sessions(sessions, ai_responses_per_session)
@@ -0,0 +1,315 @@
+"""
+Rate-Limit-Aware Request Scheduler
+
+Paces Azure OpenAI calls to stay within a deployment's quota and retries
+throttled or transient failures instead of giving up on the turn:
+
+- token buckets for requests per minute (RPM) and tokens per minute (TPM)
+- exponential backoff with full jitter between retries
+- server Retry-After / retry-after-ms headers honored when present
+- a per-request timeout passed through to the SDK
+- quota given back only for attempts that never reached the server
+
+Works from plain threads (call) and from asyncio code (acall).
+"""
+
+import asyncio
+import email.utils
+import random
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from benchmark.config import (
+    AZURE_BACKOFF_BASE_SECONDS, AZURE_BACKOFF_MAX_SECONDS, AZURE_MAX_RETRIES,
+    AZURE_REQUEST_TIMEOUT_SECONDS, AZURE_REQUESTS_PER_MINUTE, AZURE_TOKENS_PER_MINUTE
+)
+
+# HTTP statuses worth retrying (timeouts, conflicts, throttling, server errors)
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+# SDK exceptions raised before any HTTP status is available
+RETRYABLE_EXCEPTION_NAMES = {'APITimeoutError', 'APIConnectionError'}
+
+# Transport errors (httpx) raised while connecting, before the request is sent
+UNSENT_EXCEPTION_NAMES = {'ConnectError', 'ConnectTimeout'}
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled continuously at a fixed rate
+    """
+
+    def __init__(self, capacity: float, refill_per_second: float):
+        """
+        Args:
+            capacity: Maximum tokens held (burst size)
+            refill_per_second: Tokens added per second
+        """
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.refill_per_second)
+        self._updated = now
+
+    def reserve(self, amount: float) -> float:
+        """
+        Take tokens now, going into debt if needed
+
+        Args:
+            amount: Tokens needed (clamped to the bucket capacity)
+
+        Returns:
+            Seconds the caller must wait before the reservation is covered
+        """
+        amount = min(amount, self.capacity)
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens -= amount
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.refill_per_second
+
+    def refund(self, amount: float):
+        """
+        Return unused tokens (e.g. when a request used fewer tokens than estimated)
+
+        Args:
+            amount: Tokens to give back
+        """
+        if amount <= 0:
+            return
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self.capacity, self._tokens + amount)
+
+
+def estimate_request_tokens(messages: List[Dict], max_tokens: int = 0) -> int:
+    """
+    Rough token estimate of a chat request (prompt characters / 4 plus the completion budget)
+
+    Args:
+        messages: Chat messages
+        max_tokens: Completion token limit of the request
+
+    Returns:
+        Estimated tokens counted against the TPM quota
+    """
+    prompt_chars = sum(len(message.get('content') or '') for message in messages)
+    return prompt_chars // 4 + 4 * len(messages) + max_tokens
+
+
+def is_retryable_error(error: Exception) -> bool:
+    """
+    Whether an API error is throttling or transient
+
+    Args:
+        error: Exception raised by the API call
+
+    Returns:
+        True for 408/409/429/5xx responses, connection errors and timeouts
+    """
+    status = getattr(error, 'status_code', None)
+    if status is not None:
+        return status in RETRYABLE_STATUS_CODES or status >= 500
+    return (type(error).__name__ in RETRYABLE_EXCEPTION_NAMES
+            or isinstance(error, (TimeoutError, asyncio.TimeoutError, ConnectionError)))
+
+
+def was_never_sent(error: Exception) -> bool:
+    """
+    Whether a failed request provably never reached the server
+
+    Throttled, timed-out and 5xx requests are usually still charged against
+    the quota; only failures to connect are not.
+
+    Args:
+        error: Exception raised by the API call
+
+    Returns:
+        True when the error, or an error it was raised from, is a connect failure
+    """
+    while error is not None:
+        if isinstance(error, ConnectionRefusedError) or type(error).__name__ in UNSENT_EXCEPTION_NAMES:
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """
+    Server-requested delay from an error response, if any
+
+    Args:
+        error: Exception raised by the API call
+
+    Returns:
+        Seconds from retry-after-ms / Retry-After headers, or None when absent
+        or unparseable (the caller then falls back to jittered backoff)
+    """
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None)
+    if not headers:
+        return None
+
+    retry_after_ms = headers.get('retry-after-ms')
+    if retry_after_ms:
+        try:
+            return float(retry_after_ms) / 1000
+        except ValueError:
+            pass
+
+    retry_after = headers.get('retry-after')
+    if retry_after:
+        try:
+            return float(retry_after)
+        except ValueError:
+            pass
+        try:
+            retry_at = email.utils.parsedate_to_datetime(retry_after)
+        except (TypeError, ValueError, IndexError, OverflowError):
+            return None
+        if retry_at is not None:
+            return max(0.0, retry_at.timestamp() - time.time())
+    return None
+
+
+class RequestScheduler:
+    """
+    Schedules API calls under RPM/TPM limits and retries throttled or transient failures
+    """
+
+    def __init__(self,
+                 requests_per_minute: float = AZURE_REQUESTS_PER_MINUTE,
+                 tokens_per_minute: float = AZURE_TOKENS_PER_MINUTE,
+                 max_retries: int = AZURE_MAX_RETRIES,
+                 backoff_base: float = AZURE_BACKOFF_BASE_SECONDS,
+                 backoff_max: float = AZURE_BACKOFF_MAX_SECONDS,
+                 timeout: float = AZURE_REQUEST_TIMEOUT_SECONDS):
+        """
+        Args:
+            requests_per_minute: Request quota of the deployment
+            tokens_per_minute: Token quota of the deployment
+            max_retries: Retries after the first attempt before the error is raised
+            backoff_base: First backoff ceiling in seconds (doubles per retry)
+            backoff_max: Upper bound for a single backoff
+            timeout: Per-request timeout in seconds, passed to the SDK call
+        """
+        self.requests = TokenBucket(requests_per_minute, requests_per_minute / 60.0)
+        self.tokens = TokenBucket(tokens_per_minute, tokens_per_minute / 60.0)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.stats = {'requests': 0, 'retries': 0, 'throttled': 0, 'failures': 0}
+        self._stats_lock = threading.Lock()
+
+    def _count(self, name: str):
+        with self._stats_lock:
+            self.stats[name] += 1
+
+    def _reserve(self, tokens: int) -> float:
+        """Reserve one request and the estimated tokens; returns the wait in seconds"""
+        return max(self.requests.reserve(1), self.tokens.reserve(tokens))
+
+    def _release(self, error: Exception, tokens: int):
+        """Give back a failed attempt's reservation if the request never reached the server"""
+        if was_never_sent(error):
+            self.requests.refund(1)
+            self.tokens.refund(tokens)
+
+    def backoff_delay(self, attempt: int, error: Exception = None) -> float:
+        """
+        Delay before retry number attempt + 1
+
+        Args:
+            attempt: Zero-based retry attempt
+            error: The error that triggered the retry
+
+        Returns:
+            Retry-After when the server sent one, else full-jitter exponential backoff
+        """
+        retry_after = retry_after_seconds(error) if error is not None else None
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _settle(self, result, tokens: int):
+        """Refund the unused part of the token estimate once actual usage is known"""
+        usage = getattr(result, 'usage', None)
+        total_tokens = getattr(usage, 'total_tokens', None)
+        if isinstance(total_tokens, int):
+            self.tokens.refund(tokens - total_tokens)
+
+    def _should_retry(self, error: Exception, attempt: int) -> bool:
+        if not is_retryable_error(error) or attempt >= self.max_retries:
+            self._count('failures')
+            return False
+        if getattr(error, 'status_code', None) == 429:
+            self._count('throttled')
+        self._count('retries')
+        return True
+
+    def call(self, request: Callable, tokens: int = 0):
+        """
+        Run a blocking API call under the rate limits, retrying transient failures
+
+        Args:
+            request: Function taking a timeout keyword and performing the request
+            tokens: Estimated tokens of the request (see estimate_request_tokens)
+
+        Returns:
+            The request's result
+
+        Raises:
+            The last error when it is not retryable or retries are exhausted
+        """
+        attempt = 0
+        while True:
+            time.sleep(self._reserve(tokens))
+            self._count('requests')
+            try:
+                result = request(timeout=self.timeout)
+            except Exception as e:
+                self._release(e, tokens)
+                if not self._should_retry(e, attempt):
+                    raise
+                time.sleep(self.backoff_delay(attempt, e))
+                attempt += 1
+                continue
+            self._settle(result, tokens)
+            return result
+
+    async def acall(self, request: Callable, tokens: int = 0):
+        """
+        Async counterpart of call for coroutine-returning requests
+
+        Args:
+            request: Function taking a timeout keyword and returning an awaitable
+            tokens: Estimated tokens of the request (see estimate_request_tokens)
+
+        Returns:
+            The request's result
+
+        Raises:
+            The last error when it is not retryable or retries are exhausted
+        """
+        attempt = 0
+        while True:
+            await asyncio.sleep(self._reserve(tokens))
+            self._count('requests')
+            try:
+                result = await asyncio.wait_for(request(timeout=self.timeout), self.timeout + 5)
+            except Exception as e:
+                self._release(e, tokens)
+                if not self._should_retry(e, attempt):
+                    raise
+                await asyncio.sleep(self.backoff_delay(attempt, e))
+                attempt += 1
+                continue
+            self._settle(result, tokens)
+            return result
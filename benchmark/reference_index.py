@@ -0,0 +1,264 @@
+"""
+Reference Artifact Index
+
+Every doctor turn in the therapy dataset is a fixed reference, so its tokens,
+stems, sentence splits and emotion scores can be computed once
+offline. This module builds that index and loads it back for the evaluator and
+the app, so only the AI side of each comparison is computed live.
+
+On-disk layout (one directory):
+    manifest.json    - format version and fingerprint of the source dataset
+    keys.json        - row order: [patient_id, session_id, turn] per reference turn
+    artifacts.jsonl  - text, tokens, sentences, sentence tokens and stems per row
+                       (ROUGE n-gram counts are derived from the stems when a row is loaded)
+    offsets.i64      - byte offset of each artifacts.jsonl line (memory-mapped)
+    emotions.f32     - unweighted emotion scores, rows x RELEVANT_EMOTIONS (memory-mapped;
+                       not written when EMOTION_MODEL_NAME is None)
+
+Build with:
+    python -m benchmark.reference_index
+"""
+
+import json
+import os
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from benchmark.config import (
+    DATASET_PATH, EMOTION_MODEL_NAME, REFERENCE_INDEX_CACHE_SIZE, REFERENCE_INDEX_DIR, RELEVANT_EMOTIONS
+)
+from benchmark.data_loader import load_dataset, parse_conversation_turns
+from benchmark.text_analysis import TextAnalysis, analyze_text
+
+INDEX_FORMAT_VERSION = 1
+
+ReferenceKey = Tuple[str, str, int]
+
+
+def make_reference_key(patient_id, session_id, turn) -> ReferenceKey:
+    """
+    Normalize a (patient_id, session_id, turn) key
+
+    Args:
+        patient_id: Patient identifier from the dataset
+        session_id: Session identifier from the dataset
+        turn: 1-based turn number
+
+    Returns:
+        Tuple of (str, str, int) used to address the index
+    """
+    return str(patient_id), str(session_id), int(turn)
+
+
+def _dataset_fingerprint(dataset_path: str) -> Dict:
+    """Size and modification time identifying one version of the dataset file"""
+    stat = os.stat(dataset_path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def build_reference_index(dataset_path: str = DATASET_PATH,
+                          index_dir: str = REFERENCE_INDEX_DIR) -> int:
+    """
+    Precompute reference-side artifacts for every doctor turn in the dataset
+
+    Args:
+        dataset_path: Path to the JSONL dataset
+        index_dir: Directory to write the index into
+
+    Returns:
+        Number of reference turns indexed
+    """
+    os.makedirs(index_dir, exist_ok=True)
+
+    keys, texts, offsets = [], [], []
+    with open(os.path.join(index_dir, 'artifacts.jsonl'), 'wb') as artifacts:
+        for session in load_dataset(dataset_path):
+            for turn in parse_conversation_turns(session['input']):
+                analysis = analyze_text(turn['doctor'])
+                record = {
+                    'text': analysis.text,
+                    'tokens': analysis.tokens,
+                    'sentences': analysis.sentences,
+                    'sentence_tokens': analysis.sentence_tokens,
+                    'stems': analysis.stems
+                }
+                offsets.append(artifacts.tell())
+                artifacts.write(json.dumps(record, ensure_ascii=False).encode('utf-8') + b'\n')
+
+                keys.append(make_reference_key(session.get('patient_id'), session.get('session_id'), turn['turn']))
+                texts.append(analysis.text)
+
+    np.asarray(offsets, dtype=np.int64).tofile(os.path.join(index_dir, 'offsets.i64'))
+
+    # The keyword sentiment fallback has no per-text vectors, so there is nothing to store without a model
+    if EMOTION_MODEL_NAME is not None:
+        # Imported here so building the index is the only path that needs the emotion model
+        from benchmark.evaluation import get_emotion_vectors
+
+        # Unit weights give the raw (unweighted) model scores
+        emotions = get_emotion_vectors(texts, {}) if texts else np.zeros((0, len(RELEVANT_EMOTIONS)))
+        np.asarray(emotions, dtype=np.float32).tofile(os.path.join(index_dir, 'emotions.f32'))
+    with open(os.path.join(index_dir, 'keys.json'), 'w', encoding='utf-8') as f:
+        json.dump([list(key) for key in keys], f)
+
+    # Manifest last: an index without one is treated as missing
+    manifest = {
+        'version': INDEX_FORMAT_VERSION,
+        'dataset': _dataset_fingerprint(dataset_path),
+        'emotion_model': EMOTION_MODEL_NAME,
+        'emotions': RELEVANT_EMOTIONS,
+        'count': len(keys)
+    }
+    with open(os.path.join(index_dir, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+
+    return len(keys)
+
+
+class ReferenceIndex:
+    """
+    Read-only view of a built reference artifact index
+    """
+
+    def __init__(self, index_dir: str):
+        """
+        Open an index directory (numeric arrays are memory-mapped, text
+        artifacts are parsed on access, keeping the most recently used
+        REFERENCE_INDEX_CACHE_SIZE rows)
+
+        Args:
+            index_dir: Directory written by build_reference_index
+        """
+        self.index_dir = index_dir
+        with open(os.path.join(index_dir, 'manifest.json'), 'r', encoding='utf-8') as f:
+            self.manifest = json.load(f)
+        with open(os.path.join(index_dir, 'keys.json'), 'r', encoding='utf-8') as f:
+            self._rows = {make_reference_key(*key): row for row, key in enumerate(json.load(f))}
+
+        count = self.manifest['count']
+        self._offsets = self._memmap('offsets.i64', np.int64, (count,))
+        self._emotions = None
+        if self.manifest.get('emotion_model') is not None:
+            self._emotions = self._memmap('emotions.f32', np.float32, (count, len(RELEVANT_EMOTIONS)))
+        self._load_analysis = lru_cache(maxsize=REFERENCE_INDEX_CACHE_SIZE)(self._read_analysis)
+
+    def _memmap(self, name, dtype, shape):
+        """Memory-map one numeric array of the index (empty indexes map to empty arrays)"""
+        if shape[0] == 0:
+            return np.zeros(shape, dtype=dtype)
+        return np.memmap(os.path.join(self.index_dir, name), dtype=dtype, mode='r', shape=shape)
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __contains__(self, key):
+        return key is not None and make_reference_key(*key) in self._rows
+
+    def _row(self, key) -> Optional[int]:
+        if key is None:
+            return None
+        return self._rows.get(make_reference_key(*key))
+
+    def analysis(self, key) -> Optional[TextAnalysis]:
+        """
+        Precomputed TextAnalysis of a reference turn
+
+        Args:
+            key: (patient_id, session_id, turn)
+
+        Returns:
+            TextAnalysis with tokens, sentences and stems filled in, or None if not indexed
+        """
+        row = self._row(key)
+        if row is None:
+            return None
+        return self._load_analysis(row)
+
+    def _read_analysis(self, row: int) -> TextAnalysis:
+        """Parse one row of artifacts.jsonl into a TextAnalysis"""
+        with open(os.path.join(self.index_dir, 'artifacts.jsonl'), 'rb') as f:
+            f.seek(int(self._offsets[row]))
+            record = json.loads(f.readline())
+        return TextAnalysis.from_artifacts(
+            record['text'],
+            tokens=record['tokens'],
+            sentences=record['sentences'],
+            sentence_tokens=record['sentence_tokens'],
+            stems=record['stems']
+        )
+
+    def lookup(self, key, text: str) -> Tuple[Optional[TextAnalysis], Optional[np.ndarray]]:
+        """
+        Precomputed analysis and emotion scores of a reference turn, provided the
+        indexed text is the reference being scored
+
+        Args:
+            key: (patient_id, session_id, turn), or None
+            text: Reference text the caller is about to score
+
+        Returns:
+            (TextAnalysis, emotion distribution), or (None, None) when the key is
+            not indexed or its text differs
+        """
+        analysis = self.analysis(key)
+        if analysis is None or analysis.text != text:
+            return None, None
+        return analysis, self.emotion_distribution(key)
+
+    def emotion_distribution(self, key) -> Optional[np.ndarray]:
+        """
+        Unweighted emotion scores of a reference turn, aligned to RELEVANT_EMOTIONS
+
+        Args:
+            key: (patient_id, session_id, turn)
+
+        Returns:
+            Vector of float64 scores, or None if not indexed or built without an emotion model
+        """
+        row = self._row(key)
+        if row is None or self._emotions is None:
+            return None
+        return np.array(self._emotions[row], dtype=np.float64)
+
+
+def load_reference_index(dataset_path: str = DATASET_PATH,
+                         index_dir: str = REFERENCE_INDEX_DIR) -> Optional[ReferenceIndex]:
+    """
+    Load the reference index if it exists and matches the current dataset
+
+    Args:
+        dataset_path: Path to the JSONL dataset the index must have been built from
+        index_dir: Index directory
+
+    Returns:
+        ReferenceIndex, or None when the index is missing, stale or built for
+        a different emotion model (callers then compute references live)
+    """
+    manifest_path = os.path.join(index_dir, 'manifest.json')
+    if not os.path.exists(manifest_path) or not os.path.exists(dataset_path):
+        return None
+
+    try:
+        index = ReferenceIndex(index_dir)
+    except (OSError, ValueError, KeyError):
+        return None
+
+    manifest = index.manifest
+    if (manifest.get('version') != INDEX_FORMAT_VERSION
+            or manifest.get('dataset') != _dataset_fingerprint(dataset_path)
+            or manifest.get('emotion_model') != EMOTION_MODEL_NAME
+            or manifest.get('emotions') != RELEVANT_EMOTIONS):
+        return None
+
+    return index
+
+
+if __name__ == '__main__':
+    import time
+
+    start = time.perf_counter()
+    count = build_reference_index()
+    print(f"✅ Indexed {count} reference turns into {REFERENCE_INDEX_DIR} "
+          f"in {time.perf_counter() - start:.1f}s")
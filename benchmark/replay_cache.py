@@ -0,0 +1,222 @@
+"""
+LLM Response Replay Cache
+
+Record/replay layer for Azure OpenAI chat completions. Each response is keyed
+by a SHA-256 of the deployment, the full messages list and the sampling
+parameters, and stored in an append-only JSONL file, so an experiment can be
+re-run (e.g. after a metric change) without network access or API cost.
+
+Modes:
+- record:         always call the API and append the response (latest record wins)
+- replay:         serve only recorded responses; a missing key raises ReplayCacheMiss
+- record-missing: serve recorded responses and call the API (and record) on a miss
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: appends are only serialized within a process
+    fcntl = None
+
+from benchmark.config import REPLAY_CACHE_PATH, REPLAY_MODE
+
+REPLAY_MODES = ('record', 'replay', 'record-missing')
+
+
+class ReplayCacheMiss(LookupError):
+    """Raised in replay mode when a request has no recorded response"""
+
+
+def request_key(deployment: str, messages: List[Dict], params: Dict) -> str:
+    """
+    Content key of a chat completion request
+
+    Args:
+        deployment: Azure deployment name
+        messages: Full chat messages list
+        params: Sampling parameters (temperature, max_tokens, ...)
+
+    Returns:
+        SHA-256 hex digest of the canonical JSON of the request
+    """
+    payload = json.dumps(
+        {'deployment': deployment, 'messages': messages, 'params': params},
+        sort_keys=True, ensure_ascii=False, separators=(',', ':')
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ReplayCache:
+    """
+    Append-only JSONL store of recorded chat completion responses
+    """
+
+    def __init__(self, path: str = REPLAY_CACHE_PATH, mode: str = 'record-missing'):
+        """
+        Open the cache and load recorded responses
+
+        Args:
+            path: JSONL file path (created on first record)
+            mode: 'record', 'replay' or 'record-missing'
+        """
+        if mode not in REPLAY_MODES:
+            raise ValueError(f"Unknown replay mode {mode!r}; expected one of {REPLAY_MODES}")
+        self.path = path
+        self.mode = mode
+        self._responses: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'recorded': 0}
+        self._load()
+
+    def _load(self):
+        """Read recorded responses (later lines override earlier ones; a torn last line is skipped)"""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                self._responses[record['key']] = record['response']
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Recorded response for a request key
+
+        Args:
+            key: Key from request_key
+
+        Returns:
+            Response text, or None when not recorded
+        """
+        with self._lock:
+            return self._responses.get(key)
+
+    def put(self, key: str, response: str, deployment: str = None):
+        """
+        Record a response (appended to the file)
+
+        Args:
+            key: Key from request_key
+            response: Response text
+            deployment: Deployment name, stored for inspection only
+        """
+        line = json.dumps({
+            'key': key,
+            'deployment': deployment,
+            'response': response,
+            'recorded_at': time.time()
+        }, ensure_ascii=False) + '\n'
+
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            with open(self.path, 'ab+') as f:
+                # Whole-line appends under an exclusive lock so concurrent writers never interleave
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    # Terminate a torn line left by an interrupted append so this record stays readable
+                    size = f.seek(0, os.SEEK_END)
+                    if size:
+                        f.seek(size - 1)
+                        if f.read(1) != b'\n':
+                            line = '\n' + line
+                    f.write(line.encode('utf-8'))
+                    f.flush()
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(f, fcntl.LOCK_UN)
+            self._responses[key] = response
+            self.stats['recorded'] += 1
+
+    def lookup(self, key: str) -> Optional[str]:
+        """
+        Response to serve for a request according to the mode
+
+        Args:
+            key: Key from request_key
+
+        Returns:
+            Recorded response, or None when the API should be called
+
+        Raises:
+            ReplayCacheMiss: In replay mode when the key was never recorded
+        """
+        response = None if self.mode == 'record' else self.get(key)
+        with self._lock:
+            self.stats['hits' if response is not None else 'misses'] += 1
+        if response is None and self.mode == 'replay':
+            raise ReplayCacheMiss(f"No recorded response for request {key[:12]} in {self.path}")
+        return response
+
+    def complete(self, deployment: str, messages: List[Dict], params: Dict, call: Callable[[], str]) -> str:
+        """
+        Serve a chat completion from the cache or the API
+
+        Args:
+            deployment: Azure deployment name
+            messages: Full chat messages list
+            params: Sampling parameters
+            call: Function performing the API request and returning the response text
+
+        Returns:
+            Response text
+        """
+        key = request_key(deployment, messages, params)
+        response = self.lookup(key)
+        if response is None:
+            response = call()
+            self.put(key, response, deployment)
+        return response
+
+    async def acomplete(self, deployment: str, messages: List[Dict], params: Dict, call: Callable) -> str:
+        """
+        Async counterpart of complete
+
+        Args:
+            deployment: Azure deployment name
+            messages: Full chat messages list
+            params: Sampling parameters
+            call: Coroutine function performing the API request and returning the response text
+
+        Returns:
+            Response text
+        """
+        key = request_key(deployment, messages, params)
+        response = self.lookup(key)
+        if response is None:
+            response = await call()
+            self.put(key, response, deployment)
+        return response
+
+    def __len__(self):
+        return len(self._responses)
+
+
+# Process-wide default cache
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_replay_cache() -> Optional[ReplayCache]:
+    """
+    Shared replay cache at REPLAY_CACHE_PATH in REPLAY_MODE
+
+    Returns:
+        ReplayCache instance (created on first use), or None when REPLAY_MODE is None
+    """
+    global _default_cache
+    if REPLAY_MODE is None:
+        return None
+    if _default_cache is None:
+        with _default_cache_lock:
+            if _default_cache is None:
+                _default_cache = ReplayCache(REPLAY_CACHE_PATH, REPLAY_MODE)
+    return _default_cache
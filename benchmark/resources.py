@@ -0,0 +1,206 @@
+"""
+Lazy Resource Loading Module
+
+Heavy resources (emotion model, CMU dictionary, WordNet, punkt, Azure OpenAI
+SDK) are loaded on first use instead of at import time. Each resource is
+loaded at most once per process, can be warmed up in a background thread,
+and records how long its load took for the startup timing report.
+"""
+
+import importlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List
+
+from benchmark.config import EMOTION_MODEL_NAME
+
+
+class LazyResource:
+    """
+    A resource loaded once, on first access, behind a lock
+    """
+
+    def __init__(self, name: str, loader: Callable):
+        """
+        Args:
+            name: Resource name used in reports
+            loader: Zero-argument function returning the loaded resource
+        """
+        self.name = name
+        self.loader = loader
+        self.status = 'pending'
+        self.load_seconds = None
+        self.error = None
+        self._value = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        """
+        Return the resource, loading it on first call
+
+        Returns:
+            The loaded resource
+
+        Raises:
+            Whatever the loader raised (re-raised on every call after a failure)
+        """
+        if self.status == 'ready':
+            return self._value
+
+        with self._lock:
+            if self.status != 'ready':
+                self.status = 'loading'
+                start = time.perf_counter()
+                try:
+                    self._value = self.loader()
+                except Exception as e:
+                    self.status = 'failed'
+                    self.error = str(e)
+                    raise
+                finally:
+                    self.load_seconds = time.perf_counter() - start
+                self.status = 'ready'
+                self.error = None
+        return self._value
+
+
+# =================================
+# RESOURCE LOADERS
+# =================================
+
+def _load_emotion_model():
+    """Build the Hugging Face emotion classification pipeline (None when disabled)"""
+    if EMOTION_MODEL_NAME is None:
+        return None
+
+    from transformers import pipeline
+    return pipeline(
+        "text-classification",
+        model=EMOTION_MODEL_NAME,
+        top_k=None
+    )
+
+
+def _load_cmudict():
+    """Build the shared syllable table from the CMU Pronouncing Dictionary"""
+    from benchmark.syllables import load_syllable_table
+    return load_syllable_table()
+
+
+def _load_wordnet():
+    """Load the WordNet corpus used by METEOR synonym matching"""
+    from nltk.corpus import wordnet
+    wordnet.ensure_loaded()
+    return wordnet
+
+
+def _load_punkt():
+    """Load (and cache inside nltk.data) the punkt sentence tokenizer"""
+    import nltk
+    return nltk.data.load('tokenizers/punkt/english.pickle')
+
+
+def _load_azure_openai():
+    """Import the OpenAI SDK used by the Azure client"""
+    return importlib.import_module('openai')
+
+
+_RESOURCES: Dict[str, LazyResource] = OrderedDict()
+
+
+def register_resource(name: str, loader: Callable) -> LazyResource:
+    """
+    Register a lazily loaded resource
+
+    Args:
+        name: Unique resource name
+        loader: Zero-argument function returning the loaded resource
+
+    Returns:
+        The registered LazyResource
+    """
+    resource = LazyResource(name, loader)
+    _RESOURCES[name] = resource
+    return resource
+
+
+register_resource('punkt', _load_punkt)
+register_resource('cmudict', _load_cmudict)
+register_resource('wordnet', _load_wordnet)
+register_resource('azure_openai', _load_azure_openai)
+register_resource('emotion_model', _load_emotion_model)
+
+
+def get_resource(name: str):
+    """
+    Return a registered resource, loading it if needed
+
+    Args:
+        name: Resource name
+
+    Returns:
+        The loaded resource
+    """
+    return _RESOURCES[name].get()
+
+
+def get_emotion_model():
+    """Return the emotion classification pipeline (loaded on first use)"""
+    return get_resource('emotion_model')
+
+
+def _warm_up_all(names: List[str]):
+    """Load each resource in turn, recording failures instead of raising"""
+    for name in names:
+        try:
+            _RESOURCES[name].get()
+        except Exception:
+            pass
+
+
+def warm_up(names: Iterable[str] = None, background: bool = True):
+    """
+    Load resources ahead of first use
+
+    Args:
+        names: Resources to load (defaults to all registered resources, in order)
+        background: Load in a daemon thread instead of blocking
+
+    Returns:
+        The warm-up thread when background is True, otherwise None
+    """
+    names = list(names) if names is not None else list(_RESOURCES)
+    if not background:
+        _warm_up_all(names)
+        return None
+
+    thread = threading.Thread(target=_warm_up_all, args=(names,), name='resource-warm-up', daemon=True)
+    thread.start()
+    return thread
+
+
+def get_startup_report() -> List[Dict]:
+    """
+    Per-resource load status and timing
+
+    Returns:
+        List of dicts with resource, status, seconds and error
+    """
+    return [
+        {
+            'resource': resource.name,
+            'status': resource.status,
+            'seconds': round(resource.load_seconds, 3) if resource.load_seconds is not None else None,
+            'error': resource.error
+        }
+        for resource in _RESOURCES.values()
+    ]
+
+
+if __name__ == '__main__':
+    # Load everything in the foreground and print the timing report
+    warm_up(background=False)
+    for row in get_startup_report():
+        seconds = f"{row['seconds']:.3f}s" if row['seconds'] is not None else '-'
+        print(f"{row['resource']:<15} {row['status']:<8} {seconds:>9}  {row['error'] or ''}")
@@ -0,0 +1,321 @@
+"""
+Retrieval Over the Therapy Dataset
+
+Few-shot selection: a prebuilt BM25 index over the first patient turn of
+every dataset session returns the k examples most similar to the current
+patient message, preferring one example per condition. Prompts built from a
+set of examples are cached, so choosing examples and building the prompt
+cost about a millisecond per message instead of reloading the dataset.
+
+Nearest reference: a TF-IDF cosine index over every patient turn finds the
+human doctor response to the most similar patient message, used as the
+evaluation reference when no benchmark scenario turn is available.
+"""
+
+import threading
+from collections import Counter, OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from benchmark.config import BM25_B, BM25_K1, FEW_SHOT_EXAMPLES, FEW_SHOT_PROMPT_CACHE_SIZE
+from benchmark.lexicon_matcher import tokenize_for_matching
+
+FEW_SHOT_PROMPT_HEADER = """You are a professional psychological counselor with expertise in mental health.
+You provide empathetic, supportive, and evidence-based counseling using techniques like CBT,
+motivational interviewing, and solution-focused brief therapy.
+
+Here are some examples of good therapeutic responses:
+
+"""
+
+FEW_SHOT_PROMPT_FOOTER = """
+Now, respond to the patient with the same level of empathy, professionalism, and therapeutic skill.
+"""
+
+
+def build_few_shot_prompt(examples: Sequence[Dict]) -> str:
+    """
+    Build system prompt with few-shot examples
+
+    Args:
+        examples: Dicts with condition, patient and doctor (first turn of a session)
+
+    Returns:
+        System prompt text
+    """
+    prompt = FEW_SHOT_PROMPT_HEADER
+    for i, example in enumerate(examples, 1):
+        prompt += f"""
+Example {i} ({example['condition']}):
+Patient: {example['patient']}
+Counselor: {example['doctor']}
+
+"""
+    return prompt + FEW_SHOT_PROMPT_FOOTER
+
+
+def _count_terms(documents: Sequence[str]):
+    """
+    Sparse term counts of a document collection
+
+    Returns:
+        (vocabulary, rows, cols, counts, lengths) with one (row, col, count) entry
+        per distinct term of each document and lengths in tokens per document
+    """
+    vocabulary: Dict[str, int] = {}
+    rows, cols, counts = [], [], []
+    lengths = np.zeros(len(documents), dtype=np.float64)
+    for row, text in enumerate(documents):
+        tokens = tokenize_for_matching(text)
+        lengths[row] = len(tokens)
+        for term, count in Counter(tokens).items():
+            rows.append(row)
+            cols.append(vocabulary.setdefault(term, len(vocabulary)))
+            counts.append(count)
+    return (vocabulary, np.asarray(rows, dtype=np.int64), np.asarray(cols, dtype=np.int64),
+            np.asarray(counts, dtype=np.float64), lengths)
+
+
+class BM25Index:
+    """
+    Okapi BM25 over a fixed document collection, stored as a sparse document-term weight matrix
+    """
+
+    def __init__(self, documents: Sequence[str], k1: float = BM25_K1, b: float = BM25_B):
+        """
+        Args:
+            documents: Texts to index
+            k1: Term frequency saturation
+            b: Document length normalization
+        """
+        self.vocabulary, rows, cols, counts, lengths = _count_terms(documents)
+
+        # Robertson-Sparck Jones idf (kept non-negative) and saturated, length-normalized tf
+        document_frequency = np.bincount(cols, minlength=len(self.vocabulary))
+        self.idf = np.log(1.0 + (len(documents) - document_frequency + 0.5) / (document_frequency + 0.5))
+        average_length = lengths.mean() if len(documents) and lengths.mean() > 0 else 1.0
+        tf = counts * (k1 + 1) / (counts + k1 * (1 - b + b * lengths[rows] / average_length))
+
+        # Column-major so a query only touches the columns of its terms
+        self.weights = sparse.csc_matrix(
+            (tf * self.idf[cols], (rows, cols)), shape=(len(documents), len(self.vocabulary))
+        )
+
+    def __len__(self):
+        return self.weights.shape[0]
+
+    def scores(self, query: str) -> np.ndarray:
+        """
+        BM25 score of every document for a query
+
+        Args:
+            query: Query text
+
+        Returns:
+            Array of scores aligned with the indexed documents
+        """
+        columns = sorted({self.vocabulary[term] for term in tokenize_for_matching(query) if term in self.vocabulary})
+        if not columns:
+            return np.zeros(len(self))
+        return np.asarray(self.weights[:, columns].sum(axis=1)).ravel()
+
+
+class FewShotRetriever:
+    """
+    Few-shot example service: BM25 selection over first patient turns plus a prompt cache
+    """
+
+    def __init__(self, examples: List[Dict], prompt_cache_size: int = FEW_SHOT_PROMPT_CACHE_SIZE):
+        """
+        Args:
+            examples: Dicts with condition, patient and doctor, in dataset order
+            prompt_cache_size: Maximum cached prompts (one per distinct example set)
+        """
+        self.examples = examples
+        self.index = BM25Index([example['patient'] for example in examples])
+        self.prompt_cache_size = prompt_cache_size
+        self._prompts = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'prompt_hits': 0, 'prompt_misses': 0}
+
+    @classmethod
+    def from_dataset_cache(cls, dataset_cache) -> 'FewShotRetriever':
+        """
+        Build the retriever from the first turn of every session in the columnar dataset cache
+
+        Args:
+            dataset_cache: benchmark.dataset_cache.DatasetCache
+
+        Returns:
+            FewShotRetriever over all sessions that have at least one turn
+        """
+        first_turns = dataset_cache.turns[dataset_cache.turns['turn'] == 1]
+        conditions = dataset_cache.sessions['condition'].to_numpy()
+        examples = [
+            {'position': int(position), 'condition': conditions[position], 'patient': patient, 'doctor': doctor}
+            for position, patient, doctor in zip(
+                first_turns['position'].to_numpy(), first_turns['patient'], first_turns['doctor']
+            )
+        ]
+        return cls(examples)
+
+    def select(self, patient_message: str, k: int = FEW_SHOT_EXAMPLES, diverse: bool = True) -> List[int]:
+        """
+        Indexes of the examples most similar to a patient message
+
+        Ties (including a message with no known words) fall back to dataset order.
+
+        Args:
+            patient_message: Current patient message
+            k: Number of examples
+            diverse: Prefer at most one example per condition
+
+        Returns:
+            Example indexes, best match first
+        """
+        scores = self.index.scores(patient_message or '')
+        # Stable sort keeps dataset order among equal scores
+        ranking = np.argsort(-scores, kind='stable')
+        if not diverse:
+            return [int(i) for i in ranking[:k]]
+
+        chosen, seen_conditions = [], set()
+        for i in ranking:
+            condition = self.examples[i]['condition']
+            if condition not in seen_conditions:
+                chosen.append(int(i))
+                seen_conditions.add(condition)
+                if len(chosen) == k:
+                    return chosen
+        # Fewer conditions than k: fill with the best remaining matches
+        for i in ranking:
+            if int(i) not in chosen:
+                chosen.append(int(i))
+                if len(chosen) == k:
+                    break
+        return chosen
+
+    def prompt_for(self, patient_message: str, k: int = FEW_SHOT_EXAMPLES) -> str:
+        """
+        Few-shot system prompt for a patient message (cached per example set)
+
+        Args:
+            patient_message: Current patient message
+            k: Number of examples
+
+        Returns:
+            System prompt text
+        """
+        key: Tuple[int, ...] = tuple(self.select(patient_message, k))
+        with self._lock:
+            prompt = self._prompts.get(key)
+            if prompt is not None:
+                self._prompts.move_to_end(key)
+                self.stats['prompt_hits'] += 1
+                return prompt
+            self.stats['prompt_misses'] += 1
+
+        prompt = build_few_shot_prompt([self.examples[i] for i in key])
+        with self._lock:
+            self._prompts[key] = prompt
+            while len(self._prompts) > self.prompt_cache_size:
+                self._prompts.popitem(last=False)
+        return prompt
+
+
+class ReferenceSearchIndex:
+    """
+    Cosine search over TF-IDF vectors of every patient turn, returning the doctor turn that answered it
+
+    Document vectors are stored unnormalized in a column-major sparse matrix
+    with their L2 norms precomputed, so a query only reads the postings of its
+    own terms and the cost grows with those postings, not with the corpus size.
+    """
+
+    def __init__(self, patient_texts: Sequence[str], doctor_texts: Sequence[str], keys: Sequence[tuple]):
+        """
+        Args:
+            patient_texts: Patient message of each turn
+            doctor_texts: Doctor response of each turn (the reference)
+            keys: (patient_id, session_id, turn) of each turn
+        """
+        self.doctor_texts = list(doctor_texts)
+        self.keys = list(keys)
+        self.vocabulary, rows, cols, counts, _ = _count_terms(patient_texts)
+
+        # Sublinear tf, smoothed idf
+        document_frequency = np.bincount(cols, minlength=len(self.vocabulary))
+        self.idf = np.log((1.0 + len(patient_texts)) / (1.0 + document_frequency)) + 1.0
+        values = (1.0 + np.log(counts)) * self.idf[cols]
+
+        self.weights = sparse.csc_matrix(
+            (values, (rows, cols)), shape=(len(patient_texts), len(self.vocabulary))
+        )
+        self.norms = np.sqrt(np.bincount(rows, weights=values ** 2, minlength=len(patient_texts)))
+        self.norms[self.norms == 0] = 1.0
+
+    @classmethod
+    def from_dataset_cache(cls, dataset_cache) -> 'ReferenceSearchIndex':
+        """
+        Index every turn of the columnar dataset cache
+
+        Args:
+            dataset_cache: benchmark.dataset_cache.DatasetCache
+
+        Returns:
+            ReferenceSearchIndex over all turns
+        """
+        turns = dataset_cache.turns
+        positions = turns['position'].to_numpy()
+        patient_ids = dataset_cache.sessions['patient_id'].to_numpy()[positions].tolist()
+        session_ids = dataset_cache.sessions['session_id'].to_numpy()[positions].tolist()
+        keys = list(zip(patient_ids, session_ids, turns['turn'].tolist()))
+        return cls(turns['patient'].tolist(), turns['doctor'].tolist(), keys)
+
+    def __len__(self):
+        return self.weights.shape[0]
+
+    def search(self, patient_message: str, k: int = 1) -> List[Dict]:
+        """
+        Turns whose patient message is most similar to a patient message
+
+        Args:
+            patient_message: Current patient message
+            k: Number of matches
+
+        Returns:
+            Up to k dicts with doctor (reference text), key and score (cosine
+            similarity), best first; empty when no indexed word occurs in the message
+        """
+        term_counts = Counter(
+            self.vocabulary[term] for term in tokenize_for_matching(patient_message or '') if term in self.vocabulary
+        )
+        if not term_counts:
+            return []
+
+        columns = np.fromiter(term_counts, dtype=np.int64)
+        query = (1.0 + np.log(np.fromiter(term_counts.values(), dtype=np.float64))) * self.idf[columns]
+        scores = self.weights[:, columns] @ query / (self.norms * np.linalg.norm(query))
+
+        k = min(k, len(scores))
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best], kind='stable')]
+        return [
+            {'doctor': self.doctor_texts[i], 'key': self.keys[i], 'score': float(scores[i])}
+            for i in best if scores[i] > 0
+        ]
+
+    def nearest(self, patient_message: str) -> Optional[Dict]:
+        """
+        Best-matching reference for a patient message
+
+        Args:
+            patient_message: Current patient message
+
+        Returns:
+            Dict with doctor, key and score, or None when nothing matches
+        """
+        matches = self.search(patient_message, k=1)
+        return matches[0] if matches else None
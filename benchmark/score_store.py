@@ -0,0 +1,249 @@
+"""
+Persistent Score Store
+
+SQLite cache of metric scores shared across runs. Each score is keyed by:
+
+- metric name
+- fingerprint of the config constants (and scoring code version) the metric depends on
+- hash of the reference text ('' for metrics that only look at the response)
+- hash of the candidate text
+
+Changing a constant in config.py changes only the fingerprints of the metrics
+that read it, so e.g. editing EMOTION_WEIGHTS re-scores sentiment while every
+other stored score is reused, and an unchanged re-run is served entirely from disk.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import benchmark.config as config
+from benchmark.config import SCORE_STORE_PATH
+from benchmark.emotion_cache import text_hash
+
+SCHEMA_VERSION = 1
+
+# Score keys produced per (reference, response) pair, in output order
+TURN_METRICS = [
+    'rouge_score', 'meteor_score', 'ethical_alignment',
+    'sentiment_distribution', 'inclusivity_score', 'complexity_score'
+]
+
+# Metrics that ignore the reference text
+RESPONSE_ONLY_METRICS = {'ethical_alignment', 'inclusivity_score', 'complexity_score'}
+
+# Scoring code version and config constants each metric depends on.
+# Bump a version when the metric's code changes (tests/test_score_store.py pins
+# each version to a digest of the metric's source, so a forgotten bump fails).
+METRIC_DEPENDENCIES = {
+    'rouge_score': ('2', ['ROUGE_METRICS', 'ROUGE_USE_STEMMER']),
+    'meteor_score': ('2', ['METEOR_ALPHA', 'METEOR_BETA', 'METEOR_GAMMA']),
+    'ethical_alignment': ('2', [
+        'LGBTQ_AFFIRMING_TERMS', 'SOCIAL_WORK_PROFESSIONAL_TERMS', 'CRISIS_ASSESSMENT_TERMS',
+        'SUPPORTIVE_TERMS', 'QUESTION_PATTERNS', 'ETHICAL_NEGATIVE_TERMS'
+    ]),
+    'sentiment_distribution': ('1', [
+        'EMOTION_MODEL_NAME', 'RELEVANT_EMOTIONS', 'EMOTION_WEIGHTS', 'EMOTION_MAX_TOKENS'
+    ]),
+    'inclusivity_score': ('2', [
+        'INCLUSIVITY_LEXICON', 'CORE_TERMS', 'SECONDARY_TERMS', 'PENALTY_TERMS', 'SEVERE_PENALTY_TERMS'
+    ]),
+    'complexity_score': ('1', ['READABILITY_CONSTANTS'])
+}
+
+
+def _canonical(value):
+    """JSON-serializable, order-independent form of a config value"""
+    if isinstance(value, (set, frozenset)):
+        return sorted(_canonical(item) for item in value)
+    if isinstance(value, dict):
+        return {str(key): _canonical(item) for key, item in sorted(value.items())}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(item) for item in value]
+    return value
+
+
+def metric_fingerprint(metric: str) -> str:
+    """
+    Fingerprint of the scoring code version and config constants a metric depends on
+
+    Args:
+        metric: One of TURN_METRICS
+
+    Returns:
+        Short hex digest (changes whenever any dependency changes)
+    """
+    version, names = METRIC_DEPENDENCIES[metric]
+    payload = json.dumps(
+        {'version': version, 'config': {name: _canonical(getattr(config, name)) for name in names}},
+        sort_keys=True
+    )
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=8).hexdigest()
+
+
+class ScoreStore:
+    """
+    SQLite-backed store of metric scores keyed by metric, config fingerprint and text hashes
+    """
+
+    def __init__(self, path: str = SCORE_STORE_PATH):
+        """
+        Open (or create) the score database
+
+        Args:
+            path: SQLite file path (':memory:' for a throwaway store)
+        """
+        self.path = path
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('PRAGMA synchronous=NORMAL')
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS scores ('
+            ' metric TEXT NOT NULL, fingerprint TEXT NOT NULL,'
+            ' reference_hash TEXT NOT NULL, candidate_hash TEXT NOT NULL, score REAL NOT NULL,'
+            ' PRIMARY KEY (metric, fingerprint, reference_hash, candidate_hash)'
+            ') WITHOUT ROWID'
+        )
+        self._connection.execute(f'PRAGMA user_version={SCHEMA_VERSION}')
+        self._connection.commit()
+
+        # Fingerprints are fixed for the lifetime of the store (config is read once)
+        self.fingerprints = {metric: metric_fingerprint(metric) for metric in TURN_METRICS}
+
+    def _key(self, metric: str, reference_text: str, candidate_text: str) -> Tuple[str, str, str, str]:
+        reference_hash = '' if metric in RESPONSE_ONLY_METRICS else text_hash(reference_text)
+        return metric, self.fingerprints[metric], reference_hash, text_hash(candidate_text)
+
+    def get_many(self, metric: str, pairs: List[Tuple[str, str]]) -> List[Optional[float]]:
+        """
+        Look up stored scores for one metric
+
+        Args:
+            metric: One of TURN_METRICS
+            pairs: (reference_text, candidate_text) pairs
+
+        Returns:
+            List aligned with pairs holding the score or None for each miss
+        """
+        keys = [self._key(metric, reference, candidate) for reference, candidate in pairs]
+        found = {}
+        with self._lock:
+            # Query in chunks to stay under SQLite's bound-parameter limit
+            for start in range(0, len(keys), 250):
+                chunk = keys[start:start + 250]
+                rows = self._connection.execute(
+                    'SELECT reference_hash, candidate_hash, score FROM scores'
+                    ' WHERE metric = ? AND fingerprint = ? AND (reference_hash, candidate_hash) IN ('
+                    + ','.join('(?, ?)' for _ in chunk) + ')',
+                    [metric, self.fingerprints[metric]] + [part for key in chunk for part in key[2:]]
+                ).fetchall()
+                found.update({(reference_hash, candidate_hash): score for reference_hash, candidate_hash, score in rows})
+        return [found.get(key[2:]) for key in keys]
+
+    def put_many(self, metric: str, pairs: List[Tuple[str, str]], scores: Iterable[float]):
+        """
+        Store scores for one metric
+
+        Args:
+            metric: One of TURN_METRICS
+            pairs: (reference_text, candidate_text) pairs
+            scores: Scores aligned with pairs
+        """
+        rows = [
+            self._key(metric, reference, candidate) + (float(score),)
+            for (reference, candidate), score in zip(pairs, scores)
+        ]
+        with self._lock:
+            self._connection.executemany('INSERT OR REPLACE INTO scores VALUES (?, ?, ?, ?, ?)', rows)
+            self._connection.commit()
+
+    def get_turn(self, reference_text: str, candidate_text: str) -> Dict[str, float]:
+        """
+        All stored metric scores for one (reference, response) pair
+
+        Args:
+            reference_text: Reference response
+            candidate_text: AI response
+
+        Returns:
+            Mapping of metric to score for the metrics found
+        """
+        keys = [self._key(metric, reference_text, candidate_text) for metric in TURN_METRICS]
+        with self._lock:
+            rows = self._connection.execute(
+                'SELECT metric, score FROM scores'
+                ' WHERE (metric, fingerprint, reference_hash, candidate_hash) IN ('
+                + ','.join('(?, ?, ?, ?)' for _ in keys) + ')',
+                [part for key in keys for part in key]
+            ).fetchall()
+        return dict(rows)
+
+    def put_turn(self, reference_text: str, candidate_text: str, scores: Dict[str, float]):
+        """
+        Store metric scores for one (reference, response) pair
+
+        Args:
+            reference_text: Reference response
+            candidate_text: AI response
+            scores: Mapping of metric to score (keys outside TURN_METRICS are ignored)
+        """
+        rows = [
+            self._key(metric, reference_text, candidate_text) + (float(score),)
+            for metric, score in scores.items() if metric in self.fingerprints
+        ]
+        if rows:
+            with self._lock:
+                self._connection.executemany('INSERT OR REPLACE INTO scores VALUES (?, ?, ?, ?, ?)', rows)
+                self._connection.commit()
+
+    def prune(self) -> int:
+        """
+        Delete scores stored under outdated fingerprints
+
+        Returns:
+            Number of rows deleted
+        """
+        with self._lock:
+            deleted = 0
+            for metric, fingerprint in self.fingerprints.items():
+                deleted += self._connection.execute(
+                    'DELETE FROM scores WHERE metric = ? AND fingerprint != ?', (metric, fingerprint)
+                ).rowcount
+            self._connection.commit()
+        return deleted
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self._connection.close()
+
+
+# Process-wide default store (re-opened in child processes)
+_default_store = None
+_default_store_pid = None
+_default_store_lock = threading.Lock()
+
+
+def get_score_store() -> Optional[ScoreStore]:
+    """
+    Shared score store at SCORE_STORE_PATH
+
+    Returns:
+        ScoreStore instance (created on first use), or None when SCORE_STORE_PATH is None
+    """
+    global _default_store, _default_store_pid
+    if SCORE_STORE_PATH is None:
+        return None
+    if _default_store is None or _default_store_pid != os.getpid():
+        with _default_store_lock:
+            if _default_store is None or _default_store_pid != os.getpid():
+                _default_store = ScoreStore(SCORE_STORE_PATH)
+                _default_store_pid = os.getpid()
+    return _default_store
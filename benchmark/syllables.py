@@ -0,0 +1,123 @@
+"""
+Syllable Counting Module for Complexity Scoring
+
+Loads the CMU Pronouncing Dictionary once per process into a compact
+word -> syllable-count table and falls back to a memoized vowel-group
+heuristic for words the dictionary does not cover.
+"""
+
+import re
+import threading
+from functools import lru_cache
+from typing import Dict
+
+import nltk
+
+# Compact syllable table (word -> syllable count of its first pronunciation)
+_syllable_table = None
+_syllable_table_lock = threading.Lock()
+
+# Heuristic fallback patterns
+_VOWEL_GROUP_RE = re.compile(r'[aeiouy]+')
+_LETTER_RE = re.compile(r'[a-z]')
+
+
+def load_syllable_table() -> Dict[str, int]:
+    """
+    Build (once) and return the word -> syllable count table
+
+    Only the first pronunciation of each word is kept, and it is stored as a
+    small int instead of the phoneme lists returned by cmudict.dict().
+
+    Returns:
+        Dictionary mapping lowercase words to syllable counts
+    """
+    global _syllable_table
+    if _syllable_table is None:
+        with _syllable_table_lock:
+            if _syllable_table is None:
+                table = {}
+                for word, phonemes in nltk.corpus.cmudict.entries():
+                    if word not in table:
+                        table[word] = sum(1 for phoneme in phonemes if phoneme[-1].isdigit())
+                _syllable_table = table
+    return _syllable_table
+
+
+@lru_cache(maxsize=65536)
+def estimate_syllables(word: str) -> int:
+    """
+    Heuristic syllable estimate for words missing from the CMU dictionary
+
+    Args:
+        word: Lowercase word
+
+    Returns:
+        Number of vowel groups (silent final 'e' dropped); 0 for tokens without
+        letters and for contraction clitics such as "n't" or "'re"
+    """
+    if not _LETTER_RE.search(word) or word.startswith("'") or word == "n't":
+        return 0
+
+    count = len(_VOWEL_GROUP_RE.findall(word))
+    if count > 1 and word.endswith('e') and not word.endswith(('le', 'ee', 'ye')):
+        count -= 1
+    return max(count, 1)
+
+
+def count_syllables(word: str) -> int:
+    """
+    Count syllables in a word (case-insensitive)
+
+    Args:
+        word: A single word token
+
+    Returns:
+        Syllables from the CMU dictionary, or the heuristic estimate for unknown words
+    """
+    word = word.lower()
+    syllables = load_syllable_table().get(word)
+    if syllables is None:
+        return estimate_syllables(word)
+    return syllables
+
+
+if __name__ == '__main__':
+    # Benchmark per-call cost of the old per-response cmudict load vs the shared table
+    import time
+
+    sample = ("I hear how exhausting this has been for you. It sounds like the anxiety "
+              "shows up most strongly at night, when you're alone with your thoughts. "
+              "What has helped you get through difficult evenings before?")
+    words = nltk.word_tokenize(sample)
+
+    def legacy_total_syllables():
+        cmudict = nltk.corpus.cmudict.dict()
+        return sum(
+            sum(1 for p in cmudict.get(w.lower(), [[0]])[0] if isinstance(p, str) and p[-1].isdigit())
+            for w in words
+        )
+
+    def table_total_syllables():
+        return sum(count_syllables(w) for w in words)
+
+    legacy_runs = 3
+    start = time.perf_counter()
+    for _ in range(legacy_runs):
+        legacy_total_syllables()
+    legacy_ms = (time.perf_counter() - start) / legacy_runs * 1000
+
+    start = time.perf_counter()
+    load_syllable_table()
+    load_ms = (time.perf_counter() - start) * 1000
+
+    table_runs = 10000
+    start = time.perf_counter()
+    for _ in range(table_runs):
+        table_total_syllables()
+    table_ms = (time.perf_counter() - start) / table_runs * 1000
+
+    print(f"Legacy cmudict.dict() per call: {legacy_ms:.2f} ms")
+    print(f"Shared syllable table load (once): {load_ms:.2f} ms")
+    print(f"Shared syllable table per call: {table_ms:.4f} ms")
+    print(f"Speedup per call: {legacy_ms / table_ms:.0f}x")
@@ -0,0 +1,143 @@
+"""
+Shared Text Analysis Module
+
+Tokenizes a response once and exposes every derived view the evaluation
+metrics need (lowercased text, tokens, sentences, ROUGE stems, token sets,
+lexicon hits and word counts). Each view is computed on first access and then reused,
+so scoring a turn with all six metrics tokenizes each text only once.
+"""
+
+from collections import Counter
+from functools import cached_property
+from typing import Dict, List, Set
+
+import nltk
+from rouge_score import tokenizers
+
+from benchmark.config import ROUGE_USE_STEMMER
+from benchmark.lexicon_matcher import get_lexicon_matcher
+
+# ROUGE tokenizer (lowercase, alphanumeric split, Porter stemming)
+_ROUGE_TOKENIZER = tokenizers.DefaultTokenizer(use_stemmer=ROUGE_USE_STEMMER)
+
+
+class TextAnalysis:
+    """
+    Precomputed analysis of a single text shared by all metrics
+
+    Attributes are lazy: a metric that only needs ROUGE stems never pays for
+    sentence splitting, but once a view is computed every other metric reuses it.
+    """
+
+    def __init__(self, text: str):
+        """
+        Args:
+            text: Raw response text
+        """
+        self.text = text
+
+    @classmethod
+    def from_artifacts(cls, text: str, **views) -> 'TextAnalysis':
+        """
+        Build an analysis with some views already filled in (e.g. loaded from
+        the reference artifact index); the remaining views stay lazy.
+
+        Args:
+            text: Raw response text
+            **views: Precomputed attribute values, e.g. tokens=[...], stems=[...]
+
+        Returns:
+            TextAnalysis with the given views set
+        """
+        analysis = cls(text)
+        analysis.__dict__.update(views)
+        return analysis
+
+    @cached_property
+    def lower(self) -> str:
+        """Lowercased text used for lexicon and phrase matching"""
+        return self.text.lower()
+
+    @cached_property
+    def is_blank(self) -> bool:
+        """True when the text has no non-whitespace content"""
+        return not self.lower.strip()
+
+    @cached_property
+    def tokens(self) -> List[str]:
+        """NLTK word tokens of the lowercased text"""
+        return nltk.word_tokenize(self.lower)
+
+    @cached_property
+    def token_set(self) -> Set[str]:
+        """Unique lowercased tokens"""
+        return set(self.tokens)
+
+    @cached_property
+    def token_count(self) -> int:
+        """Number of lowercased tokens (punctuation included)"""
+        return len(self.tokens)
+
+    @cached_property
+    def sentences(self) -> List[str]:
+        """Sentences of the original (case-preserved) text"""
+        return nltk.sent_tokenize(self.text)
+
+    @cached_property
+    def sentence_tokens(self) -> List[List[str]]:
+        """Word tokens of each sentence, case preserved"""
+        return [nltk.word_tokenize(sentence) for sentence in self.sentences]
+
+    @cached_property
+    def words(self) -> List[str]:
+        """All case-preserved word tokens in sentence order"""
+        return [token for sentence in self.sentence_tokens for token in sentence]
+
+    @cached_property
+    def stems(self) -> List[str]:
+        """ROUGE tokens (lowercased, alphanumeric, stemmed)"""
+        return _ROUGE_TOKENIZER.tokenize(self.text)
+
+    @cached_property
+    def stem_ngrams(self) -> Dict[int, Counter]:
+        """Unigram and bigram counts over the ROUGE stems"""
+        return {n: ngram_counts(self.stems, n) for n in (1, 2)}
+
+    @cached_property
+    def lexicon_hits(self) -> Dict[str, Counter]:
+        """Ethical-alignment and inclusivity lexicon hits, per category (see benchmark.lexicon_matcher)"""
+        return get_lexicon_matcher().match(self.text)
+
+    @cached_property
+    def word_count(self) -> int:
+        """Whitespace-delimited word count"""
+        return len(self.lower.split())
+
+
+def ngram_counts(tokens: List[str], n: int) -> Counter:
+    """
+    Count the n-grams of a token list (same tuples as rouge_score uses)
+
+    Args:
+        tokens: Token list
+        n: N-gram order
+
+    Returns:
+        Counter mapping n-gram tuples to occurrences
+    """
+    return Counter(tuple(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+
+
+def analyze_text(text) -> TextAnalysis:
+    """
+    Build a TextAnalysis for a text (an existing analysis is returned as-is)
+
+    Args:
+        text: Raw text or a TextAnalysis
+
+    Returns:
+        TextAnalysis for the text
+    """
+    if isinstance(text, TextAnalysis):
+        return text
+    return TextAnalysis(text)
@@ -0,0 +1,122 @@
+"""
+Tests for the Azure OpenAI clients
+"""
+
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+
+from benchmark.azure_client import AsyncAzureOpenAIClient, AzureOpenAIClient
+from benchmark.fake_azure_server import FakeAzureServer
+from benchmark.rate_limiter import RequestScheduler
+
+_CONVERSATIONS = [
+    [f"Session {session} message {turn}" for turn in range(1, 4)]
+    for session in range(6)
+]
+
+
+def _completion(messages):
+    """Reply that depends on the whole prompt, so history mix-ups change the results"""
+    content = f"{len(messages)} messages, last: {messages[-1]['content']}"
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+class _StubCompletions:
+    """Stand-in for client.chat.completions that records prompts and concurrency"""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.prompts = []
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    def create(self, model, messages, timeout=None, **params):
+        self.prompts.append(json.dumps(messages))
+        time.sleep(self.delay)
+        return _completion(messages)
+
+    async def acreate(self, model, messages, timeout=None, **params):
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight -= 1
+        self.prompts.append(json.dumps(messages))
+        return _completion(messages)
+
+
+def _scheduler():
+    return RequestScheduler(requests_per_minute=10 ** 6, tokens_per_minute=10 ** 9)
+
+
+def _clients(delay, max_concurrency):
+    settings = dict(model_name='GPT-4o', api_key='test', endpoint='http://127.0.0.1:9',
+                    api_version='2024-06-01', deployment='gpt-4o')
+    sync_completions, async_completions = _StubCompletions(), _StubCompletions(delay)
+
+    sync_client = AzureOpenAIClient(**settings, scheduler=_scheduler())
+    sync_client.client = SimpleNamespace(chat=SimpleNamespace(completions=sync_completions))
+
+    async def close():
+        pass
+    async_client = AsyncAzureOpenAIClient(**settings, max_concurrency=max_concurrency, scheduler=_scheduler())
+    async_client.client = SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=async_completions.acreate)), close=close
+    )
+    return sync_client, sync_completions, async_client, async_completions
+
+
+def test_async_sessions_match_sequential_generation():
+    delay = 0.05
+    sync_client, sync_completions, async_client, async_completions = _clients(delay, max_concurrency=3)
+
+    sequential = [sync_client.generate_multi_turn_conversation(turns) for turns in _CONVERSATIONS]
+    start = time.perf_counter()
+    concurrent = async_client.run_conversations(_CONVERSATIONS)
+    elapsed = time.perf_counter() - start
+
+    assert concurrent == sequential
+    assert sorted(async_completions.prompts) == sorted(sync_completions.prompts)
+    assert async_client.conversation_histories == {}
+
+    # Never more than max_concurrency requests in flight, and sessions really overlap
+    assert async_completions.peak_in_flight == 3
+    assert elapsed < len(async_completions.prompts) * delay * 2 / 3
+
+
+def _server_client(server, **kwargs):
+    return AzureOpenAIClient(model_name='GPT-4o', api_key='test', endpoint=server.url, api_version='2024-06-01',
+                             deployment='gpt-4o', scheduler=_scheduler(), **kwargs)
+
+
+def test_streamed_response_matches_and_is_recorded():
+    with FakeAzureServer(latency_ms=0, tokens_per_second=0, mode='echo') as server:
+        streaming, blocking = _server_client(server), _server_client(server)
+        for message in ["I can't sleep.", "Work keeps me up at night."]:
+            deltas = list(streaming.generate_counselor_response_stream(message))
+            assert len(deltas) > 1
+            assert ''.join(deltas) == blocking.generate_counselor_response(message)
+        assert streaming.conversation_history == blocking.conversation_history
+        assert server.stats['streamed'] == 2
+
+
+def test_abandoned_stream_leaves_history_unchanged():
+    with FakeAzureServer(latency_ms=0, tokens_per_second=200, mode='echo') as server:
+        client = _server_client(server)
+        client.generate_counselor_response("I can't sleep.")
+        history = list(client.conversation_history)
+
+        # About two seconds of streamed tokens
+        stream = client.generate_counselor_response_stream("Work keeps me up at night. " * 70)
+        next(stream)
+        stream.close()
+        assert client.conversation_history == history
+
+        # The connection is released instead of streaming to the end
+        deadline = time.perf_counter() + 1.0
+        while server.stats['in_flight'] and time.perf_counter() < deadline:
+            time.sleep(0.01)
+        assert server.stats['in_flight'] == 0
@@ -0,0 +1,50 @@
+"""
+Tests for the token-budgeted conversation history
+"""
+
+from benchmark import conversation_history
+from benchmark.conversation_history import ConversationHistory, count_message_tokens
+
+
+def _turn(index):
+    return f"Patient: I have been struggling with sleep for {index} weeks now.", \
+        f"That sounds exhausting. What has changed in the last {index} weeks?"
+
+
+def test_failed_requests_are_not_reported():
+    history = ConversationHistory()
+    history.build_messages('system', 'first attempt')
+    history.build_messages('system', 'retry')
+    history.add_turn('retry', 'response')
+    history.build_messages('system', 'never answered')
+
+    assert [report['turn'] for report in history.prompt_reports] == [1]
+    assert history.last_prompt_report['turn'] == 2
+
+
+def test_full_history_tokens_matches_transcript():
+    history = ConversationHistory(token_budget=120, keep_recent_turns=1)
+    for index in range(8):
+        user_content, assistant_content = _turn(index)
+        messages = history.build_messages('system', user_content)
+        report = history.last_prompt_report
+        full = [{'role': 'system', 'content': 'system'}] + history.messages + [{'role': 'user', 'content': user_content}]
+        assert report['full_history_tokens'] == count_message_tokens(full)
+        assert report['prompt_tokens'] == count_message_tokens(messages)
+        history.add_turn(user_content, assistant_content)
+
+    assert len(history.prompt_reports) == 8
+    history.reset()
+    assert history.build_messages('system', 'hello') == [
+        {'role': 'system', 'content': 'system'}, {'role': 'user', 'content': 'hello'}
+    ]
+    assert history.prompt_reports == []
+
+
+def test_reports_say_whether_token_counts_are_exact(monkeypatch):
+    monkeypatch.setattr(conversation_history, '_get_encoder', lambda: None)
+    history = ConversationHistory()
+    history.build_messages('system', 'hello')
+    assert history.last_prompt_report['token_counts'] == 'estimated'
+    message = {'role': 'user', 'content': 'abcdefgh'}
+    assert count_message_tokens([message]) == 2 + conversation_history.MESSAGE_OVERHEAD_TOKENS
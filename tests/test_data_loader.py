@@ -0,0 +1,118 @@
+"""
+Tests for the byte-offset dataset index
+"""
+
+import json
+import os
+
+import pytest
+
+from benchmark.data_loader import (
+    ScenarioDataset, get_all_scenarios, get_scenario_by_id, iter_scenarios, load_dataset, parse_conversation_turns
+)
+
+
+def _write_dataset(path, sessions):
+    with open(path, 'w', encoding='utf-8') as f:
+        for index, session in enumerate(sessions):
+            f.write(json.dumps(session, ensure_ascii=index % 2 == 0) + '\n')
+
+
+def _sessions():
+    """Sessions with repeated, non-string, nested and quoted field values"""
+    sessions = []
+    for index in range(40):
+        session = {
+            'patient_id': [f'P{index % 15}', index % 4, 'Zoë'][index % 3],
+            'session_id': index,
+            'condition': ['depression', 'anxiety', 'grief "acute"', 'dépression'][index % 4],
+            'risk_flag': index % 6 == 0,
+            'session_state': {'severity': ['mild', 'moderate', 'severe'][index % 3]},
+            'input': f'Patient: I wrote "condition": "anxiety" {index}\nDoctor: Tell me more {index}.'
+        }
+        if index % 5 == 0:
+            session['session_state']['condition'] = 'nested'
+        if index % 7 == 0:
+            del session['condition']
+        if index % 9 == 0:
+            session['session_state']['label'] = 'patient_id'
+        sessions.append(session)
+    return sessions
+
+
+def _linear_scan(path, field, value):
+    return [index for index, session in enumerate(load_dataset(path)) if session.get(field) == value]
+
+
+def test_index_matches_linear_scan(tmp_path):
+    path = str(tmp_path / 'dataset.jsonl')
+    _write_dataset(path, _sessions())
+    dataset = ScenarioDataset(path)
+
+    for condition in ['depression', 'anxiety', 'grief "acute"', 'dépression', 'nested', 'unknown']:
+        assert dataset.positions(condition) == _linear_scan(path, 'condition', condition)
+    for patient_id in ['P0', 'P14', 'Zoë', 1, 3, 'patient_id', 'missing']:
+        expected = _linear_scan(path, 'patient_id', patient_id)
+        assert dataset.position_of(patient_id) == (expected[0] if expected else None)
+    assert dataset.positions() == list(range(40))
+
+
+def test_lookups_return_parsed_sessions(tmp_path):
+    path = str(tmp_path / 'dataset.jsonl')
+    sessions = _sessions()
+    _write_dataset(path, sessions)
+
+    scenario = get_scenario_by_id('P3', path)
+    assert scenario['session_id'] == 3
+    assert scenario['turns'] == parse_conversation_turns(sessions[3]['input'])
+    assert get_scenario_by_id('39', path)['session_id'] == 39
+    assert get_scenario_by_id('40', path) is None
+    assert [s['session_id'] for s in get_all_scenarios(path, condition='anxiety', limit=3)] == [1, 5, 9]
+
+
+def test_index_is_rebuilt_when_the_file_changes(tmp_path):
+    path = str(tmp_path / 'dataset.jsonl')
+    sessions = _sessions()
+    _write_dataset(path, sessions)
+    dataset = ScenarioDataset(path)
+    assert dataset.position_of('Zoë') == 2
+
+    _write_dataset(path, sessions[::-1] + [{'patient_id': 'NEW', 'condition': 'anxiety', 'input': ''}])
+    os.utime(path, ns=(0, 0))
+    assert dataset.position_of('NEW') == 40
+    assert dataset.position_of('Zoë') == _linear_scan(path, 'patient_id', 'Zoë')[0]
+
+
+@pytest.mark.parametrize('filters', [
+    {}, {'condition': 'anxiety'}, {'condition': 'grief "acute"'}, {'condition': 'dépression', 'severity': 'severe'},
+    {'risk_flag': True}, {'risk_flag': False, 'severity': 'mild'}, {'condition': 'nested'}, {'severity': 'unknown'}
+])
+def test_streamed_scenarios_match_filtered_full_load(tmp_path, filters):
+    path = str(tmp_path / 'dataset.jsonl')
+    _write_dataset(path, _sessions())
+    fields = {
+        'condition': lambda session: session.get('condition'),
+        'risk_flag': lambda session: session.get('risk_flag'),
+        'severity': lambda session: session['session_state'].get('severity')
+    }
+    expected = [
+        dict(session, turns=parse_conversation_turns(session['input'])) for session in load_dataset(path)
+        if all(fields[field](session) == value for field, value in filters.items())
+    ]
+
+    for limit in [None, 1, 3]:
+        streamed = [dict(scenario, turns=scenario['turns']) for scenario in iter_scenarios(path, limit=limit, **filters)]
+        assert streamed == expected[:limit]
+    if 'risk_flag' not in filters and 'severity' not in filters:
+        assert get_all_scenarios(path, **filters) == expected
+
+
+def test_streaming_stops_at_the_limit(tmp_path):
+    path = str(tmp_path / 'dataset.jsonl')
+    _write_dataset(path, _sessions())
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('not json, but mentions "anxiety"\n')
+
+    assert [s['session_id'] for s in iter_scenarios(path, condition='anxiety', limit=3)] == [1, 5, 9]
+    with pytest.raises(ValueError):
+        list(iter_scenarios(path, condition='anxiety'))
@@ -0,0 +1,86 @@
+"""
+Tests for the columnar dataset cache
+"""
+
+import json
+import os
+
+import pandas as pd
+
+from benchmark.data_loader import get_all_scenarios, load_dataset, session_summary_row
+from benchmark.dataset_cache import dataset_cache_dir, load_dataset_cache
+
+
+def _sessions(prefix='P'):
+    """Sessions with regular, missing, nested and mixed-type fields"""
+    sessions = []
+    for index in range(12):
+        session = {
+            'patient_id': f'{prefix}{index}',
+            'session_id': index,
+            'condition': ['depression', 'anxiety', 'grief'][index % 3],
+            'risk_flag': index % 4 == 0,
+            'session_state': {'severity': ['mild', 'moderate'][index % 2], 'goals': ['sleep']},
+            'score': index if index % 2 else float(index),
+            'input': f"Patient: I feel low {index}.\nDoctor: What has helped before?\n"
+                     f"Patient: Walking.\nDoctor: Let's plan a walk for tomorrow, {prefix}{index}."
+        }
+        if index % 5 == 0:
+            del session['session_state']
+        if index % 3 == 0:
+            session['note'] = 'follow up'
+        sessions.append(session)
+    return sessions
+
+
+def _write(path, sessions):
+    with open(path, 'w', encoding='utf-8') as f:
+        for session in sessions:
+            f.write(json.dumps(session) + '\n')
+
+
+def test_round_trip_matches_jsonl_loaders(tmp_path):
+    dataset_path = str(tmp_path / 'dataset.jsonl')
+    _write(dataset_path, _sessions())
+    cache = load_dataset_cache(dataset_path, str(tmp_path / 'cache'))
+
+    for condition in [None, 'anxiety', 'unknown']:
+        for limit in [None, 2]:
+            assert cache.scenarios(condition, limit) == get_all_scenarios(dataset_path, condition, limit)
+
+    expected_summary = pd.DataFrame([session_summary_row(session) for session in load_dataset(dataset_path)])
+    pd.testing.assert_frame_equal(cache.summary().astype(object), expected_summary.astype(object))
+
+
+def test_each_dataset_gets_its_own_cache(tmp_path):
+    cache_root = str(tmp_path / 'cache')
+    first_path, second_path = str(tmp_path / 'first.jsonl'), str(tmp_path / 'second.jsonl')
+    _write(first_path, _sessions('A'))
+    _write(second_path, _sessions('B'))
+    # Same size and modification time: only the path tells the files apart
+    stat = os.stat(first_path)
+    os.utime(second_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert os.stat(second_path).st_size == stat.st_size
+
+    first = load_dataset_cache(first_path, cache_root)
+    second = load_dataset_cache(second_path, cache_root)
+    assert first.scenarios(limit=1)[0]['patient_id'] == 'A0'
+    assert second.scenarios(limit=1)[0]['patient_id'] == 'B0'
+    assert first.cache_dir != second.cache_dir == dataset_cache_dir(second_path, cache_root)
+
+    # Alternating between the datasets reuses both caches instead of rebuilding
+    manifest_mtime = os.stat(os.path.join(first.cache_dir, 'manifest.json')).st_mtime_ns
+    assert load_dataset_cache(first_path, cache_root) is first
+    assert load_dataset_cache(second_path, cache_root) is second
+    assert os.stat(os.path.join(first.cache_dir, 'manifest.json')).st_mtime_ns == manifest_mtime
+
+
+def test_cache_is_rebuilt_when_the_dataset_changes(tmp_path):
+    dataset_path = str(tmp_path / 'dataset.jsonl')
+    cache_root = str(tmp_path / 'cache')
+    _write(dataset_path, _sessions())
+    assert len(load_dataset_cache(dataset_path, cache_root)) == 12
+
+    _write(dataset_path, _sessions()[:5])
+    os.utime(dataset_path, ns=(0, 0))
+    assert load_dataset_cache(dataset_path, cache_root).scenarios() == get_all_scenarios(dataset_path)
@@ -0,0 +1,70 @@
+"""
+Tests for the content-addressed emotion vector cache
+"""
+
+import numpy as np
+
+from benchmark import evaluation
+from benchmark.config import RELEVANT_EMOTIONS
+from benchmark.emotion_cache import EmotionVectorCache
+
+_TEXTS = ["That sounds exhausting.", "What has helped before?", "You're not alone."]
+
+
+def _vectors(count):
+    return np.arange(count * len(RELEVANT_EMOTIONS), dtype=np.float64).reshape(count, -1) / 100
+
+
+def test_vectors_persist_across_instances(tmp_path):
+    cache_dir = str(tmp_path)
+    cache = EmotionVectorCache(model_id='model-a', cache_dir=cache_dir)
+    assert cache.get_many(_TEXTS) == [None, None, None]
+    cache.put_many(_TEXTS, _vectors(3))
+    cache.put_many(_TEXTS[:1], _vectors(1))  # Already stored: not appended again
+
+    reopened = EmotionVectorCache(model_id='model-a', cache_dir=cache_dir)
+    assert len(reopened) == 3
+    np.testing.assert_allclose(np.array(reopened.get_many(_TEXTS)), _vectors(3).astype(np.float32))
+
+    # Vectors are never shared across models
+    assert EmotionVectorCache(model_id='model-b', cache_dir=cache_dir).get(_TEXTS[0]) is None
+
+
+def test_partial_rows_are_ignored_and_overwritten(tmp_path):
+    cache = EmotionVectorCache(model_id='model-a', cache_dir=str(tmp_path))
+    cache.put_many(_TEXTS[:2], _vectors(2))
+    with open(cache.vectors_path, 'ab') as f:
+        f.write(b'\0' * 7)  # Interrupted append
+
+    reopened = EmotionVectorCache(model_id='model-a', cache_dir=str(tmp_path))
+    assert reopened.get(_TEXTS[2]) is None
+    reopened.put_many(_TEXTS[2:], _vectors(3)[2:])
+    np.testing.assert_allclose(
+        np.array(EmotionVectorCache(model_id='model-a', cache_dir=str(tmp_path)).get_many(_TEXTS)),
+        _vectors(3).astype(np.float32)
+    )
+
+
+def test_memory_layer_is_bounded(tmp_path):
+    cache = EmotionVectorCache(model_id='model-a', cache_dir=str(tmp_path), memory_items=2, persist=False)
+    cache.put_many(_TEXTS, _vectors(3))
+    assert cache.get(_TEXTS[0]) is None
+    assert cache.get(_TEXTS[2]) is not None
+
+
+def test_weights_are_applied_on_read(tmp_path, monkeypatch):
+    inferred = []
+
+    def infer(texts, batch_size):
+        inferred.extend(texts)
+        return _vectors(len(texts))
+    monkeypatch.setattr(evaluation, '_infer_emotion_distributions', infer)
+    cache = EmotionVectorCache(model_id='model-a', cache_dir=str(tmp_path))
+
+    unweighted = evaluation.get_emotion_vectors(_TEXTS + _TEXTS[:1], {}, cache=cache)
+    weights = {emotion: index % 3 for index, emotion in enumerate(RELEVANT_EMOTIONS)}
+    weighted = evaluation.get_emotion_vectors(_TEXTS, weights, cache=cache)
+
+    assert inferred == _TEXTS
+    np.testing.assert_allclose(unweighted[3], unweighted[0])
+    np.testing.assert_allclose(weighted, unweighted[:3] * np.array([weights[e] for e in RELEVANT_EMOTIONS]))
@@ -0,0 +1,258 @@
+"""
+Tests that the optimized metrics return the same scores as the reference implementations
+"""
+
+import hashlib
+import random
+import re
+
+import nltk
+import numpy as np
+import pytest
+from sklearn.metrics.pairwise import cosine_similarity
+
+from benchmark import evaluation, meteor as meteor_module
+from benchmark.config import (
+    EMOTION_WEIGHTS, METEOR_ALPHA, METEOR_BETA, METEOR_GAMMA, READABILITY_CONSTANTS, RELEVANT_EMOTIONS,
+    ROUGE_METRICS, ROUGE_USE_STEMMER
+)
+from benchmark.emotion_cache import EmotionVectorCache
+from benchmark.evaluation import (
+    calculate_average_rouge, calculate_average_rouge_batch, calculate_meteor, calculate_meteor_batch,
+    evaluate_complexity_score,
+    evaluate_ethical_alignment, evaluate_ethical_alignment_batch, evaluate_inclusivity_score,
+    evaluate_inclusivity_score_batch, evaluate_sentiment_distribution, evaluate_sentiment_distribution_batch
+)
+from benchmark.meteor import SynonymTable, meteor
+from benchmark.lexicon_matcher import LEXICON_CATEGORIES
+from benchmark.metric_cache import clear_metric_cache
+from benchmark.text_analysis import analyze_text
+
+_WORDS = (
+    "I you feel feeling felt anxious anxiety sleep sleeping work worried worry hear that sounds really hard "
+    "what how can we together support safe space talk talked talking about it's don't 24/7 café naïve "
+    "— , . ! ? ; LGBTQ+ partner family friends 3 hours today tomorrow the a and to of"
+).split()
+
+
+# Counseling-style (reference, response) pairs with lexicon hits, questions and odd spacing
+_PAIRS = [
+    ("I hear how exhausting this has been. What has your sleep been like?",
+     "That sounds really exhausting. How have you been sleeping lately? I'm here to support you."),
+    ("It's okay to feel overwhelmed. Who do you usually talk to?",
+     "Your feelings are valid, and this is a safe space. Are you having thoughts of harming yourself?"),
+    ("You deserve support as your authentic self.",
+     "As an LGBTQ+ affirming counselor, I respect your identity and your partner. What pronouns do you use?"),
+    ("Let's focus on one small step.", "Just get over it, you're being dramatic."),
+    ("", "   "),
+    ("Thank you for sharing.", "Thank  you\tfor sharing —  it takes courage!  Can we explore coping strategies together?"),
+]
+
+
+def _all_metrics(reference, response, reference_analysis=None, response_analysis=None):
+    return [
+        calculate_average_rouge(reference, response, reference_analysis, response_analysis),
+        calculate_meteor(reference, response, reference_analysis, response_analysis),
+        evaluate_ethical_alignment(response, response_analysis),
+        evaluate_inclusivity_score(response, response_analysis),
+        evaluate_complexity_score(response, READABILITY_CONSTANTS, response_analysis),
+    ]
+
+
+def test_shared_analysis_gives_the_same_scores():
+    for reference, response in _PAIRS:
+        clear_metric_cache()
+        fresh = _all_metrics(reference, response)
+        clear_metric_cache()
+        shared = _all_metrics(reference, response, analyze_text(reference), analyze_text(response))
+        assert shared == fresh
+
+
+def test_each_text_is_tokenized_once(monkeypatch):
+    calls = []
+    word_tokenize = nltk.word_tokenize
+
+    def counting_word_tokenize(text, *args, **kwargs):
+        calls.append(text)
+        return word_tokenize(text, *args, **kwargs)
+    monkeypatch.setattr(nltk, 'word_tokenize', counting_word_tokenize)
+
+    reference, response = _PAIRS[1]
+    reference_analysis, response_analysis = analyze_text(reference), analyze_text(response)
+    assert analyze_text(response_analysis) is response_analysis
+
+    clear_metric_cache()
+    _all_metrics(reference, response, reference_analysis, response_analysis)
+    # Lowercased tokens of both texts, plus the response's sentences for complexity
+    assert len(calls) == 2 + len(response_analysis.sentences)
+
+    clear_metric_cache()
+    _all_metrics(reference, response, reference_analysis, response_analysis)
+    assert len(calls) == 2 + len(response_analysis.sentences)
+
+
+def _corpus_pairs(count, seed=0, words=_WORDS):
+    """Random (reference, response) pairs over a counseling vocabulary, including empty texts"""
+    rng = random.Random(seed)
+    return [
+        (' '.join(rng.choices(words, k=rng.randint(0, 30))), ' '.join(rng.choices(words, k=rng.randint(0, 30))))
+        for _ in range(count)
+    ]
+
+
+def test_rouge_matches_rouge_score():
+    rouge_scorer = pytest.importorskip('rouge_score.rouge_scorer')
+    scorer = rouge_scorer.RougeScorer(ROUGE_METRICS, use_stemmer=ROUGE_USE_STEMMER)
+
+    def baseline(reference, response):
+        scores = scorer.score(reference, response)
+        return round(sum(
+            (scores['rouge1'].precision * 0.5 + scores['rouge1'].recall * 0.5) * 0.4 +
+            (scores['rouge2'].precision * 0.6 + scores['rouge2'].recall * 0.4) * 0.3 +
+            (scores['rougeL'].precision * 0.4 + scores['rougeL'].recall * 0.6) * 0.3
+            for metric in ROUGE_METRICS
+        ) / len(ROUGE_METRICS), 2)
+
+    pairs = _corpus_pairs(3000)
+    expected = [baseline(reference, response) for reference, response in pairs]
+
+    assert [calculate_average_rouge(reference, response) for reference, response in pairs] == expected
+    assert calculate_average_rouge_batch([r for r, _ in pairs], [c for _, c in pairs]) == expected
+
+
+class _StubEmotionModel:
+    """Deterministic stand-in for the emotion pipeline: whitespace tokens, hashed label scores"""
+
+    # A label outside RELEVANT_EMOTIONS, as the real model also returns
+    LABELS = RELEVANT_EMOTIONS[:12] + ['disgust']
+
+    def __init__(self):
+        self.batches = []
+
+    def tokenizer(self, text, add_special_tokens=False, return_offsets_mapping=True):
+        return {'offset_mapping': [match.span() for match in re.finditer(r'\S+', text)]}
+
+    def scores(self, text):
+        digest = hashlib.blake2b(text.encode('utf-8'), digest_size=len(self.LABELS)).digest()
+        return [{'label': label.upper(), 'score': byte / 255} for label, byte in zip(self.LABELS, digest)]
+
+    def __call__(self, texts, batch_size=1, **kwargs):
+        if isinstance(texts, str):
+            return [self.scores(texts)]
+        self.batches.append((len(texts), batch_size))
+        return [self.scores(text) for text in texts]
+
+
+@pytest.fixture
+def stub_emotion_model(monkeypatch, tmp_path):
+    model = _StubEmotionModel()
+    cache = EmotionVectorCache(model_id='stub', cache_dir=str(tmp_path), persist=False)
+    monkeypatch.setattr(evaluation, 'EMOTION_MODEL_NAME', 'stub')
+    monkeypatch.setattr(evaluation, 'get_emotion_model', lambda: model)
+    monkeypatch.setattr(evaluation, 'get_emotion_cache', lambda: cache)
+    clear_metric_cache()
+    yield model
+    clear_metric_cache()
+
+
+def _per_text_sentiment(model, reference_text, generated_text):
+    """The original one-text-per-forward-pass sentiment score"""
+    def weighted_vector(text):
+        emotion_dict = {e['label'].lower(): e['score'] for e in model(text)[0]}
+        return np.array([
+            emotion_dict.get(emotion, 0.0) * EMOTION_WEIGHTS.get(emotion, 1.0) for emotion in RELEVANT_EMOTIONS
+        ]).reshape(1, -1)
+    return round(cosine_similarity(weighted_vector(reference_text), weighted_vector(generated_text))[0][0], 2)
+
+
+def test_batched_sentiment_matches_per_text_inference(stub_emotion_model):
+    pairs = _PAIRS + [(_PAIRS[0][0], _PAIRS[2][1])]
+    references, candidates = [r for r, _ in pairs], [c for _, c in pairs]
+    expected = [_per_text_sentiment(stub_emotion_model, r, c) for r, c in pairs]
+
+    assert evaluate_sentiment_distribution_batch(references, candidates, EMOTION_WEIGHTS, batch_size=4) == expected
+    # Distinct texts go through the model once, in one batched call
+    assert stub_emotion_model.batches == [(len(set(references + candidates)), 4)]
+    assert [evaluate_sentiment_distribution(r, c, EMOTION_WEIGHTS) for r, c in pairs] == expected
+    assert len(stub_emotion_model.batches) == 1
+
+
+def test_long_texts_are_chunked_and_averaged(stub_emotion_model, monkeypatch):
+    monkeypatch.setattr(evaluation, 'EMOTION_MAX_TOKENS', 6)
+    text = "one two three four five six seven eight nine ten"
+    chunks = [("one two three four", 4), ("five six seven eight", 4), ("nine ten", 2)]
+
+    expected = np.zeros(len(RELEVANT_EMOTIONS))
+    for chunk, token_count in chunks:
+        emotion_dict = {e['label'].lower(): e['score'] for e in stub_emotion_model.scores(chunk)}
+        expected += np.array([emotion_dict.get(emotion, 0.0) for emotion in RELEVANT_EMOTIONS]) * token_count / 10
+
+    vectors = evaluation.get_emotion_vectors([text, "short"], {})
+    np.testing.assert_allclose(vectors[0], expected)
+    assert stub_emotion_model.batches == [(4, evaluation.EMOTION_BATCH_SIZE)]
+
+
+# Words with WordNet synonyms and shared stems, so every METEOR matching stage is exercised
+_SYNONYM_WORDS = _WORDS + (
+    "sad unhappy glad happy scared afraid frightened speak discuss help assist aid begin start commence "
+    "big large small little concern concerned worrying supported supporting calm quiet tired exhausted"
+).split()
+
+
+def test_meteor_matches_nltk(monkeypatch, tmp_path):
+    nltk_meteor = pytest.importorskip('nltk.translate.meteor_score').meteor_score
+    table = SynonymTable(str(tmp_path / 'synonyms.json'))
+    monkeypatch.setattr(meteor_module, '_synonym_table', table)
+    monkeypatch.setattr(evaluation, 'get_synonym_table', lambda: table)
+    clear_metric_cache()
+
+    pairs = _PAIRS + _corpus_pairs(300, seed=1, words=_SYNONYM_WORDS)
+    analyses = [(analyze_text(reference), analyze_text(response)) for reference, response in pairs]
+    expected = [
+        nltk_meteor([reference.tokens], response.tokens, alpha=METEOR_ALPHA, beta=METEOR_BETA, gamma=METEOR_GAMMA)
+        for reference, response in analyses
+    ]
+
+    assert [meteor(reference.tokens, response.tokens) for reference, response in analyses] == expected
+    rounded = [round(score, 2) for score in expected]
+    assert calculate_meteor_batch([r for r, _ in pairs], [c for _, c in pairs]) == rounded
+    clear_metric_cache()
+    assert [calculate_meteor(reference, response) for reference, response in pairs] == rounded
+
+    # The persisted synonym table alone reproduces the scores, without WordNet
+    def no_wordnet(word):
+        raise AssertionError(f"WordNet queried for {word!r}")
+    monkeypatch.setattr(meteor_module, '_wordnet_synonyms', no_wordnet)
+    saved = SynonymTable(table.path)
+    assert [meteor(reference.tokens, response.tokens, synonyms=saved) for reference, response in analyses] == expected
+
+
+def _lexicon_responses(count, seed=0):
+    """Responses dense in lexicon terms and questions, from blank to long enough for every threshold"""
+    rng = random.Random(seed)
+    terms = sorted({term for terms in LEXICON_CATEGORIES.values() for term in terms})
+    fillers = _WORDS + ['?', '?', '\u3000', '\u00a0', '\x00', '\n']
+    texts = ['', '   ', '?', '\u2028', 'Coming out?\u3000Are you safe?']
+    for _ in range(count):
+        words = rng.choices(terms, k=rng.randint(0, 40)) + rng.choices(fillers, k=rng.randint(0, 200))
+        rng.shuffle(words)
+        texts.append(' '.join(words) if rng.random() < 0.8 else ''.join(words))
+    return texts
+
+
+def test_batch_lexical_metrics_match_per_text_scores():
+    texts = _lexicon_responses(400)
+    clear_metric_cache()
+    ethical = [evaluate_ethical_alignment(text) for text in texts]
+    inclusivity = [evaluate_inclusivity_score(text) for text in texts]
+    assert len(set(ethical)) > 10 and len(set(inclusivity)) > 10
+
+    assert evaluate_ethical_alignment_batch(texts) == ethical
+    assert evaluate_inclusivity_score_batch(texts) == inclusivity
+    analyses = [analyze_text(text) if index % 2 else None for index, text in enumerate(texts)]
+    assert evaluate_ethical_alignment_batch(texts, analyses) == ethical
+    assert evaluate_inclusivity_score_batch(texts, analyses) == inclusivity
+
+    question_counts, word_counts = evaluation._batch_text_counts(texts, chunk_size=7)
+    assert question_counts.tolist() == [text.count('?') for text in texts]
+    assert word_counts.tolist() == [len(text.split()) for text in texts]
@@ -0,0 +1,58 @@
+"""
+Tests driving the Azure OpenAI clients and scheduler against the local fake server
+"""
+
+import time
+
+from benchmark.azure_client import AsyncAzureOpenAIClient
+from benchmark.fake_azure_server import FakeAzureServer
+from benchmark.rate_limiter import RequestScheduler
+
+_CONVERSATIONS = [
+    [f"Session {session}, turn {turn}: I keep worrying about work." for turn in range(1, 4)]
+    for session in range(8)
+]
+
+
+def test_async_client_completes_every_turn_through_faults():
+    scheduler = RequestScheduler(requests_per_minute=10 ** 6, tokens_per_minute=10 ** 9,
+                                 max_retries=20, backoff_base=0.01, backoff_max=0.02, timeout=5)
+    with FakeAzureServer(latency_ms=20, tokens_per_second=0, rate_429=0.2, rate_500=0.1,
+                         retry_after=0.01, mode='echo', seed=7) as server:
+        client = AsyncAzureOpenAIClient(model_name='GPT-4o', api_key='test', endpoint=server.url,
+                                        api_version='2024-06-01', deployment='gpt-4o',
+                                        max_concurrency=4, scheduler=scheduler)
+        results = client.run_conversations(_CONVERSATIONS)
+        stats = dict(server.stats)
+
+    assert results == [
+        [{'turn': turn, 'patient': patient, 'ai_response': f"You said: Patient: {patient}"}
+         for turn, patient in enumerate(turns, 1)]
+        for turns in _CONVERSATIONS
+    ]
+
+    # Every injected fault was retried, and the retries account for every extra request
+    turn_count = sum(len(turns) for turns in _CONVERSATIONS)
+    assert stats['throttled'] > 0 and stats['errors'] > 0
+    assert stats['requests'] == turn_count + stats['throttled'] + stats['errors'] == scheduler.stats['requests']
+    assert scheduler.stats['throttled'] == stats['throttled']
+    assert scheduler.stats['retries'] == stats['throttled'] + stats['errors']
+    assert scheduler.stats['failures'] == 0
+
+    # Sessions overlap, but never beyond the client's concurrency limit
+    assert 1 < stats['peak_in_flight'] <= 4
+
+
+def test_rate_limit_spaces_out_requests():
+    scheduler = RequestScheduler(requests_per_minute=600, tokens_per_minute=10 ** 9)
+    scheduler.requests._tokens = 0  # Start with an empty burst allowance: 10 requests per second
+    with FakeAzureServer(latency_ms=0, tokens_per_second=0, mode='echo') as server:
+        client = AsyncAzureOpenAIClient(model_name='GPT-4o', api_key='test', endpoint=server.url,
+                                        api_version='2024-06-01', deployment='gpt-4o',
+                                        max_concurrency=8, scheduler=scheduler)
+        start = time.perf_counter()
+        client.run_conversations([[f"Message {index}"] for index in range(6)])
+        elapsed = time.perf_counter() - start
+    # Six requests at 10 per second, and the server itself answers instantly
+    assert 0.5 <= elapsed
+    assert server.stats['requests'] == scheduler.stats['requests'] == 6
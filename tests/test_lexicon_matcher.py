@@ -0,0 +1,71 @@
+"""
+Tests for the lexicon phrase matchers
+"""
+
+import random
+from collections import Counter
+
+from benchmark.lexicon_matcher import (
+    LEXICON_CATEGORIES, LexiconBatchMatcher, LexiconMatcher, get_lexicon_batch_matcher, get_lexicon_matcher,
+    tokenize_for_matching
+)
+
+_FILLER = "I you feel really today , . ? ! becoming outgoing self harm don’t — the and of out".split()
+
+
+def _texts(count, seed=0):
+    """Random texts mixing lexicon terms (in varied case) with filler words"""
+    rng = random.Random(seed)
+    terms = sorted({term for terms in LEXICON_CATEGORIES.values() for term in terms})
+    texts = []
+    for _ in range(count):
+        words = rng.choices(terms, k=rng.randint(0, 8)) + rng.choices(_FILLER, k=rng.randint(0, 20))
+        rng.shuffle(words)
+        texts.append(' '.join(word.upper() if rng.random() < 0.1 else word for word in words))
+    return texts
+
+
+def _naive_match(text):
+    """Count every term of every category with a direct scan over the text's tokens"""
+    tokens = tokenize_for_matching(text)
+    hits = {}
+    for category, terms in LEXICON_CATEGORIES.items():
+        hits[category] = Counter()
+        for term in terms:
+            term_tokens = tokenize_for_matching(term)
+            occurrences = sum(
+                tokens[start:start + len(term_tokens)] == term_tokens
+                for start in range(len(tokens) - len(term_tokens) + 1)
+            ) if term_tokens else 0
+            if occurrences:
+                hits[category][term] = occurrences
+    return hits
+
+
+def test_matcher_matches_naive_scan():
+    matcher = get_lexicon_matcher()
+    for text in _texts(300):
+        assert matcher.match(text) == _naive_match(text), text
+
+
+def test_matching_respects_word_boundaries():
+    matcher = LexiconMatcher({'terms': ['coming out', 'LGBTQ+', "don't", 'self-harm', 'harm']})
+    hits = matcher.match("Becoming outgoing helped. Coming out was hard; I DON’T hide being LGBTQ+. No self-harm.")
+    assert hits['terms'] == Counter({'coming out': 1, 'LGBTQ+': 1, "don't": 1, 'self-harm': 1})
+
+
+def test_batch_counts_match_per_text_matching():
+    texts = _texts(300, seed=1) + ['', 'coming\x00out', 'coming out\x00']
+    matcher, batch_matcher = get_lexicon_matcher(), LexiconBatchMatcher(LEXICON_CATEGORIES, chunk_size=64)
+    counts = batch_matcher.count_matrix(texts)
+    assert counts.shape[0] == len(texts)
+
+    hits = [matcher.match(text) for text in texts]
+    for category in LEXICON_CATEGORIES:
+        assert batch_matcher.distinct_terms(counts, category).tolist() == [len(h[category]) for h in hits]
+
+    weight = lambda term: len(term) % 3 + 0.5
+    assert batch_matcher.weighted_occurrences(counts, ['penalty', 'severe_penalty'], weight).tolist() == [
+        sum(weight(term) * n for term, n in (h['penalty'] | h['severe_penalty']).items()) for h in hits
+    ]
+    assert get_lexicon_batch_matcher().count_matrix(texts).toarray().tolist() == counts.toarray().tolist()
@@ -0,0 +1,76 @@
+"""
+Tests for the bounded metric memoization cache
+"""
+
+import threading
+
+from benchmark import metric_cache
+from benchmark.metric_cache import MetricCache, memoize_metric
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache = MetricCache(max_entries=2, max_bytes=10 ** 6)
+    cache.put(('rouge', 'a'), 1.0)
+    cache.put(('rouge', 'b'), 2.0)
+    assert cache.get(('rouge', 'a')) == (True, 1.0)
+    cache.put(('meteor', 'c'), 3.0)
+
+    assert cache.get(('rouge', 'b')) == (False, None)
+    assert cache.get(('rouge', 'a')) == (True, 1.0)
+    assert len(cache) == 2
+    stats = {row['metric']: row for row in cache.stats()}
+    assert stats['rouge'] == {
+        'metric': 'rouge', 'hits': 2, 'misses': 1, 'evictions': 1, 'entries': 1, 'hit_rate': 0.667
+    }
+
+
+def test_memory_cap_counts_key_texts():
+    cache = MetricCache(max_entries=100, max_bytes=3000)
+    for index in range(10):
+        cache.put(('rouge', 'x' * 1000 + str(index)), 0.5)
+        assert cache.size_bytes <= 3000
+    assert len(cache) == 2
+    assert cache.get(('rouge', 'x' * 1000 + '9'))[0]
+
+    cache.clear('rouge')
+    assert len(cache) == 0 and cache.size_bytes == 0
+
+
+def test_memoized_metric_skips_ignored_arguments(monkeypatch):
+    monkeypatch.setattr(metric_cache, '_metric_cache', MetricCache())
+    calls = []
+
+    @memoize_metric('score', ignore=('analysis',))
+    def score(text, weights, analysis=None):
+        calls.append(text)
+        return len(text) * weights['w']
+
+    assert score('abc', {'w': 2}) == 6
+    assert score('abc', {'w': 2}, analysis=object()) == 6
+    assert score('abc', {'w': 3}) == 9
+    assert calls == ['abc', 'abc']
+
+    metric_cache.clear_metric_cache('score')
+    assert score('abc', {'w': 2}) == 6
+    assert len(calls) == 3
+
+
+def test_concurrent_use_keeps_the_cache_consistent():
+    cache = MetricCache(max_entries=50, max_bytes=10 ** 7)
+
+    def worker(offset):
+        for index in range(2000):
+            key = ('rouge', str((index + offset) % 120))
+            hit, value = cache.get(key)
+            assert not hit or value == key[1]
+            cache.put(key, key[1])
+    threads = [threading.Thread(target=worker, args=(offset,)) for offset in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = cache.stats()[0]
+    assert len(cache) == stats['entries'] == 50
+    assert stats['hits'] + stats['misses'] == 8 * 2000
+    assert cache.size_bytes == sum(size for _, size in cache._entries.values())
@@ -0,0 +1,102 @@
+"""
+Tests for MultiTurnEvaluator parallel evaluation
+"""
+
+import time
+
+import pytest
+
+from benchmark import multi_turn_evaluator
+from benchmark.azure_client import AzureOpenAIClient
+from benchmark.multi_turn_evaluator import MultiTurnEvaluator, _init_evaluation_worker
+
+
+def _sessions():
+    """Two small sessions with AI responses"""
+    sessions, ai_responses = [], []
+    for index, condition in enumerate(['depression', 'anxiety']):
+        turns = [
+            {'turn': 1, 'patient': "I can't sleep and feel like a failure.",
+             'doctor': "That sounds really hard. What has your sleep been like this week?"},
+            {'turn': 2, 'patient': "I worry about everything at work.",
+             'doctor': "It makes sense to feel overwhelmed. How do you usually cope with that worry?"}
+        ]
+        sessions.append({'patient_id': f'P{index}', 'session_id': f'S{index}', 'condition': condition,
+                         'risk_flag': 'low', 'turns': turns})
+        ai_responses.append([
+            {'turn': 1, 'patient': turns[0]['patient'],
+             'ai_response': "I hear you. You are not a failure; what helps you feel safe at night?"},
+            {'turn': 2, 'patient': turns[1]['patient'],
+             'ai_response': "Work stress is common. Could we explore your support system together?"}
+        ])
+    return sessions, ai_responses
+
+
+def test_disabled_parent_gives_workers_without_store_or_index():
+    _init_evaluation_worker(None, None)
+    worker = multi_turn_evaluator._worker_evaluator
+    assert worker.score_store is None
+    assert worker.reference_index is None
+
+
+def test_serial_and_parallel_results_are_identical():
+    pytest.importorskip('transformers')
+    evaluator = MultiTurnEvaluator(use_reference_index=False, use_score_store=False)
+    assert evaluator.score_store is None and evaluator.reference_index is None
+    sessions, ai_responses = _sessions()
+
+    serial = evaluator.evaluate_dataset(sessions, ai_responses, workers=1)
+    parallel = evaluator.evaluate_dataset(sessions, ai_responses, workers=2, chunk_size=1)
+
+    assert repr(parallel) == repr(serial)
+
+
+def test_disabled_store_is_never_opened(monkeypatch):
+    def fail():
+        raise AssertionError("default score store opened")
+    monkeypatch.setattr('benchmark.evaluation.get_score_store', fail)
+    monkeypatch.setattr(multi_turn_evaluator, 'get_score_store', fail)
+
+    evaluator = MultiTurnEvaluator(use_reference_index=False, use_score_store=False)
+    scores = evaluator.evaluate_turn("How are you feeling today?", "I hear you. What feels hardest right now?",
+                                     sentiment_score=0.5)
+    assert scores['sentiment_distribution'] == 0.5
+
+
+class _SlowClient(AzureOpenAIClient):
+    """Client whose responses take a fixed time, without any API calls"""
+
+    def __init__(self, delay):
+        self.model_name = 'fake'
+        self.delay = delay
+
+    def reset_conversation(self):
+        pass
+
+    def generate_counselor_response(self, patient_message, system_prompt=None):
+        time.sleep(self.delay)
+        return f"I hear that {patient_message.lower()}"
+
+
+def test_pipelined_generation_matches_sequential_and_overlaps(monkeypatch):
+    delay = 0.05
+    evaluator = MultiTurnEvaluator(use_reference_index=False, use_score_store=False)
+
+    def slow_evaluate_turn(reference_response, ai_response, sentiment_score=None, reference_key=None):
+        time.sleep(delay)
+        return {'rouge_score': len(ai_response) / 100, 'reference_key': reference_key}
+    monkeypatch.setattr(evaluator, 'evaluate_turn', slow_evaluate_turn)
+
+    reference_turns = [{'turn': turn, 'patient': f"Patient message {turn}", 'doctor': f"Doctor reply {turn}"}
+                       for turn in range(1, 7)]
+    client = _SlowClient(delay)
+    pipelined = evaluator.generate_and_evaluate_conversation(client, reference_turns, session_key=('P1', 1))
+
+    ai_turns = client.generate_multi_turn_conversation([turn['patient'] for turn in reference_turns])
+    sequential = evaluator.evaluate_conversation(reference_turns, ai_turns, session_key=('P1', 1))
+    sequential['metadata']['model'] = client.model_name
+
+    timing = pipelined['metadata'].pop('timing')
+    assert pipelined.pop('ai_turns') == ai_turns
+    assert pipelined == sequential
+    assert timing['wall_seconds'] < timing['generation_seconds'] + timing['evaluation_seconds'] - 2 * delay
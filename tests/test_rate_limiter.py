@@ -0,0 +1,104 @@
+"""
+Tests for the rate-limit-aware request scheduler
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from benchmark.rate_limiter import RequestScheduler, retry_after_seconds
+
+
+class ThrottledError(Exception):
+    """API error carrying a status code and response headers"""
+
+    def __init__(self, headers=None, status_code=429):
+        super().__init__('throttled')
+        self.status_code = status_code
+        self.response = SimpleNamespace(headers=headers or {})
+
+
+@pytest.mark.parametrize('header', ['not a date', 'Mon, 99 Foo 2024 99:99:99 GMT', ''])
+def test_invalid_retry_after_is_ignored(header):
+    assert retry_after_seconds(ThrottledError({'retry-after': header})) is None
+
+
+def test_retry_after_seconds_and_milliseconds():
+    assert retry_after_seconds(ThrottledError({'retry-after': '3'})) == 3.0
+    assert retry_after_seconds(ThrottledError({'retry-after-ms': '250'})) == 0.25
+
+
+def test_invalid_retry_after_falls_back_to_jittered_backoff():
+    scheduler = RequestScheduler(backoff_base=0.01, backoff_max=0.02)
+    delay = scheduler.backoff_delay(0, ThrottledError({'retry-after': 'garbage'}))
+    assert 0.0 <= delay <= 0.01
+
+
+class ConnectError(Exception):
+    """Transport error raised while connecting (named like httpx's)"""
+
+
+class APIConnectionError(Exception):
+    """SDK connection error (named like openai's)"""
+
+
+def _failing_then_ok(failures, error):
+    attempts = []
+
+    def request(timeout=None):
+        attempts.append(timeout)
+        if len(attempts) <= failures:
+            raise error()
+        return 'ok'
+    return request, attempts
+
+
+def _scheduler():
+    return RequestScheduler(requests_per_minute=60, tokens_per_minute=6000,
+                            max_retries=3, backoff_base=0.001, backoff_max=0.001)
+
+
+def _connection_failure():
+    """SDK connection error raised from a connect failure, like openai wraps httpx errors"""
+    error = APIConnectionError('connection error')
+    error.__cause__ = ConnectError('connection refused')
+    return error
+
+
+def test_unsent_attempts_are_refunded():
+    scheduler = _scheduler()
+    request, attempts = _failing_then_ok(2, _connection_failure)
+
+    assert scheduler.call(request, tokens=1000) == 'ok'
+    assert len(attempts) == 3
+    assert scheduler.requests._tokens == pytest.approx(59, abs=0.1)
+    assert scheduler.tokens._tokens == pytest.approx(5000, abs=10)
+
+
+@pytest.mark.parametrize('error', [
+    lambda: ThrottledError(status_code=500),
+    lambda: ThrottledError({'retry-after': 'garbage'}),
+    TimeoutError
+])
+def test_sent_attempts_stay_debited(error):
+    scheduler = _scheduler()
+    request, attempts = _failing_then_ok(2, error)
+
+    assert scheduler.call(request, tokens=1000) == 'ok'
+    assert len(attempts) == 3
+    assert scheduler.requests._tokens == pytest.approx(57, abs=0.1)
+    assert scheduler.tokens._tokens == pytest.approx(3000, abs=10)
+
+
+def test_async_sent_and_unsent_attempts():
+    for error, requests_left in [(_connection_failure, 59), (lambda: ThrottledError(status_code=503), 57)]:
+        scheduler = _scheduler()
+        request, attempts = _failing_then_ok(2, error)
+
+        async def arequest(timeout=None):
+            return request(timeout=timeout)
+
+        assert asyncio.run(scheduler.acall(arequest, tokens=1000)) == 'ok'
+        assert len(attempts) == 3
+        assert scheduler.requests._tokens == pytest.approx(requests_left, abs=0.1)
@@ -0,0 +1,54 @@
+"""
+Tests for the precomputed reference artifact index
+"""
+
+import json
+
+from benchmark import reference_index
+from benchmark.reference_index import build_reference_index, load_reference_index
+from benchmark.text_analysis import analyze_text
+
+_DOCTOR_TURNS = [
+    "That sounds exhausting. What has your sleep been like this week?",
+    "It makes sense to feel overwhelmed! Who do you usually talk to when work gets hard?",
+    "You're not alone in this. Let's think about one small step for tomorrow.",
+]
+
+
+def _build(tmp_path, monkeypatch, cache_size=4096):
+    monkeypatch.setattr(reference_index, 'EMOTION_MODEL_NAME', None)
+    monkeypatch.setattr(reference_index, 'REFERENCE_INDEX_CACHE_SIZE', cache_size)
+    dataset_path = str(tmp_path / 'dataset.jsonl')
+    with open(dataset_path, 'w', encoding='utf-8') as f:
+        for session_id, doctor in enumerate(_DOCTOR_TURNS):
+            conversation = f"Patient: I can't sleep.\nDoctor: {doctor}\nPatient: Okay.\nDoctor: Take care, {session_id}."
+            f.write(json.dumps({'patient_id': f'P{session_id}', 'session_id': session_id, 'input': conversation}) + '\n')
+    index_dir = str(tmp_path / 'index')
+    assert build_reference_index(dataset_path, index_dir) == 2 * len(_DOCTOR_TURNS)
+    return load_reference_index(dataset_path, index_dir)
+
+
+def test_indexed_analyses_match_live_analysis(tmp_path, monkeypatch):
+    index = _build(tmp_path, monkeypatch)
+    assert index is not None
+
+    for session_id, doctor in enumerate(_DOCTOR_TURNS):
+        analysis, distribution = index.lookup((f'P{session_id}', session_id, 1), doctor)
+        live = analyze_text(doctor)
+        assert distribution is None
+        assert analysis.tokens == live.tokens
+        assert analysis.sentences == live.sentences
+        assert analysis.sentence_tokens == live.sentence_tokens
+        assert analysis.stems == live.stems
+        assert analysis.stem_ngrams == live.stem_ngrams
+
+    # A different text under the same key is not served from the index
+    assert index.lookup(('P0', 0, 1), "Something else") == (None, None)
+
+
+def test_loaded_rows_are_bounded(tmp_path, monkeypatch):
+    index = _build(tmp_path, monkeypatch, cache_size=2)
+    for session_id in range(len(_DOCTOR_TURNS)):
+        for turn in (1, 2):
+            assert index.analysis((f'P{session_id}', session_id, turn)) is not None
+    assert index._load_analysis.cache_info().currsize == 2
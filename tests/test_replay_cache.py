@@ -0,0 +1,69 @@
+"""
+Tests for the LLM response record/replay cache
+"""
+
+import pytest
+
+from benchmark.azure_client import AzureOpenAIClient
+from benchmark.fake_azure_server import FakeAzureServer
+from benchmark.rate_limiter import RequestScheduler
+from benchmark.replay_cache import ReplayCache, ReplayCacheMiss, request_key
+
+_PATIENT_TURNS = ["I can't sleep.", "Work keeps me up at night.", "I feel like a failure."]
+
+
+def _client(endpoint, replay):
+    return AzureOpenAIClient(model_name='GPT-4o', api_key='test', endpoint=endpoint, api_version='2024-06-01',
+                             deployment='gpt-4o', replay=replay,
+                             scheduler=RequestScheduler(max_retries=0, backoff_base=0.001, timeout=2))
+
+
+def test_request_key_covers_the_whole_request():
+    messages = [{'role': 'system', 'content': 'Be kind.'}, {'role': 'user', 'content': 'Hello'}]
+    key = request_key('gpt-4o', messages, {'temperature': 0.7, 'max_tokens': 500})
+    assert key == request_key('gpt-4o', [dict(reversed(m.items())) for m in messages],
+                              {'max_tokens': 500, 'temperature': 0.7})
+    assert key != request_key('o1', messages, {'temperature': 0.7, 'max_tokens': 500})
+    assert key != request_key('gpt-4o', messages[1:], {'temperature': 0.7, 'max_tokens': 500})
+    assert key != request_key('gpt-4o', messages, {'temperature': 0.0, 'max_tokens': 500})
+
+
+def test_replayed_conversation_matches_the_recording(tmp_path):
+    path = str(tmp_path / 'responses.jsonl')
+    with FakeAzureServer(latency_ms=0, tokens_per_second=0) as server:
+        endpoint = server.url
+        recorded = _client(endpoint, ReplayCache(path, 'record')).generate_multi_turn_conversation(_PATIENT_TURNS)
+        assert server.stats['requests'] == len(_PATIENT_TURNS)
+
+    # The server is gone: every response has to come from the recording
+    replay = ReplayCache(path, 'replay')
+    assert _client(endpoint, replay).generate_multi_turn_conversation(_PATIENT_TURNS) == recorded
+    assert replay.stats == {'hits': len(_PATIENT_TURNS), 'misses': 0, 'recorded': 0}
+
+    # A different conversation misses instead of calling the API
+    with pytest.raises(ReplayCacheMiss):
+        replay.complete('gpt-4o', [{'role': 'user', 'content': 'new'}], {}, lambda: 'unexpected')
+    assert 'ERROR' in _client(endpoint, replay).generate_multi_turn_conversation(['Something new.'])[0]['ai_response']
+
+
+def test_record_missing_only_calls_the_api_for_new_requests(tmp_path):
+    path = str(tmp_path / 'responses.jsonl')
+    calls = []
+
+    def call(text):
+        def request():
+            calls.append(text)
+            return f"reply to {text}"
+        return request
+
+    cache = ReplayCache(path, 'record-missing')
+    assert cache.complete('gpt-4o', [{'role': 'user', 'content': 'a'}], {}, call('a')) == 'reply to a'
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('{"key": "torn')  # Interrupted append
+
+    reopened = ReplayCache(path, 'record-missing')
+    assert len(reopened) == 1
+    assert reopened.complete('gpt-4o', [{'role': 'user', 'content': 'a'}], {}, call('a')) == 'reply to a'
+    assert reopened.complete('gpt-4o', [{'role': 'user', 'content': 'b'}], {}, call('b')) == 'reply to b'
+    assert calls == ['a', 'b']
+    assert len(ReplayCache(path, 'replay')) == 2
@@ -0,0 +1,68 @@
+"""
+Tests for lazily loaded resources
+"""
+
+import os
+import subprocess
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+from benchmark import resources
+from benchmark.resources import LazyResource
+
+
+def test_resource_loads_once_across_threads():
+    calls = []
+
+    def loader():
+        calls.append(1)
+        time.sleep(0.05)
+        return object()
+    resource = LazyResource('slow', loader)
+
+    values = []
+    threads = [threading.Thread(target=lambda: values.append(resource.get())) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert len({id(value) for value in values}) == 1
+    assert resource.status == 'ready' and resource.load_seconds >= 0.05
+
+
+def test_failed_loads_are_reported_and_retried(monkeypatch):
+    monkeypatch.setattr(resources, '_RESOURCES', OrderedDict())
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise OSError('model download failed')
+        return 'model'
+    resources.register_resource('flaky', flaky)
+    resources.register_resource('unused', lambda: 'never loaded')
+
+    resources.warm_up(['flaky'], background=False)
+    report = {row['resource']: row for row in resources.get_startup_report()}
+    assert report['flaky']['status'] == 'failed'
+    assert report['flaky']['error'] == 'model download failed'
+    assert report['unused'] == {'resource': 'unused', 'status': 'pending', 'seconds': None, 'error': None}
+
+    assert resources.get_resource('flaky') == 'model'
+    assert resources.get_startup_report()[0]['status'] == 'ready'
+    assert resources.get_startup_report()[0]['error'] is None
+
+
+def test_importing_the_evaluation_module_loads_nothing():
+    code = (
+        "import sys\n"
+        "import benchmark.evaluation, benchmark.multi_turn_evaluator\n"
+        "from benchmark.resources import get_startup_report\n"
+        "assert all(row['status'] == 'pending' for row in get_startup_report()), get_startup_report()\n"
+        "assert 'transformers' not in sys.modules\n"
+    )
+    subprocess.run([sys.executable, '-c', code], check=True, cwd=os.path.dirname(os.path.dirname(__file__)))
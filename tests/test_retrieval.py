@@ -0,0 +1,125 @@
+"""
+Tests for few-shot selection and nearest-reference search
+"""
+
+import json
+import math
+from collections import Counter
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from benchmark.config import BM25_B, BM25_K1
+from benchmark.data_loader import get_all_scenarios
+from benchmark.dataset_cache import load_dataset_cache
+from benchmark.lexicon_matcher import tokenize_for_matching
+from benchmark.retrieval import BM25Index, FewShotRetriever, ReferenceSearchIndex, build_few_shot_prompt
+
+_PATIENT_TURNS = [
+    ("depression", "I can't sleep and I feel worthless every single day."),
+    ("anxiety", "My heart races before meetings and I can't breathe."),
+    ("depression", "Nothing feels worth doing anymore, I just sleep all day."),
+    ("grief", "Since my mother died I can't stop crying."),
+    ("anxiety", "I worry about everything, work, money, my health."),
+    ("grief", "The anniversary of the funeral is coming and I dread it."),
+    ("anxiety", "Meetings, meetings, meetings. I can't face another one."),
+]
+
+
+def _examples():
+    return [
+        {'position': index, 'condition': condition, 'patient': patient, 'doctor': f"Doctor reply {index}"}
+        for index, (condition, patient) in enumerate(_PATIENT_TURNS)
+    ]
+
+
+def _naive_bm25(documents, query):
+    """Okapi BM25 computed document by document"""
+    tokenized = [tokenize_for_matching(document) for document in documents]
+    average_length = sum(map(len, tokenized)) / len(tokenized)
+    scores = []
+    for tokens in tokenized:
+        counts = Counter(tokens)
+        score = 0.0
+        for term in set(tokenize_for_matching(query)):
+            if term not in counts:
+                continue
+            frequency = sum(term in other for other in tokenized)
+            idf = math.log(1 + (len(tokenized) - frequency + 0.5) / (frequency + 0.5))
+            tf = counts[term]
+            score += idf * tf * (BM25_K1 + 1) / (tf + BM25_K1 * (1 - BM25_B + BM25_B * len(tokens) / average_length))
+        scores.append(score)
+    return scores
+
+
+def test_bm25_matches_per_document_scoring():
+    documents = [patient for _, patient in _PATIENT_TURNS]
+    index = BM25Index(documents)
+    for query in ["I can't sleep", "meetings make me anxious", "my mother's funeral", "unrelated words", ""]:
+        np.testing.assert_allclose(index.scores(query), _naive_bm25(documents, query))
+
+
+def test_selection_prefers_one_example_per_condition():
+    retriever = FewShotRetriever(_examples())
+    assert retriever.select("I can't face meetings", k=3, diverse=False)[:2] == [6, 1]
+    diverse = retriever.select("I can't face meetings", k=3)
+    assert diverse[0] == 6
+    assert sorted(_examples()[i]['condition'] for i in diverse) == ['anxiety', 'depression', 'grief']
+    # No known words: dataset order, one per condition
+    assert retriever.select("zzz", k=3) == [0, 1, 3]
+    assert retriever.select("zzz", k=5) == [0, 1, 3, 2, 4]
+
+
+def test_prompts_are_cached_per_example_set():
+    retriever = FewShotRetriever(_examples(), prompt_cache_size=2)
+    prompt = retriever.prompt_for("My heart races in meetings")
+    assert prompt == build_few_shot_prompt([_examples()[i] for i in retriever.select("My heart races in meetings")])
+
+    # A different message choosing the same examples reuses the prompt object
+    assert retriever.select("meetings and my heart") == retriever.select("My heart races in meetings")
+    assert retriever.prompt_for("meetings and my heart") is prompt
+    assert retriever.stats == {'prompt_hits': 1, 'prompt_misses': 1}
+
+    retriever.prompt_for("my mother died")
+    retriever.prompt_for("zzz")
+    assert len(retriever._prompts) == 2
+    assert retriever.prompt_for("My heart races in meetings") == prompt
+    assert retriever.stats == {'prompt_hits': 1, 'prompt_misses': 4}
+
+
+def test_retriever_from_dataset_cache_uses_first_turns(tmp_path):
+    dataset_path = str(tmp_path / 'dataset.jsonl')
+    with open(dataset_path, 'w', encoding='utf-8') as f:
+        for index, (condition, patient) in enumerate(_PATIENT_TURNS):
+            conversation = f"Patient: {patient}\nDoctor: Reply {index}.\nPatient: Thanks.\nDoctor: Take care."
+            f.write(json.dumps({'patient_id': f'P{index}', 'session_id': index, 'condition': condition,
+                                'input': conversation}) + '\n')
+
+    retriever = FewShotRetriever.from_dataset_cache(load_dataset_cache(dataset_path, str(tmp_path / 'cache')))
+    assert retriever.examples == [
+        {'position': position, 'condition': scenario['condition'],
+         'patient': scenario['turns'][0]['patient'], 'doctor': scenario['turns'][0]['doctor']}
+        for position, scenario in enumerate(get_all_scenarios(dataset_path))
+    ]
+
+
+def test_reference_search_matches_tfidf_cosine():
+    patient_texts = [patient for _, patient in _PATIENT_TURNS]
+    doctor_texts = [f"Doctor reply {index}" for index in range(len(patient_texts))]
+    keys = [(f'P{index}', index, 1) for index in range(len(patient_texts))]
+    index = ReferenceSearchIndex(patient_texts, doctor_texts, keys)
+
+    vectorizer = TfidfVectorizer(tokenizer=tokenize_for_matching, lowercase=False, token_pattern=None,
+                                 sublinear_tf=True)
+    documents = vectorizer.fit_transform(patient_texts)
+    for query in ["I can't sleep at all", "meetings meetings", "my mother", "I", "unrelated", ""]:
+        expected = (documents @ vectorizer.transform([query]).T).toarray().ravel()
+        matches = index.search(query, k=len(patient_texts))
+        ranked = [i for i in np.argsort(-expected, kind='stable') if expected[i] > 0]
+
+        assert [match['key'] for match in matches] == [keys[i] for i in ranked]
+        np.testing.assert_allclose([match['score'] for match in matches], expected[ranked])
+        nearest = index.nearest(query)
+        assert nearest == (matches[0] if matches else None)
+        if nearest is not None:
+            assert nearest['doctor'] == doctor_texts[ranked[0]]
@@ -0,0 +1,98 @@
+"""
+Tests for score-store invalidation
+"""
+
+import hashlib
+import inspect
+
+import pytest
+
+import benchmark.config as config
+from benchmark import evaluation, lexicon_matcher, meteor, score_store, syllables, text_analysis
+from benchmark.score_store import METRIC_DEPENDENCIES, TURN_METRICS, ScoreStore
+
+# Code each metric's stored scores depend on
+METRIC_CODE = {
+    'rouge_score': [
+        evaluation._ngram_precision_recall, evaluation._lcs_precision_recall,
+        evaluation.calculate_average_rouge, evaluation.calculate_average_rouge_batch, text_analysis
+    ],
+    'meteor_score': [evaluation.calculate_meteor, evaluation.calculate_meteor_batch, meteor, text_analysis],
+    'ethical_alignment': [
+        evaluation.evaluate_ethical_alignment, evaluation._batch_text_counts,
+        evaluation.evaluate_ethical_alignment_batch, lexicon_matcher
+    ],
+    'sentiment_distribution': [
+        evaluation._split_for_emotion_model, evaluation._merge_chunk_emotions, evaluation._emotion_distribution,
+        evaluation._infer_emotion_distributions, evaluation.get_emotion_vectors, evaluation._vector_similarity,
+        evaluation.evaluate_sentiment_distribution, evaluation.evaluate_sentiment_distribution_batch
+    ],
+    'inclusivity_score': [
+        evaluation.evaluate_inclusivity_score, evaluation.evaluate_inclusivity_score_batch, lexicon_matcher
+    ],
+    'complexity_score': [evaluation.evaluate_complexity_score, syllables, text_analysis]
+}
+
+# (version, source digest) each metric was last reviewed at. When this test fails,
+# bump the metric's version in METRIC_DEPENDENCIES if its scores can change, then
+# update the pair here.
+PINNED_METRIC_CODE = {
+    'rouge_score': ('2', '23417c16125a7774'),
+    'meteor_score': ('2', 'c42b8eda772f3fa4'),
+    'ethical_alignment': ('2', 'c618f5b28248ca77'),
+    'sentiment_distribution': ('1', 'ea99f28877aa8bf4'),
+    'inclusivity_score': ('2', '01d33087c766155f'),
+    'complexity_score': ('1', 'f4cb1f2606c95494')
+}
+
+
+def _code_digest(metric):
+    sources = [inspect.getsource(inspect.unwrap(code)) for code in METRIC_CODE[metric]]
+    return hashlib.blake2b('\n'.join(sources).encode('utf-8'), digest_size=8).hexdigest()
+
+
+@pytest.mark.parametrize('metric', TURN_METRICS)
+def test_metric_code_changes_come_with_a_version_bump(metric):
+    assert (METRIC_DEPENDENCIES[metric][0], _code_digest(metric)) == PINNED_METRIC_CODE[metric], (
+        f"{metric} scoring code changed: bump its version in METRIC_DEPENDENCIES, then update PINNED_METRIC_CODE"
+    )
+
+
+def _stored_pairs(path):
+    """Store one score per metric and return the pair they were stored for"""
+    pair = ("How have you been sleeping?", "I hear you. What has made sleep hard lately?")
+    store = ScoreStore(path)
+    for metric in TURN_METRICS:
+        store.put_many(metric, [pair], [0.5])
+    return pair
+
+
+def test_unchanged_config_hits(tmp_path):
+    path = str(tmp_path / 'scores.sqlite')
+    pair = _stored_pairs(path)
+    store = ScoreStore(path)
+    assert {metric: store.get_many(metric, [pair])[0] for metric in TURN_METRICS} == dict.fromkeys(TURN_METRICS, 0.5)
+
+
+def test_version_bump_misses_only_that_metric(tmp_path, monkeypatch):
+    path = str(tmp_path / 'scores.sqlite')
+    pair = _stored_pairs(path)
+    version, names = METRIC_DEPENDENCIES['meteor_score']
+    monkeypatch.setitem(score_store.METRIC_DEPENDENCIES, 'meteor_score', (version + '-next', names))
+
+    store = ScoreStore(path)
+    assert store.get_many('meteor_score', [pair]) == [None]
+    assert store.get_many('rouge_score', [pair]) == [0.5]
+
+
+def test_config_change_misses_dependent_metrics(tmp_path, monkeypatch):
+    path = str(tmp_path / 'scores.sqlite')
+    pair = _stored_pairs(path)
+    monkeypatch.setattr(config, 'EMOTION_WEIGHTS', {**config.EMOTION_WEIGHTS, 'joy': -1.0})
+    monkeypatch.setattr(config, 'ROUGE_USE_STEMMER', not config.ROUGE_USE_STEMMER)
+
+    store = ScoreStore(path)
+    assert store.get_many('sentiment_distribution', [pair]) == [None]
+    assert store.get_many('rouge_score', [pair]) == [None]
+    assert store.get_many('meteor_score', [pair]) == [0.5]
+    assert store.prune() == 2
@@ -0,0 +1,33 @@
+"""
+Tests for the shared CMU syllable table
+"""
+
+import nltk
+import pytest
+
+from benchmark.syllables import count_syllables, estimate_syllables, load_syllable_table
+
+
+@pytest.fixture(scope='module')
+def cmudict():
+    try:
+        return nltk.corpus.cmudict.dict()
+    except LookupError:
+        pytest.skip('cmudict corpus is not installed')
+
+
+def test_table_matches_first_cmudict_pronunciation(cmudict):
+    table = load_syllable_table()
+    assert load_syllable_table() is table
+    assert table.keys() == cmudict.keys()
+    for word, pronunciations in cmudict.items():
+        assert table[word] == sum(1 for phoneme in pronunciations[0] if phoneme[-1].isdigit()), word
+
+
+def test_unknown_words_use_the_estimate(cmudict):
+    assert count_syllables('Exhausting') == count_syllables('exhausting') == load_syllable_table()['exhausting']
+    for word in ['zxqv', 'teletherapy', "n't", '24/7', '—']:
+        if word not in cmudict:
+            assert count_syllables(word) == estimate_syllables(word)
+    assert estimate_syllables('zxqv') == 1
+    assert estimate_syllables("n't") == estimate_syllables('—') == 0